@@ -1,20 +1,38 @@
-from fastapi import FastAPI, status, Request
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, status, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import ValidationError
-from routers import transactions, categories, budgets, auth
+from mesure_requetes import MesureRequetesMiddleware, configurer_journal
+from metriques import MetriquesMiddleware, exposer, fin_processus
+from reponses import REPONSE_PAR_DEFAUT
+from routers import transactions, categories, budgets, auth, monitoring
+
+@asynccontextmanager
+async def cycle_de_vie(app: FastAPI):
+    yield
+    fin_processus()
 
 # Init
 app = FastAPI(
     title="Budget Personnel API",
     description="API de gestion de budget avec authentification JWT",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=REPONSE_PAR_DEFAUT,
+    lifespan=cycle_de_vie
 )
 
+# Requêtes SQL par requête HTTP : en-tête Server-Timing et journal JSON
+configurer_journal()
+app.add_middleware(MesureRequetesMiddleware)
+# Compteurs et latences par route pour Prometheus (GET /metrics)
+app.add_middleware(MetriquesMiddleware)
+
 # Inclusion des routeurs
 app.include_router(auth.router)
 app.include_router(transactions.router)
 app.include_router(categories.router)
 app.include_router(budgets.router)
+app.include_router(monitoring.router)
 
 # Route de base
 @app.get("/")
@@ -29,6 +47,12 @@ def root():
         }
     }
 
+# Même jeton que /api/monitoring (MONITORING_TOKEN)
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(monitoring.acces_monitoring)])
+def metrics():
+    contenu, content_type = exposer()
+    return Response(contenu, media_type=content_type)
+
 @app.exception_handler(ValidationError)
 async def pydantic_validation_exception_handler(request: Request, exc: ValidationError):
     return JSONResponse(
@@ -1,37 +1,114 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import jwt
 import os
-import bcrypt
+import threading
+import time
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_session
 from models.models import User, InvalidCredentialsError, UserAlreadyExistsError, UserNotFoundError
+from scripts import pool_bcrypt as bcrypt_pool
 
 # Configuration de la sécurité
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-dev-only-DO-NOT-USE-IN-PROD")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Facteur de coût bcrypt ; les hash d'un autre coût sont recalculés à la connexion
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# "database" : l'utilisateur est relu en base à chaque requête
+# "stateless" : les claims signés du JWT font foi (voir Principal et UtilisateursConnus)
+AUTH_MODE = os.getenv("AUTH_MODE", "database")
+
 # Schéma de sécurité Bearer pour Swagger UI
 security = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    """Hash un password avec bcrypt"""
-    # Validation supplémentaire avant le hachage
+@dataclass(frozen=True)
+class Principal:
+    """Utilisateur authentifié reconstruit depuis les claims du JWT, sans lecture en base"""
+    id: int
+    username: str
+
+
+class UtilisateursConnus:
+    """
+    Existence des utilisateurs en mode stateless : un utilisateur vérifié en base est
+    mémorisé `ttl` secondes (AUTH_USER_CACHE_TTL). Un utilisateur supprimé en base reste donc
+    accepté au plus `ttl` secondes par les processus qui l'ont vérifié, puis est refusé (401).
+    Propre au processus, comme les autres caches applicatifs.
+    """
+
+    def __init__(self, ttl: float = 300.0, taille_max: int = 10_000, horloge=time.monotonic):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._horloge = horloge
+        self._verrou = threading.Lock()
+        self._verifies: dict[int, float] = {}
+
+    def en_cache(self, user_id: int) -> bool:
+        """Vrai si l'utilisateur a été vérifié en base depuis moins de `ttl` secondes (sans requête)."""
+        expiration = self._verifies.get(user_id)
+        return expiration is not None and expiration > self._horloge()
+
+    def existe(self, db: Session, user_id: int) -> bool:
+        if self.en_cache(user_id):
+            return True
+
+        maintenant = self._horloge()
+        if db.query(User.id).filter(User.id == user_id).first() is None:
+            return False
+        with self._verrou:
+            if len(self._verifies) >= self.taille_max:
+                self._verifies.clear()
+            self._verifies[user_id] = maintenant + self.ttl
+        return True
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._verifies.clear()
+
+
+utilisateurs_connus = UtilisateursConnus(ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "300")))
+
+
+def _password_a_hacher(password: str) -> bytes:
+    """Validation supplémentaire avant le hachage ; retourne le password encodé"""
     if not password or len(password) < 8:
         raise ValueError("Le mot de passe doit faire au moins 8 caractères")
     
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         raise ValueError(f"Le mot de passe est trop long: {len(password_bytes)} bytes (max 72)")
-    
+    return password_bytes
+
+
+def hash_password(password: str) -> str:
+    """Hash un password avec bcrypt"""
+    password_bytes = _password_a_hacher(password)
     try:
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password_bytes, salt)
+        hashed = bcrypt_pool.pool_bcrypt.executer(bcrypt_pool.hacher, password_bytes, BCRYPT_ROUNDS)
         return hashed.decode('utf-8')
+    except bcrypt_pool.ServiceSatureError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Erreur lors du hachage du password: {str(e)}")
+
+
+async def hash_password_async(password: str) -> str:
+    """Comme hash_password, attendu sans occuper de thread (routes `async def`)"""
+    password_bytes = _password_a_hacher(password)
+    try:
+        hashed = await bcrypt_pool.pool_bcrypt.executer_async(bcrypt_pool.hacher, password_bytes, BCRYPT_ROUNDS)
+        return hashed.decode('utf-8')
+    except bcrypt_pool.ServiceSatureError:
+        raise
     except Exception as e:
         raise ValueError(f"Erreur lors du hachage du password: {str(e)}")
 
@@ -41,11 +118,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         password_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return bcrypt_pool.pool_bcrypt.executer(bcrypt_pool.verifier, password_bytes, hashed_bytes)
+    except bcrypt_pool.ServiceSatureError:
+        raise
     except Exception:
         return False
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Comme verify_password, attendu sans occuper de thread (routes `async def`)"""
+    try:
+        password_bytes = plain_password.encode('utf-8')
+        hashed_bytes = hashed_password.encode('utf-8')
+        return await bcrypt_pool.pool_bcrypt.executer_async(bcrypt_pool.verifier, password_bytes, hashed_bytes)
+    except bcrypt_pool.ServiceSatureError:
+        raise
+    except Exception:
+        return False
+
+
+def cout_hash(hashed_password: str) -> int | None:
+    """Facteur de coût d'un hash bcrypt ('$2b$12$...' → 12), None si illisible"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
 def create_access_token(
     user_id: int, 
     username: str,
@@ -91,23 +190,49 @@ def verify_token(token: str) -> dict:
         raise InvalidCredentialsError("Token invalide")
 
 
+def _utilisateur_par_nom(db: Session, username: str) -> User | None:
+    return db.query(User).filter(User.username == username).first()
+
+
+def _creer_utilisateur(db: Session, username: str, hashed_password: str) -> User:
+    new_user = User(username=username, password_hash=hashed_password)
+    db.add(new_user)
+    # id renvoyé par l'INSERT (RETURNING) ; sessions en expire_on_commit=False : pas de relecture
+    db.commit()
+    return new_user
+
+
+def _remplacer_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.password_hash = hashed_password
+    db.commit()
+
+
+def _remplacer_hash_ou_annuler(db: Session, user: User, hashed_password: str) -> None:
+    try:
+        _remplacer_hash(db, user, hashed_password)
+    except Exception:
+        db.rollback()
+
+
+async def _en_session(db: Session | AsyncSession, fonction, *args):
+    """
+    Exécute fonction(session, *args) sans appel bloquant sur la boucle d'événements :
+    via run_sync (AsyncSession) ou dans le threadpool (Session).
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fonction(session, *args))
+    return await run_in_threadpool(fonction, db, *args)
+
+
 def register_user(username: str, password: str, db: Session) -> User:
     """
     Enregistre un nouvel utilisateur
     Lève UserAlreadyExistsError si l'utilisateur existe déjà
     """
-    existing_user = db.query(User).filter(User.username == username).first()
-    if existing_user:
+    if _utilisateur_par_nom(db, username):
         raise UserAlreadyExistsError(f"L'utilisateur '{username}' existe déjà")
     
-    hashed_password = hash_password(password)
-    new_user = User(username=username, password_hash=hashed_password)
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
+    return _creer_utilisateur(db, username, hash_password(password))
 
 
 def authenticate_user(username: str, password: str, db: Session) -> User:
@@ -116,18 +241,86 @@ def authenticate_user(username: str, password: str, db: Session) -> User:
     Retourne l'utilisateur si les identifiants sont valides
     Lève InvalidCredentialsError sinon
     """
-    user = db.query(User).filter(User.username == username).first()
+    user = _utilisateur_par_nom(db, username)
     
     if not user or not verify_password(password, user.password_hash):
         raise InvalidCredentialsError("Identifiants invalides")
-    
+
+    # le coût a changé depuis le hachage : on profite du mot de passe en clair pour rehacher
+    if cout_hash(user.password_hash) != BCRYPT_ROUNDS:
+        try:
+            _remplacer_hash(db, user, hash_password(password))
+        except Exception:
+            db.rollback()
+
+    return user
+
+
+async def register_user_async(username: str, password: str, db: Session | AsyncSession) -> User:
+    """
+    Comme register_user, pour les routes `async def` : les accès en base passent par _en_session,
+    le hachage est attendu sur le pool bcrypt sans occuper de thread.
+    """
+    if await _en_session(db, _utilisateur_par_nom, username):
+        raise UserAlreadyExistsError(f"L'utilisateur '{username}' existe déjà")
+
+    hashed_password = await hash_password_async(password)
+    return await _en_session(db, _creer_utilisateur, username, hashed_password)
+
+
+async def authenticate_user_async(username: str, password: str, db: Session | AsyncSession) -> User:
+    """Comme authenticate_user, pour les routes `async def` (voir register_user_async)"""
+    user = await _en_session(db, _utilisateur_par_nom, username)
+
+    if not user or not await verify_password_async(password, user.password_hash):
+        raise InvalidCredentialsError("Identifiants invalides")
+
+    if cout_hash(user.password_hash) != BCRYPT_ROUNDS:
+        try:
+            hashed_password = await hash_password_async(password)
+        except Exception:
+            return user
+        await _en_session(db, _remplacer_hash_ou_annuler, user, hashed_password)
+
+    return user
+
+
+def _utilisateur_du_token(token_data: dict, db: Session) -> User | Principal:
+    """
+    Utilisateur correspondant à un token vérifié.
+    En mode stateless, pas de requête par appel : un Principal est construit depuis les claims.
+    """
+    if AUTH_MODE == "stateless":
+        if utilisateurs_connus.existe(db, token_data["user_id"]):
+            return Principal(id=token_data["user_id"], username=token_data["username"])
+        user = None
+    else:
+        user = db.query(User).filter(User.id == token_data["user_id"]).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Utilisateur non trouvé",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
     return user
 
 
+async def _resoudre_utilisateur(token_data: dict, db: Session | AsyncSession) -> User | Principal:
+    """
+    Résolution de l'utilisateur sans appel bloquant sur la boucle d'événements :
+    cache d'existence (mode stateless) en mémoire, sinon lecture via run_sync
+    (AsyncSession) ou dans le threadpool (Session).
+    """
+    if AUTH_MODE == "stateless" and utilisateurs_connus.en_cache(token_data["user_id"]):
+        return Principal(id=token_data["user_id"], username=token_data["username"])
+    return await _en_session(db, lambda session: _utilisateur_du_token(token_data, session))
+
+
 async def get_current_user_from_header(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: Session | AsyncSession = Depends(get_session)
+) -> User | Principal:
     """
     Dépendance FastAPI pour récupérer l'utilisateur actuel à partir du header Authorization.
     Authentification REQUISE - lève HTTPException 401 si manquante ou invalide.
@@ -144,21 +337,13 @@ async def get_current_user_from_header(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Utilisateur non trouvé",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    return user
+    return await _resoudre_utilisateur(token_data, db)
 
 
 async def get_current_user_from_token(
     token: str,
-    db: Session = Depends(get_db)
-) -> User:
+    db: Session | AsyncSession = Depends(get_session)
+) -> User | Principal:
     """
     Dépendance FastAPI pour récupérer l'utilisateur actuel à partir du token
     Lève HTTPException 401 si le token est invalide ou manquant
@@ -179,21 +364,13 @@ async def get_current_user_from_token(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Utilisateur non trouvé",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    return user
+    return await _resoudre_utilisateur(token_data, db)
 
 
 async def get_current_user_optional(
     token: Optional[str] = None,
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: Session | AsyncSession = Depends(get_session)
+) -> Optional[User | Principal]:
     """
     Dépendance FastAPI pour récupérer l'utilisateur actuel si un token est fourni
     Retourne None si pas de token (authentification optionnelle)
@@ -211,12 +388,4 @@ async def get_current_user_optional(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Utilisateur non trouvé",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    return user
+    return await _resoudre_utilisateur(token_data, db)
@@ -0,0 +1,103 @@
+"""
+Débit des routes transactions en mode synchrone (Session dans le threadpool AnyIO,
+40 threads) et asynchrone (AsyncSession sur asyncpg / aiosqlite) avec N clients concurrents.
+
+    cd backend && python -m benchmarks.bench_async_load [--database-url postgresql://...]
+        [--clients 500] [--requetes 5000] [--route "/api/transactions/?limit=20"]
+
+L'authentification est court-circuitée (Principal fixe) pour ne mesurer que la pile base de données.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import app
+from auth import Principal, get_current_user_from_header
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_categories, peupler_transactions, peupler_utilisateurs, vider,
+)
+from database import get_db, options_moteur, url_async
+
+
+async def charge(route, nb_clients, nb_requetes):
+    restantes = nb_requetes
+    latences, erreurs = [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def client_virtuel():
+            nonlocal restantes, erreurs
+            while restantes > 0:
+                restantes -= 1
+                t0 = time.perf_counter()
+                r = await client.get(route)
+                latences.append(time.perf_counter() - t0)
+                erreurs += r.status_code != 200
+
+        debut = time.perf_counter()
+        await asyncio.gather(*[client_virtuel() for _ in range(nb_clients)])
+        duree = time.perf_counter() - debut
+
+    latences.sort()
+    return {
+        "rps": len(latences) / duree,
+        "p50": latences[len(latences) // 2] * 1000,
+        "p99": latences[min(int(len(latences) * 0.99), len(latences) - 1)] * 1000,
+        "erreurs": erreurs,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requetes", type=int, default=5000)
+    parser.add_argument("--route", default="/api/transactions/?limit=20")
+    args = parser.parse_args(argv)
+
+    url = args.database_url or os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = creer_moteur(url)
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_id = peupler_utilisateurs(engine, 1)[0]
+    peupler_transactions(engine, [user_id], 5000, categories)
+
+    async_engine = create_async_engine(url_async(url), **options_moteur(asynchrone=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def session_sync():
+        db = creer_session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def session_async():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_current_user_from_header] = lambda: Principal(id=user_id, username="bench_0")
+    resultats = {}
+    try:
+        for mode, dependance in (("sync", session_sync), ("async", session_async)):
+            app.dependency_overrides[get_db] = dependance
+            asyncio.run(charge(args.route, 10, 50))  # chauffe
+            resultats[mode] = asyncio.run(charge(args.route, args.clients, args.requetes))
+            if mode == "async":
+                asyncio.run(async_engine.dispose())
+    finally:
+        app.dependency_overrides.clear()
+
+    print(f"GET {args.route} : {args.requetes} requêtes, {args.clients} clients concurrents ({engine.dialect.name})")
+    for mode, r in resultats.items():
+        print(f"  {mode:<6} {r['rps']:8.0f} req/s  p50={r['p50']:.0f} ms  p99={r['p99']:.0f} ms  erreurs={r['erreurs']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
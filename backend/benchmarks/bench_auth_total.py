@@ -0,0 +1,85 @@
+"""
+Latence de GET /api/transactions/total selon le mode d'authentification :
+AUTH_MODE=database (lecture de l'utilisateur à chaque requête) contre
+AUTH_MODE=stateless (claims du JWT + cache d'existence).
+
+    cd backend && python -m benchmarks.bench_auth_total [--database-url postgresql://...] [--requetes N]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import auth
+from app import app
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_categories,
+    peupler_transactions, peupler_utilisateurs, vider,
+)
+from database import get_db
+from mesure_requetes import requetes_sql
+
+
+def mesurer(client, entetes, nb_requetes):
+    durees, requetes = [], 0
+    for _ in range(nb_requetes):
+        t0 = time.perf_counter()
+        reponse = client.get("/api/transactions/total", headers=entetes)
+        durees.append(time.perf_counter() - t0)
+        reponse.raise_for_status()
+        # nombre mesuré par le middleware (en-tête Server-Timing)
+        requetes += requetes_sql(reponse)
+    durees.sort()
+    return {
+        "p50": statistics.median(durees) * 1000,
+        "p95": durees[int(len(durees) * 0.95) - 1] * 1000,
+        "requetes_sql": requetes / nb_requetes,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--requetes", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_id = peupler_utilisateurs(engine, 1)[0]
+    peupler_transactions(engine, [user_id], 1000, categories)
+
+    def override_get_db():
+        db = creer_session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    entetes = {"Authorization": f"Bearer {auth.create_access_token(user_id, 'bench_0')}"}
+    resultats = {}
+    mode_initial = auth.AUTH_MODE
+    try:
+        with TestClient(app) as client:
+            for mode in ("database", "stateless"):
+                auth.AUTH_MODE = mode
+                auth.utilisateurs_connus.vider()
+                client.get("/api/transactions/total", headers=entetes)  # chauffe (solde, cache)
+                resultats[mode] = mesurer(client, entetes, args.requetes)
+    finally:
+        auth.AUTH_MODE = mode_initial
+        app.dependency_overrides.clear()
+
+    print(f"GET /api/transactions/total, {args.requetes} requêtes ({engine.dialect.name})")
+    for mode, r in resultats.items():
+        print(f"  {mode:<10} p50={r['p50']:.3f} ms  p95={r['p95']:.3f} ms  requêtes SQL/appel={r['requetes_sql']:.2f}")
+    gain = 1 - resultats["stateless"]["p50"] / resultats["database"]["p50"]
+    print(f"  gain p50 : {gain:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Compare les plans et la latence du calcul de consommation des budgets avec
+l'ancien prédicat (cast(Transaction.date, Date) entre début et fin) et le
+prédicat semi-ouvert actuel (date >= début AND date < fin + 1 jour).
+
+    cd backend && python -m benchmarks.bench_budget_dates [--database-url postgresql://...] [--lignes N]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import Date, and_, cast, func, select
+
+from benchmarks.bench_index_plans import expliquer
+from benchmarks.seed import (
+    creer_moteur, peupler_budgets, peupler_categories, peupler_transactions,
+    peupler_transactions_serveur, peupler_utilisateurs, vider,
+)
+from models.models import Budget, Transaction
+from scripts.saisie_budget import JourSuivant, bornes_periode
+
+
+def statut_avant(budget):
+    return select(func.sum(Transaction.montant)).where(
+        Transaction.categorie_id == budget.categorie_id,
+        cast(Transaction.date, Date) >= budget.debut_periode,
+        cast(Transaction.date, Date) <= budget.fin_periode,
+        Transaction.type == "DEPENSE",
+    )
+
+
+def statut_apres(budget):
+    debut, fin_exclue = bornes_periode(budget.debut_periode, budget.fin_periode)
+    return select(func.sum(Transaction.montant)).where(
+        Transaction.categorie_id == budget.categorie_id,
+        Transaction.date >= debut,
+        Transaction.date < fin_exclue,
+        Transaction.type == "DEPENSE",
+    )
+
+
+def liste(user_id, condition_dates):
+    return select(Budget.id, func.coalesce(func.sum(Transaction.montant), 0.0)).outerjoin(
+        Transaction,
+        and_(Budget.categorie_id == Transaction.categorie_id, Transaction.type == "DEPENSE", condition_dates),
+    ).where(Budget.utilisateur_id == user_id).group_by(Budget.id)
+
+
+def chronometrer(engine, requetes, repetitions):
+    durees = []
+    with engine.connect() as conn:
+        for _ in range(repetitions):
+            t0 = time.perf_counter()
+            for requete in requetes:
+                conn.execute(requete).all()
+            durees.append(time.perf_counter() - t0)
+    return statistics.median(durees)
+
+
+def plan(engine, requete):
+    compilee = requete.compile(engine)
+    return expliquer(engine, str(compilee), compilee.params if engine.dialect.name == "postgresql" else tuple(compilee.params.values()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--lignes", type=int, default=None, help="1 000 000 sur PostgreSQL, 200 000 sur SQLite par défaut")
+    parser.add_argument("--budgets", type=int, default=36)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    postgres = engine.dialect.name == "postgresql"
+    nb_lignes = args.lignes or (1_000_000 if postgres else 200_000)
+
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_ids = peupler_utilisateurs(engine, 100)
+    if postgres:
+        peupler_transactions_serveur(engine, user_ids, nb_lignes, categories)
+    else:
+        peupler_transactions(engine, user_ids, nb_lignes // len(user_ids), categories)
+    peupler_budgets(engine, user_ids[:1], args.budgets, categories)
+
+    with engine.connect() as conn:
+        budgets = conn.execute(select(Budget)).all()
+
+    cas = {
+        "statut (avant : cast)": [statut_avant(b) for b in budgets],
+        "statut (après : semi-ouvert)": [statut_apres(b) for b in budgets],
+        "liste (avant : cast)": [liste(user_ids[0], and_(
+            cast(Transaction.date, Date) >= Budget.debut_periode,
+            cast(Transaction.date, Date) <= Budget.fin_periode,
+        ))],
+        "liste (après : semi-ouvert)": [liste(user_ids[0], and_(
+            Transaction.date >= Budget.debut_periode,
+            Transaction.date < JourSuivant(Budget.fin_periode),
+        ))],
+    }
+
+    print(f"{nb_lignes} transactions, {len(budgets)} budgets ({engine.dialect.name}), médiane sur {args.repetitions} exécutions")
+    for libelle, requetes in cas.items():
+        duree = chronometrer(engine, requetes, args.repetitions)
+        index, texte = plan(engine, requetes[0])
+        print(f"\n== {libelle}: {duree * 1000:.1f} ms, index={sorted(index) or '-'}")
+        print(texte)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Compare la liste des budgets enrichis (GET /api/budgets/) avec l'ancienne forme
+(jointure budgets × transactions puis GROUP BY budget) et la forme actuelle
+(somme en sous-requête corrélée, limitée aux dépenses du propriétaire).
+
+L'ancienne jointure ne filtrait pas sur l'utilisateur : chaque budget était joint aux
+dépenses de tous les utilisateurs de la catégorie, ce qui gonflait à la fois le nombre
+de lignes agrégées et les totaux. Le script affiche les deux durées, les plans et le
+nombre de budgets dont le total diffère.
+
+    cd backend && python -m benchmarks.bench_budgets_list [--database-url postgresql://...] [--lignes N] [--budgets N]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import and_, func, select
+
+from benchmarks.bench_budget_dates import plan
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_budgets, peupler_categories, peupler_transactions,
+    peupler_transactions_serveur, peupler_utilisateurs, vider,
+)
+from models.models import Budget, Transaction
+from scripts.saisie_budget import BudgetService, JourSuivant
+
+
+def liste_avant(user_id):
+    return select(Budget.id, func.coalesce(func.sum(Transaction.montant), 0.0)).outerjoin(
+        Transaction,
+        and_(
+            Budget.categorie_id == Transaction.categorie_id,
+            Transaction.type == "DEPENSE",
+            Transaction.date >= Budget.debut_periode,
+            Transaction.date < JourSuivant(Budget.fin_periode),
+        ),
+    ).where(Budget.utilisateur_id == user_id).group_by(Budget.id)
+
+
+def liste_apres(engine, user_id):
+    with creer_session(engine) as session:
+        requete = BudgetService(session)._requete_statuts().filter(Budget.utilisateur_id == user_id)
+        statement = requete.statement
+    return statement
+
+
+def executer(engine, requete, repetitions):
+    durees = []
+    with engine.connect() as conn:
+        for _ in range(repetitions):
+            t0 = time.perf_counter()
+            lignes = conn.execute(requete).all()
+            durees.append(time.perf_counter() - t0)
+    # colonnes (Budget..., total) ou (id, total) : l'id est en tête, le total en dernier
+    return statistics.median(durees), {ligne[0]: round(float(ligne[-1]), 2) for ligne in lignes}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--lignes", type=int, default=None, help="1 000 000 sur PostgreSQL, 200 000 sur SQLite par défaut")
+    parser.add_argument("--budgets", type=int, default=1000)
+    parser.add_argument("--utilisateurs", type=int, default=100)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    postgres = engine.dialect.name == "postgresql"
+    nb_lignes = args.lignes or (1_000_000 if postgres else 200_000)
+
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_ids = peupler_utilisateurs(engine, args.utilisateurs)
+    if postgres:
+        peupler_transactions_serveur(engine, user_ids, nb_lignes, categories)
+    else:
+        peupler_transactions(engine, user_ids, nb_lignes // len(user_ids), categories)
+    peupler_budgets(engine, user_ids[:1], args.budgets, categories)
+    proprietaire = user_ids[0]
+
+    cas = {
+        "avant : jointure + GROUP BY": liste_avant(proprietaire),
+        "après : sous-requête corrélée": liste_apres(engine, proprietaire),
+    }
+
+    print(
+        f"{nb_lignes} transactions ({len(user_ids)} utilisateurs), {args.budgets} budgets "
+        f"({engine.dialect.name}), médiane sur {args.repetitions} exécutions"
+    )
+    totaux = {}
+    for libelle, requete in cas.items():
+        duree, totaux[libelle] = executer(engine, requete, args.repetitions)
+        index, texte = plan(engine, requete)
+        print(f"\n== {libelle}: {duree * 1000:.1f} ms, index={sorted(index) or '-'}")
+        print(texte)
+
+    avant, apres = totaux.values()
+    differents = sum(1 for budget_id, total in apres.items() if avant.get(budget_id) != total)
+    print(f"\n{differents}/{len(apres)} budgets dont le total différait (dépenses des autres utilisateurs comptées)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
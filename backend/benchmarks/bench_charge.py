@@ -0,0 +1,304 @@
+"""
+Charge de l'API complète : sème N utilisateurs, M transactions et K budgets par utilisateur,
+puis envoie successivement à chaque route des routeurs (authentification JWT réelle)
+des requêtes concurrentes via un client ASGI en processus. Pour chaque route : débit,
+p50/p95/p99, erreurs et requêtes SQL par requête HTTP. Les résultats sont écrits en JSON
+(--sortie) et peuvent être comparés à une exécution précédente (--comparer).
+
+    cd backend && python -m benchmarks.bench_charge [--database-url postgresql://...]
+        [--utilisateurs 20] [--transactions 500] [--budgets 24] [--clients 20] [--requetes 200]
+        [--routes budgets,series] [--sortie charge.json] [--comparer precedent.json]
+
+Sessions synchrones (DB_MODE=sync, le mode par défaut) sur le moteur du benchmark ;
+SQLite fichier temporaire par défaut. BCRYPT_ROUNDS fixe le coût des routes d'authentification.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+import httpx
+from sqlalchemy import event, select
+
+import auth
+from app import app
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_budgets, peupler_categories, peupler_transactions,
+    peupler_transactions_serveur, peupler_utilisateurs, vider,
+)
+from database import get_db
+from models.models import Budget, Transaction, User
+from routers import monitoring
+from scripts.cache_budget import budget_status_cache
+from scripts.cumul_quotidien import CumulQuotidienService
+from scripts.registre_categories import registre_categories
+from scripts.solde_utilisateur import SoldeService
+
+MOT_DE_PASSE = "password123"
+MONITORING = "monitoring"  # clé des en-têtes des routes de monitoring dans Jeu.entetes
+
+
+@dataclass
+class Jeu:
+    """Données semées et état partagé entre les phases (ids créés puis supprimés)."""
+    utilisateurs: list[int]
+    entetes: dict[int | str, dict]
+    transactions: dict[int, list[int]]
+    budgets: dict[int, list[int]]
+    categories: dict[str, int]
+    creees: list[tuple[int, int]] = field(default_factory=list)
+    execution: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime("%H%M%S%f"))
+
+    def utilisateur(self, i: int) -> int:
+        return self.utilisateurs[i % len(self.utilisateurs)]
+
+
+def _import_ndjson(jeu, i):
+    rng = random.Random(i)
+    return "\n".join(json.dumps({
+        "montant": round(rng.uniform(1, 150), 2), "libelle": "import", "type": "DEPENSE",
+        "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "categorie": rng.choice(list(jeu.categories)),
+    }) for _ in range(20)).encode()
+
+
+def _budget_futur(jeu, i):
+    # une période par requête, au-delà des budgets semés : pas de chevauchement
+    categorie_ids = list(jeu.categories.values())
+    mois = i // len(categorie_ids)
+    debut = date(2100 + mois // 12, mois % 12 + 1, 1)
+    return jeu.utilisateur(i), "POST", "/api/budgets/", {"json": {
+        "montant_fixe": 300.0, "debut_periode": debut.isoformat(), "fin_periode": debut.replace(day=28).isoformat(),
+        "categorie_id": categorie_ids[i % len(categorie_ids)],
+    }}
+
+
+def _modification(jeu, i):
+    user_id = jeu.utilisateur(i)
+    transactions = jeu.transactions[user_id]
+    return user_id, "PUT", f"/api/transactions/{transactions[i // len(jeu.utilisateurs) % len(transactions)]}", {"json": {"montant": 20.0 + i % 50}}
+
+
+def _suppression(jeu, i):
+    # transactions créées pendant la phase POST /api/transactions/
+    user_id, transaction_id = jeu.creees.pop()
+    return user_id, "DELETE", f"/api/transactions/{transaction_id}", {}
+
+
+def _budget(jeu, i):
+    user_id = jeu.utilisateur(i)
+    budgets = jeu.budgets[user_id]
+    return user_id, "GET", f"/api/budgets/{budgets[i // len(jeu.utilisateurs) % len(budgets)]}", {}
+
+
+# nom -> construction de la requête i : (utilisateur, méthode, url, arguments httpx)
+SCENARIOS = {
+    "POST /api/auth/register": lambda jeu, i: (
+        None, "POST", "/api/auth/register", {"json": {"username": f"charge_{jeu.execution}_{i}", "password": MOT_DE_PASSE}}
+    ),
+    "POST /api/auth/login": lambda jeu, i: (
+        None, "POST", "/api/auth/login", {"json": {"username": "charge_login", "password": MOT_DE_PASSE}}
+    ),
+    "GET /api/categories/": lambda jeu, i: (None, "GET", "/api/categories/", {}),
+    "GET /api/transactions/": lambda jeu, i: (jeu.utilisateur(i), "GET", "/api/transactions/", {}),
+    "GET /api/transactions/?limit=50": lambda jeu, i: (jeu.utilisateur(i), "GET", "/api/transactions/?limit=50", {}),
+    "GET /api/transactions/?stream=true": lambda jeu, i: (jeu.utilisateur(i), "GET", "/api/transactions/?stream=true", {}),
+    "GET /api/transactions/total": lambda jeu, i: (
+        jeu.utilisateur(i), "GET", "/api/transactions/total?date_debut=2023-01-01&date_fin=2023-12-31&type_filtre=DEPENSE", {}
+    ),
+    "GET /api/transactions/series": lambda jeu, i: (
+        jeu.utilisateur(i), "GET", "/api/transactions/series?granularity=month&group_by=categorie", {}
+    ),
+    "POST /api/transactions/": lambda jeu, i: (jeu.utilisateur(i), "POST", "/api/transactions/", {"json": {
+        "montant": 12.5, "libelle": "charge", "type": "DEPENSE", "date": "2025-06-15T12:00:00", "categorie": list(jeu.categories)[i % len(jeu.categories)],
+    }}),
+    "PUT /api/transactions/{transaction_id}": _modification,
+    "DELETE /api/transactions/{transaction_id}": _suppression,
+    "POST /api/transactions/bulk": lambda jeu, i: (
+        jeu.utilisateur(i), "POST", "/api/transactions/bulk?format=ndjson", {"content": _import_ndjson(jeu, i)}
+    ),
+    "GET /api/budgets/": lambda jeu, i: (jeu.utilisateur(i), "GET", "/api/budgets/", {}),
+    "GET /api/budgets/status": lambda jeu, i: (
+        jeu.utilisateur(i), "GET", "/api/budgets/status?ids=" + ",".join(map(str, jeu.budgets[jeu.utilisateur(i)][:10])), {}
+    ),
+    "GET /api/budgets/{budget_id}": _budget,
+    "POST /api/budgets/": _budget_futur,
+    "PUT /api/budgets/{budget_id}": lambda jeu, i: (
+        jeu.utilisateur(i), "PUT", f"/api/budgets/{jeu.budgets[jeu.utilisateur(i)][0]}", {"json": {"montant_fixe": 100.0 + i % 50}}
+    ),
+    "GET /api/monitoring/cache": lambda jeu, i: (MONITORING, "GET", "/api/monitoring/cache", {}),
+    "GET /api/monitoring/bcrypt": lambda jeu, i: (MONITORING, "GET", "/api/monitoring/bcrypt", {}),
+    "GET /api/monitoring/pool": lambda jeu, i: (MONITORING, "GET", "/api/monitoring/pool", {}),
+}
+
+STATUTS_ATTENDUS = {"POST": (200, 201)}
+
+
+def centile(valeurs, q):
+    return valeurs[min(int(len(valeurs) * q), len(valeurs) - 1)] * 1000 if valeurs else float("nan")
+
+
+async def phase(nom, jeu, nb_clients, nb_requetes, compteur):
+    """Envoie nb_requetes requêtes du scénario avec nb_clients clients concurrents."""
+    construire = SCENARIOS[nom]
+    prochaine, latences, erreurs = 0, [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def client_virtuel():
+            nonlocal prochaine, erreurs
+            while prochaine < nb_requetes:
+                i, prochaine = prochaine, prochaine + 1
+                user_id, methode, url, arguments = construire(jeu, i)
+                t0 = time.perf_counter()
+                r = await client.request(methode, url, headers=jeu.entetes.get(user_id), **arguments)
+                latences.append(time.perf_counter() - t0)
+                if r.status_code not in STATUTS_ATTENDUS.get(methode, (200,)):
+                    erreurs += 1
+                elif nom == "POST /api/transactions/":
+                    jeu.creees.append((user_id, r.json()["id"]))
+
+        requetes_sql = compteur[0]
+        debut = time.perf_counter()
+        await asyncio.gather(*[client_virtuel() for _ in range(nb_clients)])
+        duree = time.perf_counter() - debut
+
+    latences.sort()
+    return {
+        "requetes": len(latences),
+        "erreurs": erreurs,
+        "req_s": round(len(latences) / duree, 1),
+        "p50_ms": round(centile(latences, 0.50), 2),
+        "p95_ms": round(centile(latences, 0.95), 2),
+        "p99_ms": round(centile(latences, 0.99), 2),
+        "sql_par_requete": round((compteur[0] - requetes_sql) / len(latences), 2),
+    }
+
+
+def semer(engine, args) -> Jeu:
+    vider(engine)
+    categories = peupler_categories(engine)
+    user_ids = peupler_utilisateurs(engine, args.utilisateurs)
+    if engine.dialect.name == "postgresql":
+        peupler_transactions_serveur(engine, user_ids, args.utilisateurs * args.transactions, list(categories.values()))
+    else:
+        peupler_transactions(engine, user_ids, args.transactions, list(categories.values()))
+    peupler_budgets(engine, user_ids, args.budgets, list(categories.values()))
+
+    with creer_session(engine) as session:
+        # état d'une base en service : soldes et cumuls quotidiens initialisés
+        SoldeService(session).reconcilier()
+        CumulQuotidienService(session).reconstruire()
+        session.add(User(username="charge_login", password_hash=auth.hash_password(MOT_DE_PASSE)))
+        session.commit()
+        transactions, budgets = {u: [] for u in user_ids}, {u: [] for u in user_ids}
+        for user_id, transaction_id in session.execute(select(Transaction.utilisateur_id, Transaction.id).order_by(Transaction.id)):
+            transactions[user_id].append(transaction_id)
+        for user_id, budget_id in session.execute(select(Budget.utilisateur_id, Budget.id).order_by(Budget.id)):
+            budgets[user_id].append(budget_id)
+    registre_categories.invalider()
+    budget_status_cache.vider()
+
+    # les routes de monitoring exigent MONITORING_TOKEN : jeton éphémère s'il n'est pas défini
+    monitoring.MONITORING_TOKEN = monitoring.MONITORING_TOKEN or secrets.token_urlsafe(32)
+    entetes = {u: {"Authorization": f"Bearer {auth.create_access_token(u, f'bench_{u}')}"} for u in user_ids}
+    entetes[MONITORING] = {"Authorization": f"Bearer {monitoring.MONITORING_TOKEN}"}
+
+    return Jeu(
+        utilisateurs=user_ids,
+        entetes=entetes,
+        transactions=transactions,
+        budgets=budgets,
+        categories=categories,
+    )
+
+
+def comparer(resultats, precedent):
+    print(f"\ncomparaison avec {precedent['date']} ({precedent['dialecte']}) :")
+    for nom, r in resultats.items():
+        avant = precedent["routes"].get(nom)
+        if avant:
+            print(f"  {nom:<45} p50 {avant['p50_ms']:>8.2f} -> {r['p50_ms']:>8.2f} ms  "
+                  f"p99 {avant['p99_ms']:>8.2f} -> {r['p99_ms']:>8.2f} ms  "
+                  f"{avant['req_s']:>8.1f} -> {r['req_s']:>8.1f} req/s  "
+                  f"SQL {avant['sql_par_requete']:g} -> {r['sql_par_requete']:g}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--utilisateurs", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=500, help="transactions par utilisateur")
+    parser.add_argument("--budgets", type=int, default=24, help="budgets par utilisateur")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requetes", type=int, default=200, help="requêtes par route")
+    parser.add_argument("--routes", default=None, help="sous-chaînes séparées par des virgules (toutes les routes par défaut)")
+    parser.add_argument("--sortie", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--comparer", default=None, help="fichier JSON d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    filtres = args.routes.split(",") if args.routes else None
+    noms = [n for n in SCENARIOS if not filtres or any(f in n for f in filtres)]
+    if "DELETE /api/transactions/{transaction_id}" in noms and "POST /api/transactions/" not in noms:
+        parser.error("la route DELETE supprime les transactions créées par POST /api/transactions/")
+
+    url = args.database_url or os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = creer_moteur(url)
+    jeu = semer(engine, args)
+
+    compteur = [0]
+
+    def compter(*_):
+        compteur[0] += 1
+    event.listen(engine, "before_cursor_execute", compter)
+
+    def session_bench():
+        db = creer_session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = session_bench
+    resultats = {}
+    try:
+        asyncio.run(phase("GET /api/categories/", jeu, 2, 10, compteur))  # chauffe
+        for nom in noms:
+            resultats[nom] = asyncio.run(phase(nom, jeu, args.clients, args.requetes, compteur))
+    finally:
+        app.dependency_overrides.clear()
+        event.remove(engine, "before_cursor_execute", compter)
+
+    print(
+        f"{args.utilisateurs} utilisateurs, {args.transactions} transactions et {args.budgets} budgets par utilisateur "
+        f"({engine.dialect.name}) ; {args.requetes} requêtes par route, {args.clients} clients concurrents, "
+        f"BCRYPT_ROUNDS={auth.BCRYPT_ROUNDS}"
+    )
+    for nom, r in resultats.items():
+        print(f"  {nom:<45} {r['req_s']:>8.1f} req/s  p50={r['p50_ms']:.2f}  p95={r['p95_ms']:.2f}  "
+              f"p99={r['p99_ms']:.2f} ms  SQL/req={r['sql_par_requete']:g}  erreurs={r['erreurs']}")
+
+    rapport = {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "dialecte": engine.dialect.name,
+        "parametres": {k: v for k, v in vars(args).items() if k not in ("database_url", "sortie", "comparer")},
+        "bcrypt_rounds": auth.BCRYPT_ROUNDS,
+        "routes": resultats,
+    }
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+        print(f"résultats écrits dans {args.sortie}")
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            comparer(resultats, json.load(f))
+    return 1 if any(r["erreurs"] for r in resultats.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
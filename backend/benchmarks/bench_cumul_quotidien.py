@@ -0,0 +1,79 @@
+"""
+Compare les lectures de période (liste des budgets, total filtré sur un an) calculées
+sur les transactions puis sur les cumuls quotidiens, pour un historique de 5 ans.
+
+    cd backend && python -m benchmarks.bench_cumul_quotidien [--database-url postgresql://...] [--lignes N]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_budgets, peupler_categories, peupler_transactions,
+    peupler_transactions_serveur, peupler_utilisateurs, vider,
+)
+from scripts.cache_budget import budget_status_cache
+from scripts.cumul_quotidien import CumulQuotidienService
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TransactionService
+from scripts.solde_utilisateur import SoldeService
+
+
+def mesurer(session, user_id, repetitions):
+    budgets, transactions = BudgetService(session), TransactionService(session)
+    durees = {"liste des budgets": [], "total sur un an": []}
+    for _ in range(repetitions):
+        budget_status_cache.vider()
+        t0 = time.perf_counter()
+        budgets.get_budgets(user_id=user_id)
+        durees["liste des budgets"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        transactions.get_total_transactions(
+            user_id=user_id, date_debut="2023-01-01", date_fin="2023-12-31", type_filtre="DEPENSE"
+        )
+        durees["total sur un an"].append(time.perf_counter() - t0)
+    return {libelle: statistics.median(d) for libelle, d in durees.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--lignes", type=int, default=None, help="1 000 000 sur PostgreSQL, 200 000 sur SQLite par défaut")
+    parser.add_argument("--utilisateurs", type=int, default=10)
+    parser.add_argument("--budgets", type=int, default=200)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    postgres = engine.dialect.name == "postgresql"
+    nb_lignes = args.lignes or (1_000_000 if postgres else 200_000)
+
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_ids = peupler_utilisateurs(engine, args.utilisateurs)
+    if postgres:
+        peupler_transactions_serveur(engine, user_ids, nb_lignes, categories)
+    else:
+        peupler_transactions(engine, user_ids, nb_lignes // len(user_ids), categories)
+    peupler_budgets(engine, user_ids[:1], args.budgets, categories)
+
+    print(f"{nb_lignes} transactions sur 5 ans, {args.budgets} budgets ({engine.dialect.name}), médiane sur {args.repetitions} exécutions")
+    with creer_session(engine) as session:
+        # soldes présents mais cumuls non initialisés : lecture des transactions
+        SoldeService(session).reconcilier()
+        avant = mesurer(session, user_ids[0], args.repetitions)
+
+        t0 = time.perf_counter()
+        nb_cumuls = CumulQuotidienService(session).reconstruire()
+        print(f"reconstruction : {nb_cumuls} cumuls en {time.perf_counter() - t0:.1f} s")
+        apres = mesurer(session, user_ids[0], args.repetitions)
+
+    for libelle in avant:
+        print(f"{libelle}: transactions {avant[libelle] * 1000:.1f} ms -> cumuls {apres[libelle] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
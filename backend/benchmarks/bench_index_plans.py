@@ -0,0 +1,115 @@
+"""
+Vérifie par EXPLAIN que le planificateur utilise les index de init.sql pour les
+requêtes réellement émises par les services, sur un jeu de données volumineux.
+
+    cd backend && python -m benchmarks.bench_index_plans --database-url postgresql://... [--lignes 1000000]
+
+Sur PostgreSQL les lignes sont générées côté serveur puis ANALYZE est lancé. Sans URL,
+le contrôle tourne sur SQLite (EXPLAIN QUERY PLAN) avec moins de lignes. Dans les deux
+cas, chaque requête doit utiliser l'index attendu.
+Code de sortie 1 si une requête n'utilise pas l'index attendu.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date
+
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_budgets, peupler_categories,
+    peupler_transactions, peupler_transactions_serveur, peupler_utilisateurs, vider,
+)
+from mesure_requetes import mesurer
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TransactionService
+
+
+def _noms_index_postgres(noeud) -> set[str]:
+    noms = set()
+    if "Index Name" in noeud:
+        noms.add(noeud["Index Name"])
+    for enfant in noeud.get("Plans", []):
+        noms |= _noms_index_postgres(enfant)
+    return noms
+
+
+def expliquer(engine, statement, parameters) -> tuple[set[str], str]:
+    """Retourne (index utilisés, plan texte) pour une requête capturée."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            brut = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+            plan = brut if isinstance(brut, list) else json.loads(brut)
+            return _noms_index_postgres(plan[0]["Plan"]), json.dumps(plan[0]["Plan"], indent=1)
+        lignes = [str(l[-1]) for l in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        noms = {mot for l in lignes for mot in l.split() if mot.startswith("idx_")}
+        return noms, "\n".join(lignes)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--lignes", type=int, default=None, help="1 000 000 sur PostgreSQL, 100 000 sur SQLite par défaut")
+    parser.add_argument("--utilisateurs", type=int, default=1000)
+    parser.add_argument("--verbose", action="store_true", help="Affiche les plans complets")
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    postgres = engine.dialect.name == "postgresql"
+    nb_lignes = args.lignes or (1_000_000 if postgres else 100_000)
+
+    debut = time.perf_counter()
+    vider(engine)
+    categories = peupler_categories(engine)
+    user_ids = peupler_utilisateurs(engine, args.utilisateurs)
+    if postgres:
+        peupler_transactions_serveur(engine, user_ids, nb_lignes, list(categories.values()))
+    else:
+        peupler_transactions(engine, user_ids, nb_lignes // len(user_ids), list(categories.values()))
+    budget_ids = peupler_budgets(engine, user_ids[:1], 24, list(categories.values()))
+    print(f"{nb_lignes} transactions générées en {time.perf_counter() - debut:.1f} s ({engine.dialect.name})")
+
+    user_id = user_ids[0]
+    session = creer_session(engine)
+    transactions = TransactionService(session)
+    budgets = BudgetService(session)
+
+    # (libellé, appel du service, index attendu)
+    cas = [
+        ("liste utilisateur + période",
+         lambda: transactions.get_transactions(user_id=user_id, date_debut="2023-01-01", date_fin="2023-03-31"),
+         "idx_transactions_utilisateur_date"),
+        ("page suivante (curseur)",
+         lambda: transactions.get_transactions_page(limit=50, user_id=user_id),
+         "idx_transactions_utilisateur_date"),
+        ("total catégorie + type + période",
+         lambda: transactions.get_total_transactions(user_id=user_id, categorie_nom="Alimentation", type_filtre="DEPENSE", date_debut="2022-01-01", date_fin="2022-12-31"),
+         "idx_transactions_utilisateur_categorie_type_date"),
+        ("statut d'un budget",
+         lambda: budgets.get_budget_status(budget_ids[0]),
+         "idx_transactions_utilisateur_categorie_type_date"),
+        ("liste des budgets",
+         lambda: budgets.get_budgets(user_id=user_id, debut_periode=date(2021, 1, 1), fin_periode=date(2021, 3, 31)),
+         "idx_transactions_utilisateur_categorie_type_date"),
+    ]
+
+    echecs = 0
+    for libelle, appel, attendu in cas:
+        with mesurer(capturer=True) as mesure:
+            t0 = time.perf_counter()
+            appel()
+            duree = time.perf_counter() - t0
+        # la dernière requête porte l'accès aux transactions
+        statement, parameters = [c for c in mesure.requetes if "transactions" in c[0]][-1]
+        index, plan = expliquer(engine, statement, parameters)
+        ok = attendu in index
+        echecs += not ok
+        print(f"[{'OK' if ok else 'KO'}] {libelle:<34} {duree * 1000:8.1f} ms  index={sorted(index) or '-'} (attendu {attendu})")
+        if args.verbose or not ok:
+            print(plan)
+
+    session.close()
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Coût par ligne de GET /api/transactions/ (10 000 lignes par défaut) :
+- avant : objets ORM (get_transactions), TransactionRead.model_validate par ligne, puis
+  revalidation du response_model et jsonable_encoder + json.dumps comme le fait FastAPI ;
+- après : tuples (get_lignes_transactions) encodés directement (ligne_json + encoder_json).
+
+    cd backend && python -m benchmarks.bench_lecture_liste [--database-url postgresql://...] [--lignes N]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_categories, peupler_transactions, peupler_utilisateurs, vider,
+)
+from mesure_requetes import mesurer as mesurer_sql
+from schemas.transaction import TransactionRead
+from scripts.saisie_transaction import TransactionService, encoder_json, ligne_json
+
+REPONSE = TypeAdapter(list[TransactionRead])
+
+
+def avant(session, user_id):
+    transactions = [TransactionRead.model_validate(t) for t in TransactionService(session).get_transactions(user_id=user_id)]
+    contenu = jsonable_encoder(REPONSE.validate_python(transactions))
+    return json.dumps(contenu, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def apres(session, user_id):
+    return encoder_json([ligne_json(l) for l in TransactionService(session).get_lignes_transactions(user_id=user_id)])
+
+
+def mesurer(engine, lecture, user_id, repetitions):
+    durees, requetes = [], 0
+    for _ in range(repetitions):
+        # session neuve à chaque exécution : pas d'objets déjà présents dans l'identity map
+        with creer_session(engine) as session, mesurer_sql() as mesure:
+            t0 = time.perf_counter()
+            contenu = lecture(session, user_id)
+            durees.append(time.perf_counter() - t0)
+        requetes = mesure.nb_requetes
+    return statistics.median(durees), requetes, contenu
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--lignes", type=int, default=10_000)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_ids = peupler_utilisateurs(engine, 1)
+    peupler_transactions(engine, user_ids, args.lignes, categories)
+
+    print(f"{args.lignes} lignes ({engine.dialect.name}), médiane sur {args.repetitions} exécutions")
+    resultats = {
+        "avant : ORM + pydantic": mesurer(engine, avant, user_ids[0], args.repetitions),
+        "après : tuples + JSON direct": mesurer(engine, apres, user_ids[0], args.repetitions),
+    }
+    contenus = {contenu for _, _, contenu in resultats.values()}
+
+    for libelle, (duree, requetes, _) in resultats.items():
+        print(f"{libelle}: {duree * 1000:.1f} ms, {duree / args.lignes * 1e6:.2f} µs/ligne, {requetes} requête(s)")
+    print("réponses identiques" if len(contenus) == 1 else "ATTENTION : réponses différentes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
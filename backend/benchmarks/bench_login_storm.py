@@ -0,0 +1,124 @@
+"""
+Latence des endpoints de transactions pendant une rafale de connexions.
+
+Compare le hachage bcrypt dans les threads du serveur (BCRYPT_WORKERS=0) et dans le
+pool de processus borné : avec le pool, les logins excédentaires reçoivent un 503
+immédiat et le p99 de GET /api/transactions/total reste proche de sa valeur à vide.
+
+    cd backend && python -m benchmarks.bench_login_storm [--database-url postgresql://...]
+        [--connexions 16] [--clients 4] [--duree 5] [--workers 2] [--file 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+import auth
+from app import app
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_categories, peupler_transactions, vider,
+)
+from database import get_db
+from models.models import User
+from scripts import pool_bcrypt as bcrypt_pool
+from scripts.pool_bcrypt import PoolBcrypt
+
+MOT_DE_PASSE = "password123"
+
+
+def centile(valeurs, q):
+    valeurs = sorted(valeurs)
+    return valeurs[min(int(len(valeurs) * q), len(valeurs) - 1)] * 1000 if valeurs else float("nan")
+
+
+async def scenario(duree, nb_connexions, nb_clients, entetes):
+    latences, statuts_login, erreurs = [], {}, 0
+    fin = time.perf_counter() + duree
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def lecteur():
+            nonlocal erreurs
+            while time.perf_counter() < fin:
+                t0 = time.perf_counter()
+                r = await client.get("/api/transactions/total", headers=entetes)
+                latences.append(time.perf_counter() - t0)
+                erreurs += r.status_code != 200
+
+        async def connexion():
+            while time.perf_counter() < fin:
+                r = await client.post("/api/auth/login", json={"username": "bench_login", "password": MOT_DE_PASSE})
+                statuts_login[r.status_code] = statuts_login.get(r.status_code, 0) + 1
+                if r.status_code == 503:
+                    await asyncio.sleep(float(r.headers.get("Retry-After", "1")) / 10)
+
+        await asyncio.gather(*[lecteur() for _ in range(nb_clients)], *[connexion() for _ in range(nb_connexions)])
+
+    return {
+        "p50": centile(latences, 0.50),
+        "p99": centile(latences, 0.99),
+        "requetes": len(latences),
+        "erreurs": erreurs,
+        "logins": statuts_login,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--connexions", type=int, default=16, help="clients en boucle sur /api/auth/login")
+    parser.add_argument("--clients", type=int, default=4, help="clients en boucle sur /api/transactions/total")
+    parser.add_argument("--duree", type=float, default=5.0, help="durée de chaque scénario (secondes)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--file", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    # SQLite en mémoire n'accepte pas d'accès concurrents : base fichier temporaire par défaut
+    url = args.database_url or os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = creer_moteur(url)
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    with creer_session(engine) as db:
+        user = User(username="bench_login", password_hash=auth.hash_password(MOT_DE_PASSE))
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    peupler_transactions(engine, [user_id], 1000, categories)
+
+    def override_get_db():
+        db = creer_session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    entetes = {"Authorization": f"Bearer {auth.create_access_token(user_id, 'bench_login')}"}
+    pool_initial = bcrypt_pool.pool_bcrypt
+    cas = {
+        "à vide": (PoolBcrypt(workers=0), 0),
+        "rafale, bcrypt dans les threads": (PoolBcrypt(workers=0), args.connexions),
+        f"rafale, pool {args.workers} processus + file {args.file}": (PoolBcrypt(args.workers, args.file), args.connexions),
+    }
+    try:
+        print(f"BCRYPT_ROUNDS={auth.BCRYPT_ROUNDS}, {args.clients} lecteurs, {args.duree:.0f} s par scénario ({engine.dialect.name})")
+        for libelle, (pool, nb_connexions) in cas.items():
+            bcrypt_pool.pool_bcrypt = pool
+            if pool.workers:
+                pool.executer(bcrypt_pool.hacher, b"chauffe", 4)  # démarrage des processus hors mesure
+            r = asyncio.run(scenario(args.duree, nb_connexions, args.clients, entetes))
+            pool.arreter()
+            print(f"  {libelle:<45} total p50={r['p50']:.1f} ms  p99={r['p99']:.1f} ms  "
+                  f"({r['requetes']} requêtes, {r['erreurs']} en erreur)  logins={r['logins'] or '-'}")
+    finally:
+        bcrypt_pool.pool_bcrypt = pool_initial
+        app.dependency_overrides.clear()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Coût de sérialisation des réponses de liste, mesuré de bout en bout à travers FastAPI
+(client de test, sans base : les schémas sont construits une fois) :
+- jsonable_encoder + json.dumps : route sans response_model, JSONResponse de Starlette ;
+- response_model + JSONResponse : validation puis dump_json de pydantic (classe par défaut de FastAPI) ;
+- response_model + ReponseJSON : validation puis orjson, si ReponseJSON était passée telle quelle
+  en classe par défaut (FastAPI abandonne alors dump_json) ;
+- response_model + Default(ReponseJSON) : classe par défaut de l'application ;
+- ReponseJSON sans revalidation : schémas du service renvoyés directement par la route.
+
+    cd backend && python -m benchmarks.bench_serialisation [--transactions N] [--budgets N]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from reponses import REPONSE_PAR_DEFAUT, ReponseJSON
+from schemas.budget import BudgetStatus
+from schemas.transaction import TransactionRead
+
+
+def transactions(nombre):
+    debut = datetime(2021, 1, 1)
+    return [
+        TransactionRead(
+            id=i, montant=round(5 + i % 997 * 0.37, 2), libelle=f"Paiement carte n°{i}", type="DEPENSE" if i % 5 else "REVENU",
+            date=debut + timedelta(minutes=37 * i), categorie=("Alimentation", "Transport", "Santé")[i % 3]
+        )
+        for i in range(nombre)
+    ]
+
+
+def budgets(nombre):
+    return [
+        BudgetStatus(
+            id=i, categorie_id=1 + i % 3, montant_fixe=100.0 + i, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31),
+            montant_depense=round(i * 1.5 % 300, 2), montant_restant=round(100.0 + i - i * 1.5 % 300, 2),
+            pourcentage_consomme=round(i * 1.5 % 300 / (100.0 + i) * 100, 2), est_depasse=i * 1.5 % 300 > 100.0 + i
+        )
+        for i in range(nombre)
+    ]
+
+
+def application(schema, contenu):
+    """Une route par chemin de sérialisation, renvoyant toutes la même liste de schémas."""
+    reference = FastAPI()
+    sans_defaut = FastAPI(default_response_class=ReponseJSON)
+    defaut = FastAPI(default_response_class=REPONSE_PAR_DEFAUT)
+
+    @reference.get("/jsonable_encoder")
+    def sans_response_model():
+        return contenu
+
+    @reference.get("/response_model", response_model=list[schema])
+    def avec_response_model():
+        return contenu
+
+    @sans_defaut.get("/response_model", response_model=list[schema])
+    def avec_response_model_orjson():
+        return contenu
+
+    @defaut.get("/response_model", response_model=list[schema])
+    def avec_response_model_defaut():
+        return contenu
+
+    @defaut.get("/directe", response_model=list[schema])
+    def sans_revalidation():
+        return ReponseJSON(contenu)
+
+    reference.mount("/orjson", sans_defaut)
+    reference.mount("/defaut", defaut)
+    return reference
+
+
+CHEMINS = {
+    "jsonable_encoder + json.dumps": "/jsonable_encoder",
+    "response_model + JSONResponse": "/response_model",
+    "response_model + ReponseJSON": "/orjson/response_model",
+    "response_model + Default(ReponseJSON)": "/defaut/response_model",
+    "ReponseJSON sans revalidation": "/defaut/directe",
+}
+
+
+def mesurer(client, url, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        reponse = client.get(url)
+        durees.append(time.perf_counter() - t0)
+    return statistics.median(durees), reponse.content
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--budgets", type=int, default=1_000)
+    parser.add_argument("--repetitions", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    print(f"médiane sur {args.repetitions} requêtes")
+    for libelle, schema, contenu in (
+        (f"{args.transactions} TransactionRead", TransactionRead, transactions(args.transactions)),
+        (f"{args.budgets} BudgetStatus", BudgetStatus, budgets(args.budgets)),
+    ):
+        print(libelle)
+        with TestClient(application(schema, contenu)) as client:
+            resultats = {chemin: mesurer(client, url, args.repetitions) for chemin, url in CHEMINS.items()}
+
+        reference = json.loads(JSONResponse(jsonable_encoder(contenu)).body)
+        for chemin, (duree, corps) in resultats.items():
+            identique = "" if json.loads(corps) == reference else " ATTENTION : contenu différent"
+            print(f"  {chemin}: {duree * 1000:.1f} ms, {len(corps) / 1024:.0f} Kio{identique}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Séries mensuelles par catégorie sur un historique de 5 ans : compare le regroupement
+côté client (toutes les transactions chargées puis regroupées en Python, ce que ferait
+le frontend depuis GET /api/transactions/) au regroupement en SQL de GET /series,
+depuis les transactions puis depuis les cumuls quotidiens. Affiche aussi la taille JSON
+de chaque réponse.
+
+    cd backend && python -m benchmarks.bench_series [--database-url postgresql://...] [--par-utilisateur N]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.seed import (
+    creer_moteur, creer_session, peupler_categories, peupler_transactions, peupler_utilisateurs, vider,
+)
+from schemas.transaction import TransactionRead, TransactionSerie
+from scripts.cumul_quotidien import CumulQuotidienService
+from scripts.saisie_transaction import TransactionService
+from scripts.solde_utilisateur import SoldeService, montant_signe
+
+
+def regroupement_client(service, user_id, granularite):
+    transactions = [TransactionRead.model_validate(t) for t in service.get_transactions(user_id=user_id)]
+    reponse = json.dumps([t.model_dump(mode="json") for t in transactions])
+
+    totaux = defaultdict(float)
+    for t in json.loads(reponse):
+        totaux[(t["date"][:7 if granularite == "month" else 10], t["categorie"])] += montant_signe(t["montant"], t["type"])
+    return reponse
+
+
+def regroupement_sql(service, user_id, granularite):
+    return TransactionSerie.model_validate(
+        service.get_series(granularite, "categorie", user_id=user_id)
+    ).model_dump_json()
+
+
+def chronometrer(appel, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        reponse = appel()
+        durees.append(time.perf_counter() - t0)
+    return statistics.median(durees), len(reponse)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--par-utilisateur", type=int, default=20_000, help="transactions de l'utilisateur mesuré (5 ans)")
+    parser.add_argument("--granularite", choices=["day", "week", "month"], default="month")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    vider(engine)
+    categories = list(peupler_categories(engine).values())
+    user_ids = peupler_utilisateurs(engine, 1)
+    peupler_transactions(engine, user_ids, args.par_utilisateur, categories)
+
+    print(
+        f"{args.par_utilisateur} transactions sur 5 ans, granularité {args.granularite} "
+        f"({engine.dialect.name}), médiane sur {args.repetitions} exécutions"
+    )
+    with creer_session(engine) as session:
+        service = TransactionService(session)
+        cas = {
+            "client (liste complète)": lambda: regroupement_client(service, user_ids[0], args.granularite),
+            "SQL depuis les transactions": lambda: regroupement_sql(service, user_ids[0], args.granularite),
+        }
+        resultats = {libelle: chronometrer(appel, args.repetitions) for libelle, appel in cas.items()}
+
+        SoldeService(session).reconcilier()
+        CumulQuotidienService(session).reconstruire()
+        resultats["SQL depuis les cumuls"] = chronometrer(
+            lambda: regroupement_sql(service, user_ids[0], args.granularite), args.repetitions
+        )
+
+    for libelle, (duree, taille) in resultats.items():
+        print(f"{libelle}: {duree * 1000:.1f} ms, réponse {taille / 1024:.1f} Kio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark de régression mémoire pour TransactionService.get_total_transactions.
+
+Mesure (tracemalloc) le pic d'allocation du calcul du total pour des historiques
+de taille croissante, et le compare au chargement complet des transactions
+(ancien comportement). Échoue (code 1) si le pic de l'agrégat SQL croît avec le
+nombre de lignes.
+
+    cd backend && python -m benchmarks.bench_total_memory [--tailles 1000 10000 100000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.seed import creer_moteur, creer_session, peupler_categories, peupler_transactions, peupler_utilisateurs, vider
+from scripts.saisie_transaction import TransactionService
+
+# Tolérance sur la croissance du pic mémoire entre la plus petite et la plus grande taille
+CROISSANCE_MAX = 1.5
+
+
+def mesurer(fn):
+    tracemalloc.start()
+    debut = time.perf_counter()
+    fn()
+    duree = time.perf_counter() - debut
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pic, duree
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args(argv)
+
+    engine = creer_moteur(args.database_url)
+    resultats = []
+
+    for taille in sorted(args.tailles):
+        vider(engine)
+        categories = peupler_categories(engine)
+        (user_id,) = peupler_utilisateurs(engine, 1)
+        peupler_transactions(engine, [user_id], taille, list(categories.values()))
+
+        session = creer_session(engine)
+        service = TransactionService(session)
+        # Préchauffage (compilation des requêtes, cache de statements)
+        service.get_total_transactions(user_id=user_id)
+
+        pic_sql, duree_sql = mesurer(lambda: service.get_total_transactions(user_id=user_id))
+        session.expunge_all()
+        pic_orm, duree_orm = mesurer(lambda: service.get_transactions(user_id=user_id))
+        session.close()
+
+        resultats.append((taille, pic_sql, duree_sql, pic_orm, duree_orm))
+        print(
+            f"{taille:>9} lignes | SUM(CASE) pic={pic_sql / 1024:9.1f} Kio {duree_sql * 1000:8.1f} ms"
+            f" | chargement ORM pic={pic_orm / 1024:11.1f} Kio {duree_orm * 1000:9.1f} ms"
+        )
+
+    if len(resultats) < 2:
+        return 0
+
+    croissance = resultats[-1][1] / max(resultats[0][1], 1)
+    print(f"Croissance du pic mémoire de l'agrégat : x{croissance:.2f} (max x{CROISSANCE_MAX})")
+    if croissance > CROISSANCE_MAX:
+        print("ÉCHEC : la mémoire du calcul du total dépend du nombre de transactions", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
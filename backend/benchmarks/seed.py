@@ -0,0 +1,155 @@
+"""
+Outils communs aux benchmarks : création du moteur et peuplement de la base.
+
+Par défaut les benchmarks tournent sur une base SQLite en mémoire (stand-in local) ;
+passer une URL PostgreSQL via --database-url ou BENCH_DATABASE_URL pour mesurer
+sur la vraie base. Le peuplement est déterministe (graine fixe).
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from database import Base
+from models.models import Budget, Categorie, Transaction, User
+from scripts.registre_categories import registre_categories
+
+# Mêmes catégories que init.sql
+CATEGORIES = [
+    "Alimentation", "Logement", "Transports", "Loisirs", "Santé", "Vêtements",
+    "Éducation", "Épargne", "Factures", "Revenus", "Autres",
+]
+
+DATE_ORIGINE = datetime(2021, 1, 1)
+
+
+def url_par_defaut() -> str:
+    return os.getenv("BENCH_DATABASE_URL", "sqlite://")
+
+
+def creer_moteur(url: str | None = None):
+    """Crée le moteur de benchmark et le schéma depuis les modèles."""
+    url = url or url_par_defaut()
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # une seule connexion partagée, sinon chaque connexion verrait une base vide
+        engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    elif url.startswith("sqlite"):
+        # fichier : une connexion par session, sans plafond de pool
+        engine = create_engine(url, poolclass=NullPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def creer_session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)()
+
+
+def vider(engine):
+    """Supprime les données de benchmark (les tables restent en place)."""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    # écritures hors session ORM : le registre des catégories n'est pas invalidé au commit
+    registre_categories.invalider()
+
+
+def peupler_categories(engine) -> dict[str, int]:
+    with engine.begin() as conn:
+        if conn.execute(Categorie.__table__.select().limit(1)).first() is None:
+            conn.execute(insert(Categorie), [{"nom": nom} for nom in CATEGORIES])
+            registre_categories.invalider()
+        rows = conn.execute(Categorie.__table__.select()).all()
+    return {r.nom: r.id for r in rows}
+
+
+def peupler_utilisateurs(engine, nb_utilisateurs: int) -> list[int]:
+    with engine.begin() as conn:
+        existants = len(conn.execute(User.__table__.select()).all())
+        conn.execute(insert(User), [
+            {"username": f"bench_{existants + i}", "password_hash": "x"}
+            for i in range(nb_utilisateurs)
+        ])
+        rows = conn.execute(User.__table__.select().order_by(User.id)).all()
+    return [r.id for r in rows[existants:]]
+
+
+def peupler_transactions(
+    engine,
+    user_ids: list[int],
+    nb_par_utilisateur: int,
+    categorie_ids: list[int],
+    jours: int = 5 * 365,
+    graine: int = 42,
+    lot: int = 10_000,
+):
+    """Insère nb_par_utilisateur transactions par utilisateur, réparties sur `jours` jours."""
+    rng = random.Random(graine)
+    buffer = []
+    with engine.begin() as conn:
+        for user_id in user_ids:
+            for _ in range(nb_par_utilisateur):
+                est_revenu = rng.random() < 0.1
+                buffer.append({
+                    "montant": round(rng.uniform(1, 2500 if est_revenu else 150), 2),
+                    "libelle": "bench",
+                    "type": "REVENU" if est_revenu else "DEPENSE",
+                    "date": DATE_ORIGINE + timedelta(minutes=rng.randrange(jours * 24 * 60)),
+                    "categorie_id": rng.choice(categorie_ids),
+                    "utilisateur_id": user_id,
+                })
+                if len(buffer) >= lot:
+                    conn.execute(insert(Transaction), buffer)
+                    buffer.clear()
+        if buffer:
+            conn.execute(insert(Transaction), buffer)
+
+
+def peupler_transactions_serveur(engine, user_ids: list[int], nb_total: int, categorie_ids: list[int], jours: int = 5 * 365):
+    """
+    Variante PostgreSQL de peupler_transactions : génère les lignes côté serveur
+    (generate_series), ce qui rend réaliste un jeu d'un million de lignes.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO transactions (montant, libelle, type, date, categorie_id, utilisateur_id)
+            SELECT round((1 + random() * 149)::numeric, 2),
+                   'bench',
+                   CASE WHEN random() < 0.1 THEN 'REVENU' ELSE 'DEPENSE' END,
+                   :origine + random() * make_interval(days => :jours),
+                   (:categories)[1 + (g % cardinality(:categories))],
+                   (:utilisateurs)[1 + (g % cardinality(:utilisateurs))]
+            FROM generate_series(1, :nb) AS g
+        """), {
+            "origine": DATE_ORIGINE, "jours": jours, "nb": nb_total,
+            "categories": list(categorie_ids), "utilisateurs": list(user_ids),
+        })
+        conn.execute(text("ANALYZE transactions"))
+
+
+def peupler_budgets(engine, user_ids: list[int], nb_par_utilisateur: int, categorie_ids: list[int], graine: int = 42) -> list[int]:
+    """Crée des budgets mensuels successifs (sans chevauchement) pour chaque utilisateur."""
+    rng = random.Random(graine)
+    lignes = []
+    for user_id in user_ids:
+        for i in range(nb_par_utilisateur):
+            categorie_id = categorie_ids[i % len(categorie_ids)]
+            mois = i // len(categorie_ids)
+            debut = (DATE_ORIGINE + timedelta(days=31 * mois)).date().replace(day=1)
+            fin = (debut + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            lignes.append({
+                "montant_fixe": round(rng.uniform(50, 800), 2),
+                "debut_periode": debut,
+                "fin_periode": fin,
+                "categorie_id": categorie_id,
+                "utilisateur_id": user_id,
+            })
+    with engine.begin() as conn:
+        conn.execute(insert(Budget), lignes)
+        rows = conn.execute(Budget.__table__.select().order_by(Budget.id)).all()
+    return [r.id for r in rows[-len(lignes):]] if lignes else []
+
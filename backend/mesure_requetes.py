@@ -0,0 +1,151 @@
+"""
+Requêtes SQL par requête HTTP : nombre, temps cumulé en base et requête la plus lente.
+
+Les hooks before/after_cursor_execute sont posés sur la classe Engine (tous les moteurs,
+synchrones ou sync_engine des moteurs asynchrones) et alimentent la mesure du contexte
+courant (ContextVar, propagée au threadpool et aux greenlets de run_sync). Le middleware
+ouvre une mesure par requête HTTP, l'expose dans l'en-tête Server-Timing et écrit une
+ligne de journal JSON à la fin de la réponse. Hors requête (scripts, tests de service,
+bancs), mesurer() ouvre une mesure sur un bloc ; mesurer(capturer=True) y conserve en plus
+chaque requête exécutée avec ses paramètres.
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+journal = logging.getLogger("api.requetes")
+
+# longueur maximale de la requête la plus lente dans le journal
+TAILLE_SQL_JOURNAL = 300
+
+_SERVER_TIMING_SQL = re.compile(r'(?:^|,)\s*db;dur=[\d.]+;desc="(\d+) requete\(s\)"')
+
+
+@dataclass
+class MesureRequetes:
+    nb_requetes: int = 0
+    duree_sql: float = 0.0
+    duree_max: float = 0.0
+    plus_lente: str | None = None
+    # (statement, paramètres) de chaque requête, conservés seulement avec mesurer(capturer=True)
+    requetes: list[tuple[str, object]] | None = None
+
+    def enregistrer(self, statement: str, parameters, duree: float) -> None:
+        self.nb_requetes += 1
+        self.duree_sql += duree
+        if duree >= self.duree_max:
+            self.duree_max, self.plus_lente = duree, statement
+        if self.requetes is not None:
+            self.requetes.append((statement, parameters))
+
+
+_mesure_courante: ContextVar[MesureRequetes | None] = ContextVar("mesure_requetes", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _avant(conn, cursor, statement, parameters, context, executemany):
+    if _mesure_courante.get() is not None:
+        conn.info.setdefault("debuts_mesure", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _apres(conn, cursor, statement, parameters, context, executemany):
+    mesure = _mesure_courante.get()
+    debuts = conn.info.get("debuts_mesure")
+    if mesure is not None and debuts:
+        mesure.enregistrer(statement, parameters, time.perf_counter() - debuts.pop())
+
+
+@contextmanager
+def mesurer(capturer: bool = False):
+    """
+    Mesure les requêtes SQL exécutées dans le bloc (même contexte ou threads qui en héritent) ;
+    avec capturer=True, mesure.requetes liste aussi les (statement, paramètres) exécutés.
+    """
+    mesure = MesureRequetes(requetes=[] if capturer else None)
+    jeton = _mesure_courante.set(mesure)
+    try:
+        yield mesure
+    finally:
+        _mesure_courante.reset(jeton)
+
+
+def server_timing(mesure: MesureRequetes, duree_totale: float) -> str:
+    return (
+        f'db;dur={mesure.duree_sql * 1000:.2f};desc="{mesure.nb_requetes} requete(s)", '
+        f"db-max;dur={mesure.duree_max * 1000:.2f}, app;dur={duree_totale * 1000:.2f}"
+    )
+
+
+def requetes_sql(reponse) -> int:
+    """Nombre de requêtes SQL d'une réponse, lu dans son en-tête Server-Timing."""
+    trouve = _SERVER_TIMING_SQL.search(reponse.headers.get("server-timing", ""))
+    if trouve is None:
+        raise ValueError("Réponse sans mesure SQL dans Server-Timing")
+    return int(trouve.group(1))
+
+
+class MesureRequetesMiddleware:
+    """
+    Middleware ASGI pur (pas de BaseHTTPMiddleware : les réponses en flux ne sont pas
+    mises en tampon). L'en-tête est calculé au début de la réponse ; la ligne de journal
+    à la fin du corps, et compte donc aussi les requêtes d'une réponse en flux.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debut = time.perf_counter()
+        statut = 500
+
+        async def envoyer(message):
+            nonlocal statut
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+                entetes = list(message.get("headers", []))
+                entetes.append((b"server-timing", server_timing(mesure, time.perf_counter() - debut).encode("latin-1")))
+                message = {**message, "headers": entetes}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._journaliser(scope, statut, mesure, time.perf_counter() - debut)
+            await send(message)
+
+        with mesurer() as mesure:
+            await self.app(scope, receive, envoyer)
+
+    @staticmethod
+    def _journaliser(scope, statut, mesure, duree):
+        if not journal.isEnabledFor(logging.INFO):
+            return
+        route = scope.get("route")
+        journal.info(json.dumps({
+            "methode": scope["method"],
+            "route": getattr(route, "path", scope["path"]),
+            "statut": statut,
+            "duree_ms": round(duree * 1000, 2),
+            "requetes_sql": mesure.nb_requetes,
+            "duree_sql_ms": round(mesure.duree_sql * 1000, 2),
+            "sql_max_ms": round(mesure.duree_max * 1000, 2),
+            "sql_max": mesure.plus_lente[:TAILLE_SQL_JOURNAL] if mesure.plus_lente else None,
+        }, ensure_ascii=False))
+
+
+def configurer_journal(environ=os.environ) -> None:
+    """Lignes JSON sur la sortie d'erreur ; niveau LOG_REQUETES (INFO par défaut, WARNING pour les couper)."""
+    journal.setLevel(environ.get("LOG_REQUETES", "INFO").upper())
+    if not journal.handlers:
+        sortie = logging.StreamHandler()
+        sortie.setFormatter(logging.Formatter("%(message)s"))
+        journal.addHandler(sortie)
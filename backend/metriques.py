@@ -0,0 +1,151 @@
+"""
+Métriques Prometheus de l'API (GET /metrics).
+
+- requêtes HTTP par gabarit de route (/api/transactions/{transaction_id}, ...) : compteur,
+  histogramme de latence, requêtes en cours ;
+- état du processus publié au plus une fois par seconde et à chaque collecte : pool de
+  connexions, cache des statuts de budget, pool bcrypt.
+
+Plusieurs workers uvicorn : définir PROMETHEUS_MULTIPROC_DIR (répertoire vidé au démarrage
+du service) ; chaque processus écrit ses valeurs dans des fichiers mmap et /metrics agrège
+tous les workers. Sans cette variable, les métriques sont celles du processus qui répond.
+
+/metrics exige `Authorization: Bearer <MONITORING_TOKEN>` (voir routers/monitoring.py).
+"""
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from database import stats_pool
+from scripts.cache_budget import budget_status_cache
+from scripts.pool_bcrypt import pool_bcrypt
+
+# routes sans gabarit (404) regroupées : nombre de séries borné
+ROUTE_INCONNUE = "inconnue"
+
+# intervalle minimal entre deux publications de l'état du processus (secondes)
+INTERVALLE_ETAT = 1.0
+
+SEUILS_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+requetes_http = Counter("http_requests_total", "Requêtes HTTP traitées", ["method", "route", "status"])
+latence_http = Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP, jusqu'à la fin du corps", ["method", "route"],
+    buckets=SEUILS_LATENCE,
+)
+requetes_en_cours = Gauge("http_requests_in_flight", "Requêtes HTTP en cours", multiprocess_mode="livesum")
+
+pool_connexions = Gauge(
+    "db_pool_connections", "Connexions du pool par état", ["state"], multiprocess_mode="livesum"
+)
+checkouts_pool = Counter("db_pool_checkouts_total", "Connexions obtenues du pool")
+attente_pool = Counter("db_pool_checkout_wait_seconds_total", "Attente cumulée pour obtenir une connexion")
+timeouts_pool = Counter("db_pool_checkout_timeouts_total", "Attentes de connexion expirées")
+
+taille_cache = Gauge("budget_cache_entries", "Entrées du cache des statuts de budget", multiprocess_mode="livesum")
+evenements_cache = Counter("budget_cache_events_total", "Lectures et retraits du cache des statuts de budget", ["event"])
+
+bcrypt_en_cours = Gauge("bcrypt_in_flight", "Appels bcrypt en cours ou en file", multiprocess_mode="livesum")
+bcrypt_executes = Counter("bcrypt_calls_total", "Appels bcrypt exécutés")
+bcrypt_rejets = Counter("bcrypt_rejected_total", "Appels bcrypt refusés (file pleine, HTTP 503)")
+
+
+class _Cumuls:
+    """Convertit les compteurs cumulés des composants en incréments Prometheus (remises à zéro comprises)."""
+
+    def __init__(self):
+        self._precedents: dict = {}
+
+    def publier(self, compteur, valeur: float, *labels) -> None:
+        precedent = self._precedents.get((compteur, labels), 0)
+        increment = valeur - precedent if valeur >= precedent else valeur
+        self._precedents[(compteur, labels)] = valeur
+        if increment:
+            (compteur.labels(*labels) if labels else compteur).inc(increment)
+
+
+_cumuls = _Cumuls()
+_verrou_etat = threading.Lock()
+_derniere_publication = 0.0
+
+
+def publier_etat(forcer: bool = False) -> None:
+    """Recopie l'état du pool de connexions, du cache et du pool bcrypt dans les métriques."""
+    global _derniere_publication
+    maintenant = time.monotonic()
+    if not forcer and maintenant - _derniere_publication < INTERVALLE_ETAT:
+        return
+    if not _verrou_etat.acquire(blocking=False):
+        return
+    try:
+        _derniere_publication = maintenant
+        pool = stats_pool()
+        for etat in ("en_cours", "disponibles", "overflow"):
+            if etat in pool:
+                pool_connexions.labels(etat).set(pool[etat])
+        _cumuls.publier(checkouts_pool, pool["checkouts"])
+        _cumuls.publier(attente_pool, pool["attente_moyenne_ms"] * pool["checkouts"] / 1000)
+        _cumuls.publier(timeouts_pool, pool["timeouts"])
+
+        cache = budget_status_cache.stats()
+        taille_cache.set(cache["taille"])
+        for evenement in ("hits", "misses", "evictions", "invalidations"):
+            _cumuls.publier(evenements_cache, cache[evenement], evenement)
+
+        bcrypt = pool_bcrypt.stats()
+        bcrypt_en_cours.set(bcrypt["en_cours"])
+        _cumuls.publier(bcrypt_executes, bcrypt["executes"])
+        _cumuls.publier(bcrypt_rejets, bcrypt["rejets"])
+    finally:
+        _verrou_etat.release()
+
+
+def exposer() -> tuple[bytes, str]:
+    """Corps et Content-Type de /metrics (agrégat des workers en mode multiprocessus)."""
+    publier_etat(forcer=True)
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registre = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registre)
+        return generate_latest(registre), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def fin_processus() -> None:
+    """Retire les jauges du processus qui s'arrête (mode multiprocessus)."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetriquesMiddleware:
+    """Middleware ASGI pur : compte et chronomètre chaque requête HTTP par gabarit de route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debut = time.perf_counter()
+        statut = 500
+
+        async def envoyer(message):
+            nonlocal statut
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+            await send(message)
+
+        requetes_en_cours.inc()
+        try:
+            await self.app(scope, receive, envoyer)
+        finally:
+            requetes_en_cours.dec()
+            route = getattr(scope.get("route"), "path", ROUTE_INCONNUE)
+            latence_http.labels(scope["method"], route).observe(time.perf_counter() - debut)
+            requetes_http.labels(scope["method"], route, str(statut)).inc()
+            publier_etat()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Boolean, Column, Integer, String, Float, Numeric, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from database import Base
 import enum
@@ -52,6 +52,15 @@ class Transaction(Base):
 
     categorie_obj = relationship("Categorie", back_populates="transactions")
 
+    # index alignés sur les requêtes des services (mêmes définitions que init.sql)
+    __table_args__ = (
+        # listes et totaux : utilisateur + période, ordre (date, id) décroissant de la pagination
+        Index('idx_transactions_utilisateur_date', utilisateur_id, date.desc(), id.desc()),
+        # filtres catégorie / type en plus de l'utilisateur et de la période ; consommation des budgets
+        # (propriétaire, catégorie, DEPENSE, plage de dates semi-ouverte)
+        Index('idx_transactions_utilisateur_categorie_type_date', utilisateur_id, categorie_id, type, date),
+    )
+
     # getter qui renvoie le nom de la catégorie
     @property
     def categorie(self):
@@ -88,6 +97,30 @@ class Budget(Base):
     utilisateur_id = Column(Integer, nullable=True)
 
 
+class SoldeUtilisateur(Base):
+    """Solde courant (revenus - dépenses) d'un utilisateur, maintenu à chaque écriture de transaction"""
+    __tablename__ = "solde_utilisateur"
+
+    # mêmes types et contraintes que init.sql : le solde est incrémenté en SQL, sans dérive d'arrondi
+    utilisateur_id = Column(Integer, ForeignKey('utilisateur.id', ondelete='CASCADE'), primary_key=True)
+    solde = Column(Numeric(14, 2, asdecimal=False), nullable=False, default=0.0)
+    # vrai une fois les cumuls quotidiens de l'utilisateur initialisés : ils sont alors lus à la place des transactions
+    cumuls_initialises = Column(Boolean, nullable=False, default=False)
+
+
+class CumulQuotidien(Base):
+    """Somme et nombre des transactions par (utilisateur, catégorie, type, jour), maintenus à chaque écriture"""
+    __tablename__ = "cumul_quotidien"
+
+    # mêmes types et contraintes que init.sql (voir SoldeUtilisateur)
+    utilisateur_id = Column(Integer, ForeignKey('utilisateur.id', ondelete='CASCADE'), primary_key=True)
+    categorie_id = Column(Integer, ForeignKey('categorie.id', ondelete='RESTRICT'), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    jour = Column(Date, primary_key=True)
+    montant_total = Column(Numeric(14, 2, asdecimal=False), nullable=False, default=0.0)
+    nb_transactions = Column(Integer, nullable=False, default=0)
+
+
 class User(Base):
     __tablename__ = "utilisateur"
 
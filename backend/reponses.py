@@ -0,0 +1,43 @@
+"""
+Réponse JSON par défaut de l'API, encodée par orjson.
+"""
+from functools import lru_cache
+
+import orjson
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+
+
+@lru_cache
+def _serialiseur_liste(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+class ReponseJSON(JSONResponse):
+    """
+    Même sortie que JSONResponse (UTF-8, compacte), encodée par orjson.
+    Une route peut renvoyer directement ReponseJSON(...) quand le service produit déjà des
+    données validées : le response_model n'est alors pas réappliqué (il ne sert plus qu'à
+    la documentation).
+    - bytes : déjà encodé par le service, renvoyé tel quel ;
+    - schéma ou liste de schémas d'un même type : sérialiseur pydantic, sans validation ;
+    - autre contenu : orjson.
+    """
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return to_json(content)
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            schema = type(content[0])
+            if all(type(element) is schema for element in content):
+                return _serialiseur_liste(schema).dump_json(content)
+        return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Classe par défaut de l'application. Enveloppée dans Default comme celle de FastAPI : les
+# routes à response_model gardent la sérialisation directe en JSON de pydantic (validation
+# puis dump_json), les autres passent par ReponseJSON au lieu de json.dumps.
+REPONSE_PAR_DEFAUT = Default(ReponseJSON)
@@ -1,21 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, field_validator
 from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_session
 from auth import (
-    register_user,
-    authenticate_user,
+    register_user_async,
+    authenticate_user_async,
     create_access_token,
     UserAlreadyExistsError,
     InvalidCredentialsError
 )
+from scripts.pool_bcrypt import ServiceSatureError
 
 router = APIRouter(
     prefix="/api/auth",
     tags=["auth"]
 )
 
+# délai conseillé au client quand le pool bcrypt est saturé (secondes)
+RETRY_AFTER_SATURATION = "1"
+
+
+def _service_sature(e: ServiceSatureError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": RETRY_AFTER_SATURATION}
+    )
+
 
 class RegisterRequest(BaseModel):
     username: str
@@ -51,9 +64,9 @@ class RegisterResponse(BaseModel):
 
 
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     request: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: Session | AsyncSession = Depends(get_session)
 ):
     """
     Enregistre un nouvel utilisateur
@@ -61,7 +74,7 @@ def register(
     Retourne un identifiant unique pour l'utilisateur créé
     """
     try:
-        user = register_user(request.username, request.password, db)
+        user = await register_user_async(request.username, request.password, db)
         return RegisterResponse(
             user_id=user.id,
             username=user.username,
@@ -72,6 +85,8 @@ def register(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
+    except ServiceSatureError as e:
+        raise _service_sature(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -85,15 +100,15 @@ def register(
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(
+async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: Session | AsyncSession = Depends(get_session)
 ):
     """
     Authentifie un utilisateur et retourne un token JWT
     """
     try:
-        user = authenticate_user(request.username, request.password, db)
+        user = await authenticate_user_async(request.username, request.password, db)
         expires_delta = timedelta(days=365) if getattr(request, "rememberMe", False) else None
         access_token = create_access_token(user.id, user.username, expires_delta=expires_delta)
         
@@ -108,6 +123,8 @@ def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e)
         )
+    except ServiceSatureError as e:
+        raise _service_sature(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
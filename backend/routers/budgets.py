@@ -1,30 +1,34 @@
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from database import get_db
-from scripts.saisie_budget import BudgetService
+from database import get_session
+from scripts.services_async import BudgetServiceAsync
 from schemas.budget import BudgetCreate, BudgetFilterParams, BudgetRead, BudgetStatus, BudgetUpdate
 from models.models import BudgetAlreadyExistsError, BudgetNotFoundError, CategorieNotFoundError, User
 from auth import get_current_user_from_header
+from reponses import ReponseJSON
 
 router = APIRouter(
     prefix="/api/budgets",
     tags=["budgets"]
 )
 
+# helper pour instancier le service (session synchrone ou asynchrone selon DB_MODE)
+def get_budget_service(db: Session | AsyncSession = Depends(get_session)) -> BudgetServiceAsync:
+    return BudgetServiceAsync(db)
+
 @router.post("/", response_model=BudgetRead, status_code=status.HTTP_201_CREATED)
-def create_budget(
+async def create_budget(
     budget: BudgetCreate,
-    db: Session = Depends(get_db),
+    service: BudgetServiceAsync = Depends(get_budget_service),
     current_user: User = Depends(get_current_user_from_header)
 ):
 
     try :
-        service = BudgetService(db)
-
-        nouveau_budget = service.add_budget(
+        nouveau_budget = await service.add_budget(
             categorie_id=budget.categorie_id,
             montant=budget.montant_fixe,
             date_debut=budget.debut_periode,
@@ -43,19 +47,42 @@ def create_budget(
     except Exception:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
     
+# déclarée avant /{budget_id}, sinon "status" serait lu comme un identifiant
+@router.get("/status", response_model=list[BudgetStatus])
+async def get_budgets_status(
+    ids: str = Query(..., description="Identifiants séparés par des virgules, ex. 1,2,3"),
+    service: BudgetServiceAsync = Depends(get_budget_service),
+    current_user: User = Depends(get_current_user_from_header)
+):
+    """
+    Statuts de plusieurs budgets en un appel (tableau de bord).
+    Les budgets inconnus ou d'un autre utilisateur sont absents de la réponse.
+    """
+    try:
+        budget_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids doit être une liste d'entiers séparés par des virgules")
+
+    try:
+        # statuts construits par le service : pas de revalidation du response_model
+        return ReponseJSON(await service.get_budgets_status(budget_ids, user_id=current_user.id))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+
 @router.get("/{budget_id}", response_model=BudgetStatus)
-def get_budget_status(
+async def get_budget_status(
     budget_id: int,
-    db: Session = Depends(get_db),
+    service: BudgetServiceAsync = Depends(get_budget_service),
     current_user: User = Depends(get_current_user_from_header)
 ):
     """
     Récupère l'état d'un budget (consommé, restant) par son ID.
     """
-    service = BudgetService(db)
     try:
-        budget_status = service.get_budget_status(budget_id)
-        return budget_status
+        budget_status = await service.get_budget_status(budget_id, user_id=current_user.id)
+        return ReponseJSON(budget_status)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except BudgetNotFoundError as e:
@@ -64,15 +91,14 @@ def get_budget_status(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal Server Error")
     
 @router.get("/", response_model=list[BudgetStatus])
-def get_budgets(
+async def get_budgets(
     params: BudgetFilterParams = Depends(),
-    db: Session = Depends(get_db),
+    service: BudgetServiceAsync = Depends(get_budget_service),
     current_user: User = Depends(get_current_user_from_header)
 ):
     """Récupère la liste des budgets enrichis (statuts calculés)."""
     try:
-        service = BudgetService(db)
-        budgets = service.get_budgets(
+        budgets = await service.get_budgets(
             categorie_id=params.categorie_id,
             debut_periode=params.debut,
             fin_periode=params.fin,
@@ -80,7 +106,7 @@ def get_budgets(
             limit=params.limit,
             user_id=current_user.id
         )
-        return budgets
+        return ReponseJSON(budgets)
     except CategorieNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e:
@@ -89,18 +115,17 @@ def get_budgets(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal Server Error")
     
 @router.put("/{budget_id}", response_model=BudgetRead)
-def update_budget(
+async def update_budget(
     budget_id: int,
     budget: BudgetUpdate,
-    db: Session = Depends(get_db),
+    service: BudgetServiceAsync = Depends(get_budget_service),
     current_user: User = Depends(get_current_user_from_header)
 ):
     """
     Met à jour un budget existant (Catégorie, Montant ou Période).
     """
-    service = BudgetService(db)
     try:
-        updated_budget = service.update_budget(
+        updated_budget = await service.update_budget(
             budget_id=budget_id,
             categorie_id=budget.categorie_id,
             montant=budget.montant_fixe,
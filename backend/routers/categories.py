@@ -2,7 +2,7 @@ from typing import Any
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from database import get_db
-from models.models import Categorie
+from scripts.registre_categories import registre_categories
 
 router = APIRouter(
     prefix="/api/categories",
@@ -12,5 +12,5 @@ router = APIRouter(
 @router.get("/", response_model=list[dict[str, Any]])
 def list_categories(db: Session = Depends(get_db)):
     """Liste des catégories disponibles"""
-    categories = db.query(Categorie).all()
+    categories = registre_categories.lister(db)
     return [{"id": c.id, "nom": c.nom, "icone": c.icone} for c in categories]
\ No newline at end of file
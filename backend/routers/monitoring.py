@@ -0,0 +1,56 @@
+"""
+Endpoints internes d'exploitation (caches, pool bcrypt, pool de connexions ; /metrics dans app.py).
+Ils exposent l'état interne du processus : ils ne doivent pas être publiés tels quels.
+Chaque appel doit présenter `Authorization: Bearer <MONITORING_TOKEN>` ; sans MONITORING_TOKEN
+configuré, ils sont désactivés (403).
+"""
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from database import stats_pool
+from scripts.cache_budget import budget_status_cache
+from scripts.pool_bcrypt import pool_bcrypt
+
+# jeton partagé avec le collecteur (Prometheus : `authorization: credentials`), voir .env.example
+MONITORING_TOKEN = os.getenv("MONITORING_TOKEN")
+
+
+def acces_monitoring(authorization: str | None = Header(None, include_in_schema=False)) -> None:
+    """Dépendance des endpoints internes : jeton de monitoring exigé, comparé en temps constant."""
+    if not MONITORING_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Monitoring désactivé (MONITORING_TOKEN non défini)"
+        )
+    schema, _, jeton = (authorization or "").partition(" ")
+    if schema.lower() != "bearer" or not secrets.compare_digest(jeton.encode(), MONITORING_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Jeton de monitoring invalide",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(
+    prefix="/api/monitoring",
+    tags=["monitoring"],
+    dependencies=[Depends(acces_monitoring)]
+)
+
+@router.get("/cache")
+def cache_stats():
+    """Compteurs des caches applicatifs du processus (hits, misses, évictions)"""
+    return {"budget_status": budget_status_cache.stats()}
+
+
+@router.get("/bcrypt")
+def bcrypt_stats():
+    """Occupation du pool de hachage des mots de passe (appels en cours, rejets 503)"""
+    return pool_bcrypt.stats()
+
+
+@router.get("/pool")
+def pool_stats():
+    """Pool de connexions : connexions en cours, overflow, attente au checkout"""
+    return stats_pool()
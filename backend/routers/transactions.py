@@ -1,46 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
-from schemas.transaction import TransactionCreate, TransactionRead, TransactionUpdate
-from scripts.saisie_transaction import TransactionService
+from database import get_session
+from schemas.transaction import (
+    TransactionCreate, TransactionImportResultat, TransactionPage, TransactionRead, TransactionSerie, TransactionUpdate
+)
+from scripts.services_async import ImportTransactionServiceAsync, TransactionServiceAsync
 from auth import get_current_user_from_header
 from models.models import User
+from reponses import ReponseJSON
 
 router = APIRouter(
     prefix="/api/transactions",
     tags=["transactions"]
 )
 
-# helper pour instancier le service
-def get_transaction_service(db: Session = Depends(get_db)) -> TransactionService:
-    return TransactionService(db)
+# taille de page quand seul le curseur `after` est fourni
+PAGE_PAR_DEFAUT = 50
+
+# taille maximale d'un fichier importé (10 Mo)
+TAILLE_IMPORT_MAX = 10 * 1024 * 1024
+
+# format d'import déduit du Content-Type quand il n'est pas précisé
+FORMATS_PAR_CONTENT_TYPE = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-ofx": "ofx",
+    "application/ofx": "ofx",
+}
+
+# helper pour instancier le service (session synchrone ou asynchrone selon DB_MODE)
+def get_transaction_service(db: Session | AsyncSession = Depends(get_session)) -> TransactionServiceAsync:
+    return TransactionServiceAsync(db)
+
+async def lire_fichier_importe(request: Request) -> bytes:
+    """
+    Corps de la requête, refusé (413) dès qu'il dépasse TAILLE_IMPORT_MAX : sur le Content-Length annoncé,
+    puis au fil du flux, sans jamais garder en mémoire plus de TAILLE_IMPORT_MAX octets.
+    """
+    taille_max = TAILLE_IMPORT_MAX
+    trop_volumineux = HTTPException(status_code=413, detail="Fichier trop volumineux (10 Mo maximum)")
+    longueur = request.headers.get("content-length", "")
+    if longueur.isdigit() and int(longueur) > taille_max:
+        raise trop_volumineux
+
+    morceaux, taille = [], 0
+    async for morceau in request.stream():
+        taille += len(morceau)
+        if taille > taille_max:
+            raise trop_volumineux
+        morceaux.append(morceau)
+    return b"".join(morceaux)
+
+def get_import_service(db: Session | AsyncSession = Depends(get_session)) -> ImportTransactionServiceAsync:
+    return ImportTransactionServiceAsync(db)
 
 @router.post("/", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
-def create_transaction(
+async def create_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_user_from_header),
-    service: TransactionService = Depends(get_transaction_service)
+    service: TransactionServiceAsync = Depends(get_transaction_service)
 ):
     try:
-        transaction = service.create_transaction(transaction_data, user_id=current_user.id)
+        transaction = await service.create_transaction(transaction_data, user_id=current_user.id)
         return transaction
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
 
+@router.post("/bulk", response_model=TransactionImportResultat)
+async def import_transactions(
+    request: Request,
+    format_import: str | None = Query(None, alias="format", description="csv, ndjson ou ofx (sinon déduit du Content-Type)"),
+    categorie_defaut: str = Query("Autres", description="Catégorie des lignes qui n'en précisent pas"),
+    current_user: User = Depends(get_current_user_from_header),
+    service: ImportTransactionServiceAsync = Depends(get_import_service)
+):
+    """Import en masse d'un relevé brut (corps de la requête) ; les lignes invalides sont rapportées."""
+    if format_import is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format_import = FORMATS_PAR_CONTENT_TYPE.get(content_type)
+        if format_import is None:
+            raise HTTPException(status_code=415, detail=f"Content-Type non supporté : '{content_type}'")
+
+    contenu = await lire_fichier_importe(request)
+
+    try:
+        return await service.importer(contenu, format_import, current_user.id, categorie_defaut)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
+
 @router.get("/total")
-def total_transactions(
+async def total_transactions(
     date_debut: str | None = Query(None, description="Format YYYY-MM-DD"),
     date_fin: str | None = Query(None, description="Format YYYY-MM-DD"),
     categorie: str | None = None,
     type_filtre: str | None = Query(None, description="REVENU ou DEPENSE"),
     current_user: User = Depends(get_current_user_from_header),
-    service: TransactionService = Depends(get_transaction_service)
+    service: TransactionServiceAsync = Depends(get_transaction_service)
 ):
     try:
-        total = service.get_total_transactions(
+        total = await service.get_total_transactions(
             date_debut=date_debut,
             date_fin=date_fin,
             categorie_nom=categorie,
@@ -53,24 +122,69 @@ def total_transactions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
 
-@router.get("/", response_model=list[TransactionRead])
-def list_transactions(
+@router.get("/series", response_model=TransactionSerie)
+async def series_transactions(
+    granularity: Literal["day", "week", "month"] = Query("month", description="Taille des périodes"),
+    group_by: Literal["categorie", "type"] = Query("categorie", description="Regroupement dans chaque période"),
     date_debut: str | None = Query(None, description="Format YYYY-MM-DD"),
     date_fin: str | None = Query(None, description="Format YYYY-MM-DD"),
     categorie: str | None = None,
     type_filtre: str | None = Query(None, description="REVENU ou DEPENSE"),
     current_user: User = Depends(get_current_user_from_header),
-    service: TransactionService = Depends(get_transaction_service)
+    service: TransactionServiceAsync = Depends(get_transaction_service)
 ):
+    """Totaux signés par période (jour, semaine ISO, mois) et par catégorie ou type, en colonnes parallèles."""
     try:
-        transactions = service.get_transactions(
+        # TransactionSerie validée par la façade : pas de revalidation du response_model
+        return ReponseJSON(await service.get_series(
+            granularite=granularity,
+            regroupement=group_by,
             date_debut=date_debut,
             date_fin=date_fin,
             categorie_nom=categorie,
             type_filtre=type_filtre,
             user_id=current_user.id
-        )
-        return transactions
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
+
+@router.get("/", response_model=list[TransactionRead] | TransactionPage)
+async def list_transactions(
+    date_debut: str | None = Query(None, description="Format YYYY-MM-DD"),
+    date_fin: str | None = Query(None, description="Format YYYY-MM-DD"),
+    categorie: str | None = None,
+    type_filtre: str | None = Query(None, description="REVENU ou DEPENSE"),
+    limit: int | None = Query(None, ge=1, le=500, description="Taille de page : active la pagination par curseur"),
+    after: str | None = Query(None, description="Curseur next_cursor de la page précédente"),
+    stream: bool = Query(False, description="Réponse NDJSON en flux (une transaction par ligne)"),
+    current_user: User = Depends(get_current_user_from_header),
+    service: TransactionServiceAsync = Depends(get_transaction_service)
+):
+    filtres = dict(
+        date_debut=date_debut,
+        date_fin=date_fin,
+        categorie_nom=categorie,
+        type_filtre=type_filtre,
+        user_id=current_user.id
+    )
+    try:
+        if stream:
+            transactions = await service.iter_transactions(**filtres)
+            lignes = (t.model_dump_json() + "\n" async for t in transactions)
+            return StreamingResponse(lignes, media_type="application/x-ndjson")
+
+        # listes renvoyées telles quelles : tuples encodés directement en JSON (pas d'objets ORM ni de validation)
+        if limit is not None or after:
+            contenu = await service.get_transactions_page_json(
+                limit=limit or PAGE_PAR_DEFAUT,
+                after=after,
+                **filtres
+            )
+        else:
+            contenu = await service.get_transactions_json(**filtres)
+        return ReponseJSON(contenu)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -78,14 +192,14 @@ def list_transactions(
 
 
 @router.put("/{transaction_id}", response_model=TransactionRead, status_code=status.HTTP_200_OK)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     transaction_data: TransactionUpdate,
     current_user: User = Depends(get_current_user_from_header),
-    service: TransactionService = Depends(get_transaction_service)
+    service: TransactionServiceAsync = Depends(get_transaction_service)
 ):
     try:
-        transaction = service.update_transaction(
+        transaction = await service.update_transaction(
             transaction_id=transaction_id,
             montant=transaction_data.montant,
             libelle=transaction_data.libelle,
@@ -101,13 +215,13 @@ def update_transaction(
         raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
 
 @router.delete("/{transaction_id}")
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
     current_user: User = Depends(get_current_user_from_header),
-    service: TransactionService = Depends(get_transaction_service)
+    service: TransactionServiceAsync = Depends(get_transaction_service)
 ):
     try:
-        total = service.delete_transaction(transaction_id=transaction_id, user_id=current_user.id)
+        total = await service.delete_transaction(transaction_id=transaction_id, user_id=current_user.id)
         return {"total": total}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
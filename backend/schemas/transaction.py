@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
 
 # Propriétés communes
 class TransactionBase(BaseModel):
@@ -37,6 +37,11 @@ class TransactionRead(TransactionBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
 
+class TransactionPage(BaseModel):
+    """Page de transactions (pagination par curseur sur (date, id))"""
+    items: list[TransactionRead]
+    next_cursor: str | None = None
+
 class TransactionUpdate(BaseModel):
     """Schéma pour la MISE À JOUR d'une transaction"""
     montant: float | None = None
@@ -58,4 +63,23 @@ class TransactionUpdate(BaseModel):
         # Délègue la validation au service pour retourner ValueError
         if v is not None:
             return v.upper()
-        return v
\ No newline at end of file
+        return v
+
+class TransactionImportErreur(BaseModel):
+    """Ligne rejetée lors d'un import en masse"""
+    ligne: int
+    erreur: str
+
+class TransactionImportResultat(BaseModel):
+    """Compte rendu d'un import en masse"""
+    importees: int
+    erreurs: list[TransactionImportErreur]
+
+class TransactionSerie(BaseModel):
+    """Totaux signés par période et par groupe, en colonnes parallèles (une ligne par indice)"""
+    granularite: str
+    regroupement: str
+    periode: list[date]
+    groupe: list[str]
+    montant: list[float]
+    nb_transactions: list[int]
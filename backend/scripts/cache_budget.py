@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+from schemas.budget import BudgetStatus
+
+
+class BudgetStatusCache:
+    """
+    Cache LRU borné, avec expiration (TTL), des BudgetStatus calculés, indexé par
+    (utilisateur propriétaire, budget).
+    Le cache est propre au processus : avec plusieurs workers uvicorn, une écriture
+    n'invalide que le cache du worker qui l'a traitée, le TTL borne l'obsolescence ailleurs.
+    """
+
+    def __init__(self, taille_max: int = 1024, ttl: float = 30.0, horloge=time.monotonic):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._horloge = horloge
+        self._entrees: OrderedDict[tuple[int | None, int], tuple[float, BudgetStatus]] = OrderedDict()
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def actif(self) -> bool:
+        return self.taille_max > 0 and self.ttl > 0
+
+    def get(self, user_id: int | None, budget_id: int) -> BudgetStatus | None:
+        if not self.actif:
+            return None
+        cle = (user_id, budget_id)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self.misses += 1
+                return None
+            expiration, statut = entree
+            if expiration <= self._horloge():
+                del self._entrees[cle]
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return statut.model_copy()
+
+    def set(self, user_id: int | None, statut: BudgetStatus) -> None:
+        if not self.actif:
+            return
+        cle = (user_id, statut.id)
+        with self._verrou:
+            self._entrees[cle] = (self._horloge() + self.ttl, statut.model_copy())
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def invalider(self, user_id: int | None, categorie_id: int | None, jour: date | datetime | None = None) -> int:
+        """
+        Retire les budgets de l'utilisateur sur cette catégorie dont la période contient `jour`
+        (tous ceux de la catégorie si le jour est inconnu). Retourne le nombre d'entrées retirées.
+        """
+        if isinstance(jour, datetime):
+            jour = jour.date()
+        if not isinstance(jour, date):
+            jour = None
+
+        with self._verrou:
+            cles = [
+                cle for cle, (_, statut) in self._entrees.items()
+                if cle[0] == user_id
+                and statut.categorie_id == categorie_id
+                and (jour is None or statut.debut_periode <= jour <= statut.fin_periode)
+            ]
+            for cle in cles:
+                del self._entrees[cle]
+            self.invalidations += len(cles)
+        return len(cles)
+
+    def invalider_budget(self, user_id: int | None, budget_id: int) -> None:
+        with self._verrou:
+            if self._entrees.pop((user_id, budget_id), None) is not None:
+                self.invalidations += 1
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                "taille": len(self._entrees),
+                "taille_max": self.taille_max,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Instance partagée par les services du processus
+budget_status_cache = BudgetStatusCache(
+    taille_max=int(os.getenv("BUDGET_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("BUDGET_CACHE_TTL", "30")),
+)
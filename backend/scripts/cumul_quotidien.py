@@ -0,0 +1,230 @@
+import argparse
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import Date, bindparam, delete, exists, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from models.models import CumulQuotidien, SoldeUtilisateur, Transaction
+from scripts.solde_utilisateur import SoldeService
+
+CLE = ("utilisateur_id", "categorie_id", "type", "jour")
+
+
+class JourDe(FunctionElement):
+    """Jour (Date) d'une colonne DateTime, pour regrouper les transactions par jour."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(JourDe)
+def _jour_de(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(JourDe, "sqlite")
+def _jour_de_sqlite(element, compiler, **kw):
+    # SQLite : CAST(... AS DATE) donnerait un nombre, date() renvoie 'AAAA-MM-JJ'
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+
+class Mouvement(NamedTuple):
+    """Variation d'un cumul quotidien : montant et nombre de transactions ajoutés (ou retirés)."""
+    utilisateur_id: int | None
+    categorie_id: int
+    type: str
+    jour: date
+    montant: float
+    nb: int
+
+
+def mouvement(
+    montant: float,
+    type_transaction: str,
+    date_transaction: datetime,
+    categorie_id: int,
+    utilisateur_id: int | None,
+    signe: int = 1
+) -> Mouvement:
+    """Mouvement correspondant à l'ajout (signe=1) ou au retrait (signe=-1) d'une transaction."""
+    return Mouvement(
+        utilisateur_id, categorie_id, str(type_transaction).upper(), date_transaction.date(),
+        signe * float(montant or 0.0), signe
+    )
+
+
+def cumuls_disponibles(utilisateur_id):
+    """
+    Condition SQL : les cumuls de l'utilisateur (valeur ou colonne, ex. Budget.utilisateur_id)
+    sont initialisés et peuvent remplacer les transactions.
+    """
+    return exists().where(
+        SoldeUtilisateur.utilisateur_id == utilisateur_id,
+        SoldeUtilisateur.cumuls_initialises.is_(True)
+    )
+
+
+class CumulQuotidienService:
+    """
+    Cumuls quotidiens des transactions par (utilisateur, catégorie, type, jour), table cumul_quotidien.
+    Comme le solde, ils sont mis à jour dans la même transaction SQL que l'écriture :
+    preparer() avant de modifier les transactions de l'utilisateur, appliquer() avant le commit.
+    """
+
+    def __init__(self, db: Session, soldes: SoldeService | None = None):
+        self.db = db
+        self.soldes = soldes or SoldeService(db)
+
+    def _historique(self, user_id: int | None = None):
+        """Cumuls recalculés depuis les transactions (requête groupée, non exécutée)."""
+        jour = JourDe(Transaction.date)
+        query = select(
+            Transaction.utilisateur_id,
+            Transaction.categorie_id,
+            Transaction.type,
+            jour.label("jour"),
+            func.sum(Transaction.montant).label("montant_total"),
+            func.count().label("nb_transactions")
+        )
+        if user_id is None:
+            query = query.where(Transaction.utilisateur_id.isnot(None))
+        else:
+            query = query.where(Transaction.utilisateur_id == user_id)
+        return query.group_by(Transaction.utilisateur_id, Transaction.categorie_id, Transaction.type, jour)
+
+    def _initialiser(self, user_id: int | None = None):
+        """
+        Remplace les cumuls (d'un utilisateur ou de tous) par ceux recalculés depuis les transactions.
+        Pour un utilisateur, seulement sous le verrou de sa ligne de solde (voir preparer).
+        """
+        table = CumulQuotidien.__table__
+        supprimer = delete(table)
+        if user_id is not None:
+            supprimer = supprimer.where(table.c.utilisateur_id == user_id)
+        self.db.execute(supprimer)
+        self.db.execute(insert(table).from_select(
+            [*CLE, "montant_total", "nb_transactions"], self._historique(user_id)
+        ))
+
+    def preparer(self, user_id: int | None):
+        """
+        Verrouille la ligne de solde de l'utilisateur (ce qui sérialise ses écritures) et,
+        au premier passage, initialise ses cumuls depuis ses transactions en base :
+        à appeler AVANT de modifier les transactions de la session.
+        """
+        if user_id is None:
+            return
+        # la ligne existe et est verrouillée, même à la première écriture (créée sous ON CONFLICT) :
+        # une écriture concurrente attend notre commit puis relit cumuls_initialises, elle ne
+        # rejoue pas l'initialisation (pas de clé en double ni de transaction comptée deux fois)
+        ligne = self.soldes.verrouiller(user_id)
+        if not ligne.cumuls_initialises:
+            self._initialiser(user_id)
+            ligne.cumuls_initialises = True
+
+    def appliquer(self, mouvements: Iterable[Mouvement]):
+        """Reporte les mouvements dans les cumuls (un upsert par jour touché), sans commit."""
+        deltas = defaultdict(lambda: [0.0, 0])
+        for m in mouvements:
+            if m.utilisateur_id is None:
+                continue
+            delta = deltas[m[:4]]
+            delta[0] += m.montant
+            delta[1] += m.nb
+
+        lignes = [
+            {**dict(zip(CLE, cle)), "montant_total": round(montant, 2), "nb_transactions": nb}
+            for cle, (montant, nb) in deltas.items()
+            if round(montant, 2) or nb
+        ]
+        if not lignes:
+            return
+
+        table = CumulQuotidien.__table__
+        dialecte_insert = insert_postgresql if self.db.get_bind().dialect.name == "postgresql" else insert_sqlite
+        upsert = dialecte_insert(table)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c[c] for c in CLE],
+            set_={
+                "montant_total": table.c.montant_total + upsert.excluded.montant_total,
+                "nb_transactions": table.c.nb_transactions + upsert.excluded.nb_transactions,
+            }
+        )
+        self.db.execute(upsert, lignes)
+
+        # un jour qui n'a plus de transaction disparaît des cumuls
+        retraits = [{f"b_{c}": l[c] for c in CLE} for l in lignes if l["nb_transactions"] < 0]
+        if retraits:
+            self.db.execute(
+                delete(table).where(
+                    *(table.c[c] == bindparam(f"b_{c}") for c in CLE),
+                    table.c.nb_transactions <= 0
+                ),
+                retraits
+            )
+
+    def reconstruire(self) -> int:
+        """
+        Recalcule tous les cumuls depuis les transactions et les marque initialisés
+        pour les utilisateurs ayant un solde. À lancer hors trafic d'écriture.
+        Retourne le nombre de lignes de cumul.
+        """
+        self._initialiser()
+        self.db.execute(update(SoldeUtilisateur).values(cumuls_initialises=True))
+        self.db.commit()
+        return self.db.query(func.count()).select_from(CumulQuotidien).scalar()
+
+    def verifier(self) -> list[dict]:
+        """Compare les cumuls des utilisateurs initialisés aux transactions et retourne les écarts."""
+        initialises = select(SoldeUtilisateur.utilisateur_id).where(SoldeUtilisateur.cumuls_initialises.is_(True))
+
+        reels = {
+            tuple(r[:4]): (round(float(r.montant_total), 2), r.nb_transactions)
+            for r in self.db.execute(self._historique().where(Transaction.utilisateur_id.in_(initialises)))
+        }
+        cumuls = {
+            (c.utilisateur_id, c.categorie_id, c.type, c.jour): (round(float(c.montant_total), 2), c.nb_transactions)
+            for c in self.db.query(CumulQuotidien).filter(CumulQuotidien.utilisateur_id.in_(initialises))
+        }
+
+        ecarts = []
+        for cle in sorted(set(reels) | set(cumuls)):
+            reel, cumul = reels.get(cle, (0.0, 0)), cumuls.get(cle, (0.0, 0))
+            if round(reel[0] - cumul[0], 2) == 0 and reel[1] == cumul[1]:
+                continue
+            ecarts.append({
+                **dict(zip(CLE, cle)),
+                "montant_cumul": cumul[0],
+                "montant_reel": reel[0],
+                "nb_cumul": cumul[1],
+                "nb_reel": reel[1],
+            })
+        return ecarts
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reconstruit les cumuls quotidiens depuis les transactions, ou vérifie leur cohérence.")
+    parser.add_argument("--verifier", action="store_true", help="Affiche les écarts sans reconstruire les cumuls")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.verifier:
+            ecarts = CumulQuotidienService(db).verifier()
+            for e in ecarts:
+                print(
+                    f"utilisateur {e['utilisateur_id']} catégorie {e['categorie_id']} {e['type']} {e['jour']}: "
+                    f"cumul={e['montant_cumul']} ({e['nb_cumul']}) réel={e['montant_reel']} ({e['nb_reel']})"
+                )
+            print(f"{len(ecarts)} écart(s) détecté(s)")
+        else:
+            print(f"{CumulQuotidienService(db).reconstruire()} cumul(s) quotidien(s) reconstruit(s)")
+    finally:
+        db.close()
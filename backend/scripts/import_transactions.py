@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from models.models import Transaction
+from scripts.cache_budget import budget_status_cache
+from scripts.cumul_quotidien import CumulQuotidienService, mouvement
+from scripts.registre_categories import normaliser_nom, registre_categories
+from scripts.solde_utilisateur import SoldeService, montant_signe
+
+# Nombre maximal de lignes acceptées par import
+LIGNES_MAX = 50_000
+
+FORMATS = ("csv", "ndjson", "ofx")
+
+# transactions.montant est un DECIMAL(10, 2) (init.sql)
+CENTIME = Decimal("0.01")
+MONTANT_MAX = Decimal("99999999.99")
+# transactions.libelle est un VARCHAR(255) (init.sql)
+LIBELLE_MAX = 255
+
+COLONNES_COPY = ("montant", "libelle", "type", "date", "categorie_id", "utilisateur_id")
+
+_BLOC_OFX = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|$)", re.S | re.I)
+_CHAMP_OFX = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def _parser_csv(texte: str) -> list[tuple[int, dict]]:
+    premiere_ligne = texte.split("\n", 1)[0]
+    separateur = ";" if premiere_ligne.count(";") > premiere_ligne.count(",") else ","
+    lecteur = csv.DictReader(io.StringIO(texte), delimiter=separateur)
+    if lecteur.fieldnames:
+        lecteur.fieldnames = [c.strip().lower() for c in lecteur.fieldnames]
+    # ligne 1 = en-tête
+    return [(numero, ligne) for numero, ligne in enumerate(lecteur, start=2)]
+
+
+def _parser_ndjson(texte: str) -> list[tuple[int, dict]]:
+    lignes = []
+    for numero, brut in enumerate(texte.splitlines(), start=1):
+        if not brut.strip():
+            continue
+        try:
+            objet = json.loads(brut)
+        except json.JSONDecodeError:
+            objet = None
+        lignes.append((numero, objet if isinstance(objet, dict) else {"_erreur": "JSON invalide"}))
+    return lignes
+
+
+def _parser_ofx(texte: str) -> list[tuple[int, dict]]:
+    lignes = []
+    for numero, bloc in enumerate(_BLOC_OFX.findall(texte), start=1):
+        champs = {nom.upper(): valeur.strip() for nom, valeur in _CHAMP_OFX.findall(bloc)}
+        date_brute = champs.get("DTPOSTED", "")[:8]
+        lignes.append((numero, {
+            "montant": champs.get("TRNAMT", ""),
+            "libelle": champs.get("NAME") or champs.get("MEMO", ""),
+            "date": f"{date_brute[:4]}-{date_brute[4:6]}-{date_brute[6:8]}" if len(date_brute) == 8 else "",
+        }))
+    return lignes
+
+
+def _parser_date(valeur) -> datetime:
+    valeur = str(valeur or "").strip()
+    try:
+        return datetime.fromisoformat(valeur)
+    except ValueError:
+        return datetime.strptime(valeur, "%d/%m/%Y")
+
+
+def _parser_montant(valeur) -> Decimal:
+    """Montant signé arrondi au centime comme en base ; ValueError si illisible, non fini ou hors DECIMAL(10, 2)."""
+    brut = str(valeur or "").strip().replace(" ", "").replace(",", ".")
+    try:
+        montant = Decimal(brut)
+    except InvalidOperation:
+        montant = None
+    # nan, inf : acceptés par float() mais ni comparables ni stockables
+    if montant is None or not montant.is_finite():
+        raise ValueError(f"Montant invalide '{valeur}'")
+    try:
+        montant = montant.quantize(CENTIME, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        # trop de chiffres pour le contexte décimal : a fortiori hors de la colonne
+        montant = None
+    if montant is None or abs(montant) > MONTANT_MAX:
+        raise ValueError(f"Le montant dépasse le maximum autorisé ({MONTANT_MAX})")
+    return montant
+
+
+def lire_releve(contenu: bytes | str, format_import: str) -> list[tuple[int, dict]]:
+    """Lignes numérotées d'un relevé brut, sans accès à la base (exécutable hors session)."""
+    format_import = (format_import or "").lower()
+    if format_import not in FORMATS:
+        raise ValueError(f"Format d'import inconnu '{format_import}'. Formats acceptés : {', '.join(FORMATS)}")
+
+    try:
+        texte = contenu.decode("utf-8-sig") if isinstance(contenu, bytes) else contenu
+    except UnicodeDecodeError:
+        raise ValueError("Le fichier doit être encodé en UTF-8")
+
+    lignes = {"csv": _parser_csv, "ndjson": _parser_ndjson, "ofx": _parser_ofx}[format_import](texte)
+
+    if len(lignes) > LIGNES_MAX:
+        raise ValueError(f"Trop de lignes : {len(lignes)} (maximum {LIGNES_MAX} par import)")
+    return lignes
+
+
+class ImportTransactionService:
+    """
+    Import en masse de transactions (relevés CSV, NDJSON ou OFX).
+    Les catégories sont résolues sur le registre en mémoire, les lignes validées en une passe,
+    puis toutes les lignes valides insérées dans une seule transaction SQL
+    (COPY sur PostgreSQL, INSERT multi-lignes ailleurs).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _valider(self, lignes, categorie_defaut: str, user_id: int):
+        """Valide toutes les lignes ; retourne (lignes à insérer, erreurs par ligne)."""
+        valides, erreurs = [], []
+        categories: dict[str, int | None] = {}
+
+        for numero, brut in lignes:
+            try:
+                if "_erreur" in brut:
+                    raise ValueError(brut["_erreur"])
+
+                # arrondi avant la validation : 0.001 deviendrait 0.00 en base
+                montant = _parser_montant(brut.get("montant"))
+
+                type_t = str(brut.get("type") or "").strip().upper()
+                if not type_t:
+                    # relevés bancaires : le signe du montant porte le sens
+                    type_t = "DEPENSE" if montant < 0 else "REVENU"
+                    montant = abs(montant)
+                if type_t not in ("REVENU", "DEPENSE"):
+                    raise ValueError("Le type doit être 'REVENU' ou 'DEPENSE'")
+                if montant <= 0:
+                    raise ValueError("Le montant doit être positif")
+
+                libelle = str(brut.get("libelle") or "").strip()
+                if not libelle:
+                    raise ValueError("Le libellé est obligatoire")
+                # une valeur trop longue ferait échouer l'insertion de tout le lot
+                if len(libelle) > LIBELLE_MAX:
+                    raise ValueError(f"Le libellé dépasse {LIBELLE_MAX} caractères")
+
+                try:
+                    date_t = _parser_date(brut.get("date"))
+                except ValueError:
+                    raise ValueError(f"Date invalide '{brut.get('date')}'")
+
+                nom_categorie = str(brut.get("categorie") or categorie_defaut).strip()
+                cle = normaliser_nom(nom_categorie)
+                if cle not in categories:
+                    categorie = registre_categories.resoudre(self.db, nom_categorie)
+                    categories[cle] = categorie.id if categorie else None
+                categorie_id = categories[cle]
+                if categorie_id is None:
+                    raise ValueError(f"La catégorie '{nom_categorie}' n'existe pas")
+
+                valides.append({
+                    "montant": float(montant),
+                    "libelle": libelle,
+                    "type": type_t,
+                    "date": date_t,
+                    "categorie_id": categorie_id,
+                    "utilisateur_id": user_id,
+                })
+            except ValueError as e:
+                erreurs.append({"ligne": numero, "erreur": str(e)})
+
+        return valides, erreurs
+
+    def _inserer_copy(self, lignes: list[dict]) -> bool:
+        """Insère via COPY FROM STDIN (psycopg2) ; retourne False si le driver ne le permet pas."""
+        dbapi_connection = self.db.connection().connection.dbapi_connection
+        curseur = dbapi_connection.cursor()
+        try:
+            if not hasattr(curseur, "copy_expert"):
+                return False
+            tampon = io.StringIO()
+            ecrivain = csv.writer(tampon)
+            for ligne in lignes:
+                ecrivain.writerow([ligne[c].isoformat() if c == "date" else ligne[c] for c in COLONNES_COPY])
+            tampon.seek(0)
+            curseur.copy_expert(
+                f"COPY transactions ({', '.join(COLONNES_COPY)}) FROM STDIN WITH (FORMAT csv)",
+                tampon
+            )
+            return True
+        finally:
+            curseur.close()
+
+    def importer(
+        self,
+        contenu: bytes | str,
+        format_import: str,
+        user_id: int,
+        categorie_defaut: str = "Autres"
+    ) -> dict:
+        """
+        Importe un relevé pour l'utilisateur. Les lignes valides sont insérées,
+        les lignes invalides sont rapportées avec leur numéro et la raison du rejet.
+        """
+        return self.importer_lignes(lire_releve(contenu, format_import), user_id, categorie_defaut)
+
+    def importer_lignes(self, lignes: list[tuple[int, dict]], user_id: int, categorie_defaut: str = "Autres") -> dict:
+        """Comme importer, pour des lignes déjà lues par lire_releve."""
+        valides, erreurs = self._valider(lignes, categorie_defaut, user_id)
+
+        if valides:
+            soldes = SoldeService(self.db)
+            cumuls = CumulQuotidienService(self.db, soldes)
+            cumuls.preparer(user_id)
+
+            if self.db.get_bind().dialect.name != "postgresql" or not self._inserer_copy(valides):
+                self.db.execute(insert(Transaction), valides)
+
+            soldes.appliquer(user_id, sum(montant_signe(l["montant"], l["type"]) for l in valides))
+            cumuls.appliquer(
+                mouvement(l["montant"], l["type"], l["date"], l["categorie_id"], user_id) for l in valides
+            )
+            self.db.commit()
+
+            for categorie_id in {l["categorie_id"] for l in valides}:
+                budget_status_cache.invalider(user_id, categorie_id)
+
+        return {"importees": len(valides), "erreurs": erreurs}
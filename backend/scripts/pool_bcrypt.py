@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+# Importé par les processus du pool : ce module ne dépend ni des modèles ni de la base
+class ServiceSatureError(Exception):
+    """File d'attente pleine : la requête doit être retentée plus tard (HTTP 503)"""
+    pass
+
+
+# Fonctions exécutées dans les processus du pool (doivent rester importables)
+def hacher(password_bytes: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds))
+
+
+def verifier(password_bytes: bytes, hashed_bytes: bytes) -> bool:
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+class PoolBcrypt:
+    """
+    Pool de processus dédié au calcul bcrypt (hachage et vérification).
+    Le travail CPU ne tient pas le GIL du serveur, et les routes `async def` l'attendent
+    via executer_async sans occuper de thread : seuls `workers + file_max` appels peuvent
+    être en vol, les suivants sont refusés immédiatement (ServiceSatureError → HTTP 503)
+    plutôt que d'attendre.
+    Avec workers=0, le calcul est fait dans le thread appelant (tests, scripts), ou dans
+    un thread par défaut d'asyncio pour executer_async.
+    """
+
+    def __init__(self, workers: int = 2, file_max: int = 32):
+        self.workers = workers
+        self.file_max = file_max
+        self._executor: ProcessPoolExecutor | None = None
+        self._verrou = threading.Lock()
+        self._places = threading.BoundedSemaphore(max(workers + file_max, 1))
+        self.en_cours = 0
+        self.executes = 0
+        self.rejets = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._verrou:
+            if self._executor is None:
+                # spawn : pas de fork d'un processus serveur multi-thread
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reserver(self) -> None:
+        if not self._places.acquire(blocking=False):
+            self.rejets += 1
+            raise ServiceSatureError("Trop de requêtes d'authentification en cours, réessayez plus tard")
+        with self._verrou:
+            self.en_cours += 1
+
+    def _liberer(self) -> None:
+        with self._verrou:
+            self.en_cours -= 1
+            self.executes += 1
+        self._places.release()
+
+    def executer(self, fonction, *args):
+        """Exécute fonction(*args) dans le pool ; le thread appelant attend le résultat (scripts, bancs)."""
+        if self.workers <= 0:
+            self.executes += 1
+            return fonction(*args)
+
+        self._reserver()
+        try:
+            return self._get_executor().submit(fonction, *args).result()
+        finally:
+            self._liberer()
+
+    async def executer_async(self, fonction, *args):
+        """Comme executer, mais attendu sur la boucle d'événements : aucun thread n'est tenu pendant le calcul."""
+        if self.workers <= 0:
+            self.executes += 1
+            return await asyncio.to_thread(fonction, *args)
+
+        self._reserver()
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fonction, *args))
+        finally:
+            self._liberer()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "file_max": self.file_max,
+            "en_cours": self.en_cours,
+            "executes": self.executes,
+            "rejets": self.rejets,
+        }
+
+    def arreter(self) -> None:
+        with self._verrou:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Pool partagé par le processus (voir BCRYPT_* dans .env.example)
+pool_bcrypt = PoolBcrypt(
+    workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    file_max=int(os.getenv("BCRYPT_MAX_QUEUE", "32")),
+)
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+import unicodedata
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.models import Categorie
+
+
+class CategorieRef(NamedTuple):
+    """Copie légère d'une catégorie, indépendante de toute session"""
+    id: int
+    nom: str
+    icone: str | None
+
+
+def normaliser_nom(nom: str) -> str:
+    """Clé de recherche insensible à la casse et aux accents ('Santé' == 'sante')."""
+    decompose = unicodedata.normalize("NFKD", str(nom).strip())
+    return "".join(c for c in decompose if not unicodedata.combining(c)).casefold()
+
+
+class RegistreCategories:
+    """
+    Registre des catégories, chargé une fois puis servi depuis la mémoire.
+    Les catégories forment un petit jeu quasi statique (init.sql) : le registre est
+    rechargé à expiration du TTL, sur invalider() (appelé au commit de toute session
+    qui a écrit une catégorie), ou lors d'une recherche infructueuse (au plus une fois
+    par `intervalle_echec` secondes) pour voir une catégorie ajoutée hors du processus.
+    """
+
+    def __init__(self, ttl: float = 300.0, intervalle_echec: float = 5.0, horloge=time.monotonic):
+        self.ttl = ttl
+        self.intervalle_echec = intervalle_echec
+        self._horloge = horloge
+        self._verrou = threading.Lock()
+        self._charge_le: float | None = None
+        self._dernier_echec: float | None = None
+        self._par_nom: dict[str, CategorieRef] = {}
+        self._par_id: dict[int, CategorieRef] = {}
+        self.chargements = 0
+
+    def invalider(self) -> None:
+        with self._verrou:
+            self._charge_le = None
+            self._dernier_echec = None
+
+    def _charger(self, db: Session) -> None:
+        categories = sorted((CategorieRef(c.id, c.nom, c.icone) for c in db.query(Categorie).all()), key=lambda c: c.id)
+        self.amorcer(categories)
+
+    def amorcer(self, categories) -> None:
+        """Remplace le contenu du registre (chargement depuis la base ou jeu connu)."""
+        categories = list(categories)
+        with self._verrou:
+            self._par_id = {c.id: c for c in categories}
+            self._par_nom = {normaliser_nom(c.nom): c for c in categories}
+            self._charge_le = self._horloge()
+            self.chargements += 1
+
+    def _a_jour(self, db: Session) -> None:
+        charge_le = self._charge_le
+        if charge_le is None or self._horloge() - charge_le >= self.ttl:
+            self._charger(db)
+
+    def _recharger_sur_echec(self, db: Session) -> bool:
+        maintenant = self._horloge()
+        if self._dernier_echec is not None and maintenant - self._dernier_echec < self.intervalle_echec:
+            return False
+        self._dernier_echec = maintenant
+        self._charger(db)
+        return True
+
+    def lister(self, db: Session) -> list[CategorieRef]:
+        self._a_jour(db)
+        return list(self._par_id.values())
+
+    def resoudre(self, db: Session, nom: str) -> CategorieRef | None:
+        """Catégorie correspondant au nom (casse et accents ignorés), None si inconnue."""
+        self._a_jour(db)
+        cle = normaliser_nom(nom)
+        categorie = self._par_nom.get(cle)
+        if categorie is None and self._recharger_sur_echec(db):
+            categorie = self._par_nom.get(cle)
+        return categorie
+
+    def par_id(self, db: Session, categorie_id: int) -> CategorieRef | None:
+        self._a_jour(db)
+        categorie = self._par_id.get(categorie_id)
+        if categorie is None and self._recharger_sur_echec(db):
+            categorie = self._par_id.get(categorie_id)
+        return categorie
+
+    def noms(self, db: Session) -> list[str]:
+        return [c.nom for c in self.lister(db)]
+
+
+# Registre partagé par le processus (voir CATEGORIES_CACHE_TTL dans .env.example)
+registre_categories = RegistreCategories(ttl=float(os.getenv("CATEGORIES_CACHE_TTL", "300")))
+
+
+# Toute écriture de catégorie par une session du processus invalide le registre une fois
+# validée ; les écritures hors du processus (init.sql, SQL direct) attendent le TTL.
+@event.listens_for(Session, "after_flush")
+def _noter_ecriture_categories(session, flush_context):
+    if any(isinstance(o, Categorie) for o in (*session.new, *session.dirty, *session.deleted)):
+        session.info["categories_modifiees"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalider_apres_commit(session):
+    if session.info.pop("categories_modifiees", False):
+        registre_categories.invalider()
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_apres_rollback(session):
+    session.info.pop("categories_modifiees", None)
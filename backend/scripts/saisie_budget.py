@@ -1,8 +1,42 @@
-from datetime import date
-from sqlalchemy import func, cast, and_, Date
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import case, func, select, Date
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Session
-from models.models import Budget, Categorie, BudgetAlreadyExistsError, Transaction, BudgetNotFoundError, CategorieNotFoundError
+from sqlalchemy.sql.functions import FunctionElement
+from models.models import Budget, BudgetAlreadyExistsError, CumulQuotidien, Transaction, BudgetNotFoundError, CategorieNotFoundError
 from schemas.budget import BudgetStatus
+from scripts.cache_budget import budget_status_cache
+from scripts.cumul_quotidien import cumuls_disponibles
+from scripts.registre_categories import registre_categories
+
+
+# nombre maximal de budgets demandés en une fois à get_budgets_status
+MAX_BUDGETS_PAR_LOT = 100
+
+
+class JourSuivant(FunctionElement):
+    """
+    Lendemain d'une colonne Date, pour écrire les fins de période en borne exclusive
+    (Transaction.date < fin + 1 jour) sans appliquer de fonction à Transaction.date.
+    """
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(JourSuivant)
+def _jour_suivant(element, compiler, **kw):
+    # PostgreSQL : date + integer -> date
+    return "(%s + 1)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(JourSuivant, "sqlite")
+def _jour_suivant_sqlite(element, compiler, **kw):
+    return "date(%s, '+1 day')" % compiler.process(element.clauses, **kw)
+
+
+def bornes_periode(debut: date, fin: date) -> tuple[datetime, datetime]:
+    """Convertit une période en jours inclus [debut, fin] en intervalle d'horodatages [debut, fin + 1 jour["""
+    return datetime.combine(debut, time.min), datetime.combine(fin + timedelta(days=1), time.min)
 
 
 class BudgetService:
@@ -21,7 +55,7 @@ class BudgetService:
         if montant <= 0:
             raise ValueError("Le montant doit être strictement positif")
         
-        categorie = self.db.query(Categorie).filter(Categorie.id == categorie_id).first()
+        categorie = registre_categories.par_id(self.db, categorie_id)
         if not categorie:
             raise CategorieNotFoundError(f"La catégorie avec l'ID {categorie_id} n'existe pas")
 
@@ -59,91 +93,123 @@ class BudgetService:
         )
         
         self.db.add(nouveau_budget)
+        # id renvoyé par l'INSERT (RETURNING), attributs conservés après le commit : pas de relecture
         self.db.commit()
-        self.db.refresh(nouveau_budget)
         
         return nouveau_budget
     
-    def get_budget_status(self, budget_id: int) -> BudgetStatus:
-        budget = self.db.query(Budget).filter(Budget.id == budget_id).first()
+    def get_budget_status(self, budget_id: int, user_id: int | None = None) -> BudgetStatus:
+        """
+        Calcule l'état d'un budget (consommé, restant).
+        Si user_id est fourni, le résultat est servi depuis le cache des statuts quand il y est.
+        """
+        if user_id is not None:
+            statut = budget_status_cache.get(user_id, budget_id)
+            if statut is not None:
+                return statut
 
-        if not budget:
+        # budget et total dépensé en une requête
+        resultat = self._requete_statuts().filter(Budget.id == budget_id).first()
+        budget, total_depense = resultat if resultat else (None, None)
+
+        # le budget d'un autre utilisateur est traité comme inexistant
+        if not budget or (user_id is not None and budget.utilisateur_id != user_id):
             raise BudgetNotFoundError(f"Le budget {budget_id} n'existe pas")
 
-        total_depense = self.db.query(func.sum(Transaction.montant)).filter(
-            Transaction.categorie_id == budget.categorie_id,
-            # Cast du DateTime en Date pour inclure toute la journée
-            cast(Transaction.date, Date) >= budget.debut_periode,
-            cast(Transaction.date, Date) <= budget.fin_periode,
-            Transaction.type == "DEPENSE"
-        ).scalar()
+        statut = self._construire_statut(budget, total_depense or 0.0)
+        # indexé par le propriétaire : c'est lui que ciblent les invalidations
+        budget_status_cache.set(budget.utilisateur_id, statut) #type: ignore
+
+        return statut
+    
+    @staticmethod
+    def _colonnes_statut():
+        """
+        Budget et total dépensé sur sa période, par le propriétaire, dans la catégorie.
+        Le total est une sous-requête corrélée par budget (pas de jointure budgets × transactions
+        ni de GROUP BY) : somme des cumuls quotidiens des jours de la période quand ceux du
+        propriétaire sont initialisés, sinon des transactions via
+        idx_transactions_utilisateur_categorie_type_date.
+        """
+        depuis_cumuls = select(
+            func.coalesce(func.sum(CumulQuotidien.montant_total), 0.0)
+        ).where(
+            CumulQuotidien.utilisateur_id == Budget.utilisateur_id,
+            CumulQuotidien.categorie_id == Budget.categorie_id,
+            CumulQuotidien.type == "DEPENSE",
+            CumulQuotidien.jour >= Budget.debut_periode,
+            CumulQuotidien.jour <= Budget.fin_periode
+        ).correlate(Budget).scalar_subquery()
+
+        depuis_transactions = select(
+            func.coalesce(func.sum(Transaction.montant), 0.0)
+        ).where(
+            Transaction.utilisateur_id == Budget.utilisateur_id,
+            Transaction.categorie_id == Budget.categorie_id,
+            Transaction.type == "DEPENSE",
+            Transaction.date >= Budget.debut_periode,
+            Transaction.date < JourSuivant(Budget.fin_periode)
+        ).correlate(Budget).scalar_subquery()
+
+        total_depense = case(
+            (cumuls_disponibles(Budget.utilisateur_id), depuis_cumuls),
+            else_=depuis_transactions
+        )
+        return Budget, total_depense.label("total_depense")
 
-        if total_depense is None:
-            total_depense = 0.0
+    def _requete_statuts(self):
+        """Budgets avec leur total dépensé sur la période (voir _colonnes_statut)."""
+        return self.db.query(*self._colonnes_statut())
 
+    @staticmethod
+    def _construire_statut(budget_obj: Budget, total_depense: float) -> BudgetStatus:
         total_depense = round(total_depense, 2)
+        restant = round(budget_obj.montant_fixe - total_depense, 2)
 
-        restant = round(budget.montant_fixe - total_depense, 2) #type:ignore
-        
         pourcentage = 0.0
-        if budget.montant_fixe > 0: #type: ignore
-            pourcentage = round((total_depense / budget.montant_fixe) * 100, 2) #type: ignore
-        
+        if budget_obj.montant_fixe > 0:
+            pourcentage = round((total_depense / budget_obj.montant_fixe) * 100, 2)
+
         est_depasse = restant < 0
 
+        # Création de l'objet de réponse enrichi
         return BudgetStatus(
-            id=budget.id, #type: ignore
-            categorie_id=budget.categorie_id,  #type: ignore
-            montant_fixe=budget.montant_fixe,  #type: ignore
-            debut_periode=budget.debut_periode,  #type: ignore
-            fin_periode=budget.fin_periode,  #type: ignore
-            
-            montant_depense=total_depense,  #type: ignore
-            montant_restant=restant,  #type: ignore
+            id=budget_obj.id,
+            categorie_id=budget_obj.categorie_id,
+            montant_fixe=budget_obj.montant_fixe,
+            debut_periode=budget_obj.debut_periode,
+            fin_periode=budget_obj.fin_periode,
+            montant_depense=total_depense,
+            montant_restant=restant,
             pourcentage_consomme=pourcentage,
-            est_depasse=est_depasse  #type: ignore
+            est_depasse=est_depasse
         )
-    
+
     def get_budgets(self, categorie_id: int | None = None, debut_periode: date | None = None, fin_periode: date | None = None, skip: int = 0, limit: int = 0, user_id: int | None = None) -> list[BudgetStatus]:
         """
         Récupère la liste des budgets, avec filtres optionnels.
         """
-        query = self.db.query(
-            Budget,
-            func.coalesce(func.sum(Transaction.montant), 0.0).label("total_depense")
-        )
-
-        query = query.outerjoin(
-            Transaction,
-            and_(
-                Budget.categorie_id == Transaction.categorie_id,
-                Transaction.type == "DEPENSE",
-                cast(Transaction.date, Date) >= Budget.debut_periode,
-                cast(Transaction.date, Date) <= Budget.fin_periode
-            )
-        )
+        query = self._requete_statuts()
 
         if debut_periode and fin_periode and debut_periode > fin_periode:
             raise ValueError("La date de début doit être antérieure ou égale à la date de fin.")
         
         if categorie_id is not None:
-            categorie_existe = self.db.query(Categorie).filter(Categorie.id == categorie_id).first()
+            categorie_existe = registre_categories.par_id(self.db, categorie_id)
             if not categorie_existe:
                 raise CategorieNotFoundError(f"Catégorie introuvable (ID: {categorie_id})")
             query = query.filter(Budget.categorie_id == categorie_id)
 
         if debut_periode:
-            query = query.filter(cast(Budget.fin_periode, Date) >= debut_periode)
+            query = query.filter(Budget.fin_periode >= debut_periode)
 
         if fin_periode:
-            query = query.filter(cast(Budget.debut_periode, Date) <= fin_periode)
+            query = query.filter(Budget.debut_periode <= fin_periode)
         
         # Filtre par utilisateur si fourni
         if user_id is not None:
             query = query.filter(Budget.utilisateur_id == user_id)
 
-        query = query.group_by(Budget.id)
-
         if limit > 0:
             query = query.offset(skip).limit(limit)
 
@@ -151,31 +217,43 @@ class BudgetService:
 
         budget_status_list = []
         for budget_obj, total_depense in results:
-            
-            total_depense = round(total_depense, 2)
-            restant = round(budget_obj.montant_fixe - total_depense, 2)
-            
-            pourcentage = 0.0
-            if budget_obj.montant_fixe > 0:
-                pourcentage = round((total_depense / budget_obj.montant_fixe) * 100, 2)
-            
-            est_depasse = restant < 0
-
-            # Création de l'objet de réponse enrichi
-            status_obj = BudgetStatus(
-                id=budget_obj.id,
-                categorie_id=budget_obj.categorie_id,
-                montant_fixe=budget_obj.montant_fixe,
-                debut_periode=budget_obj.debut_periode,
-                fin_periode=budget_obj.fin_periode,
-                montant_depense=total_depense,
-                montant_restant=restant,
-                pourcentage_consomme=pourcentage,
-                est_depasse=est_depasse
-            )
+            status_obj = self._construire_statut(budget_obj, total_depense)
             budget_status_list.append(status_obj)
+            # préchauffe le cache pour les GET /{id} qui suivent la liste
+            budget_status_cache.set(budget_obj.utilisateur_id, status_obj)
             
         return budget_status_list
+
+    def get_budgets_status(self, budget_ids: list[int], user_id: int) -> list[BudgetStatus]:
+        """
+        Statuts de plusieurs budgets de l'utilisateur, dans l'ordre demandé.
+        Les statuts en cache sont servis directement, les autres sont calculés ensemble
+        par une seule requête groupée. Les ids inconnus ou appartenant à un autre
+        utilisateur sont ignorés.
+        """
+        budget_ids = list(dict.fromkeys(budget_ids))
+        if len(budget_ids) > MAX_BUDGETS_PAR_LOT:
+            raise ValueError(f"Au plus {MAX_BUDGETS_PAR_LOT} budgets par requête")
+
+        statuts = {}
+        for budget_id in budget_ids:
+            statut = budget_status_cache.get(user_id, budget_id)
+            if statut is not None:
+                statuts[budget_id] = statut
+
+        manquants = [budget_id for budget_id in budget_ids if budget_id not in statuts]
+        if manquants:
+            results = self._requete_statuts().filter(
+                Budget.id.in_(manquants),
+                Budget.utilisateur_id == user_id
+            ).all()
+
+            for budget_obj, total_depense in results:
+                statut = self._construire_statut(budget_obj, total_depense)
+                budget_status_cache.set(budget_obj.utilisateur_id, statut)
+                statuts[budget_obj.id] = statut
+
+        return [statuts[budget_id] for budget_id in budget_ids if budget_id in statuts]
     
     def update_budget(self, budget_id: int, categorie_id: int | None = None, montant: float | None = None, date_debut: date | None = None, date_fin: date | None = None, user_id: int | None = None) -> Budget:
         """
@@ -216,6 +294,7 @@ class BudgetService:
             budget.fin_periode = date_fin # type: ignore
 
         self.db.commit()
-        self.db.refresh(budget)
+
+        budget_status_cache.invalider_budget(budget.utilisateur_id, budget.id) #type: ignore
         
         return budget
\ No newline at end of file
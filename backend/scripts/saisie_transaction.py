@@ -1,21 +1,136 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
+import base64
+from datetime import datetime, time
+from typing import Iterable
 
-from models.models import Transaction, Categorie
+import orjson
+from sqlalchemy import Date, case, delete, false, func, select, tuple_, union_all, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.sql.functions import FunctionElement
+
+from models.models import CumulQuotidien, Transaction, Categorie
 from schemas.transaction import TransactionCreate
+from scripts.cache_budget import budget_status_cache
+from scripts.cumul_quotidien import CumulQuotidienService, JourDe, cumuls_disponibles, mouvement
+from scripts.registre_categories import registre_categories
+from scripts.solde_utilisateur import MONTANT_SIGNE, SoldeService, montant_signe
+
+# Taille des lots lus depuis le curseur serveur en mode flux
+TAILLE_LOT_FLUX = 500
+
+# colonnes de TransactionRead, dans l'ordre du schéma, pour la lecture sans objets ORM
+COLONNES_LECTURE = (
+    Transaction.montant,
+    Transaction.libelle,
+    Transaction.type,
+    Transaction.date,
+    Categorie.nom.label("categorie"),
+    Transaction.id,
+)
+
+# regroupements possibles des séries temporelles (GET /series)
+REGROUPEMENTS = ("categorie", "type")
+
+
+class DebutSemaine(FunctionElement):
+    """Lundi de la semaine (Date) d'une colonne date ou horodatage."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(DebutSemaine)
+def _debut_semaine(element, compiler, **kw):
+    return "CAST(date_trunc('week', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(DebutSemaine, "sqlite")
+def _debut_semaine_sqlite(element, compiler, **kw):
+    # dimanche suivant (ou le jour même), puis 6 jours en arrière
+    return "date(%s, 'weekday 0', '-6 days')" % compiler.process(element.clauses, **kw)
+
+
+class DebutMois(FunctionElement):
+    """Premier jour du mois (Date) d'une colonne date ou horodatage."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(DebutMois)
+def _debut_mois(element, compiler, **kw):
+    return "CAST(date_trunc('month', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(DebutMois, "sqlite")
+def _debut_mois_sqlite(element, compiler, **kw):
+    return "date(%s, 'start of month')" % compiler.process(element.clauses, **kw)
+
+
+# début de période par granularité des séries temporelles
+DEBUT_PERIODE = {"day": JourDe, "week": DebutSemaine, "month": DebutMois}
+
+
+def encoder_curseur(transaction: Transaction) -> str:
+    """Encode la position (date, id) d'une transaction en curseur opaque pour la pagination."""
+    brut = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(brut.encode()).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str) -> tuple[datetime, int]:
+    """Décode un curseur produit par encoder_curseur ; lève ValueError s'il est invalide."""
+    try:
+        brut = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)).decode()
+        date_str, id_str = brut.split("|")
+        return datetime.fromisoformat(date_str), int(id_str)
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+
+# Montant signé d'un cumul quotidien (équivalent de MONTANT_SIGNE)
+MONTANT_SIGNE_CUMUL = case(
+    (CumulQuotidien.type == 'DEPENSE', -CumulQuotidien.montant_total),
+    else_=CumulQuotidien.montant_total
+)
+
+
+def _jour_entier(date_debut: str | None) -> bool:
+    """Vrai si la période commence en début de journée (la fin couvre toujours la journée entière)."""
+    if not date_debut:
+        return True
+    try:
+        return datetime.fromisoformat(date_debut).time() == time.min
+    except ValueError:
+        return False
+
+
+def ligne_json(ligne) -> dict:
+    """Ligne (COLONNES_LECTURE) au format JSON de TransactionRead, sans passer par pydantic."""
+    return {
+        "montant": float(ligne.montant),
+        "libelle": ligne.libelle,
+        "type": ligne.type,
+        "date": ligne.date.isoformat(),
+        "categorie": ligne.categorie,
+        "id": ligne.id,
+    }
+
+
+def encoder_json(contenu) -> bytes:
+    """Encode comme ReponseJSON (orjson : UTF-8, séparateurs compacts)."""
+    return orjson.dumps(contenu)
+
 
 class TransactionService:
     def __init__(self, db: Session):
         self.db = db
+        self.soldes = SoldeService(db)
+        self.cumuls = CumulQuotidienService(db, self.soldes)
 
     def create_transaction(self, transaction_data: TransactionCreate, user_id: int | None = None) -> Transaction:
         # recherche de la catégorie d'abord
-        categorie = self.db.query(Categorie).filter(
-            Categorie.nom.ilike(transaction_data.categorie)
-        ).first()
-        
+        categorie = registre_categories.resoudre(self.db, transaction_data.categorie)
+
         if not categorie:
-            categories_dispo = [str(c.nom) for c in self.db.query(Categorie).all()]
+            categories_dispo = registre_categories.noms(self.db)
             raise ValueError(
                 f"La catégorie '{transaction_data.categorie}' n'existe pas. "
                 f"Disponibles : {', '.join(categories_dispo)}"
@@ -31,22 +146,48 @@ class TransactionService:
             utilisateur_id=user_id or 1  # Assigner l'utilisateur ou défaut à 1
         )
         
+        # le solde et les cumuls sont mis à jour dans la même transaction SQL que l'insertion
+        self.cumuls.preparer(db_transaction.utilisateur_id)
+        self.soldes.appliquer(
+            db_transaction.utilisateur_id,
+            montant_signe(db_transaction.montant, db_transaction.type)
+        )
+        self.cumuls.appliquer([mouvement(
+            db_transaction.montant, db_transaction.type, db_transaction.date,
+            db_transaction.categorie_id, db_transaction.utilisateur_id
+        )])
         self.db.add(db_transaction)
+        # id renvoyé par l'INSERT (RETURNING), attributs conservés après le commit : pas de relecture
         self.db.commit()
-        self.db.refresh(db_transaction)
+        # nom déjà connu par le registre : pas de chargement de categorie_obj à la sérialisation
+        db_transaction.categorie = categorie.nom
+
+        budget_status_cache.invalider(db_transaction.utilisateur_id, db_transaction.categorie_id, db_transaction.date)
         return db_transaction
 
-    def get_transactions(
-        self, 
-        date_debut: str | None = None, 
-        date_fin: str | None = None, 
+    def _appliquer_filtres(
+        self,
+        query,
+        date_debut: str | None = None,
+        date_fin: str | None = None,
         categorie_nom: str | None = None,
         type_filtre: str | None = None,
         user_id: int | None = None
-    ) -> list[Transaction]:
+    ):
+        """
+        Applique les filtres communs (période, catégorie, type, utilisateur) à une requête sur Transaction.
+        """
+        dt_debut, dt_fin, type_upper = self._valider_filtres(date_debut, date_fin, type_filtre)
+        return self._filtrer(query, dt_debut, dt_fin, categorie_nom, type_upper, user_id)
 
-        query = self.db.query(Transaction).join(Categorie)
-        # Validation et application des dates (assure debut <= fin si les deux fournis)
+    def _valider_filtres(
+        self,
+        date_debut: str | None,
+        date_fin: str | None,
+        type_filtre: str | None
+    ) -> tuple[datetime | None, datetime | None, str | None]:
+        """Valide la période et le type, et retourne (début, fin en fin de journée, type en majuscules)."""
+        # Validation des dates (assure debut <= fin si les deux fournis)
         dt_debut = None
         dt_fin = None
 
@@ -66,6 +207,32 @@ class TransactionService:
         if dt_debut and dt_fin and dt_debut > dt_fin:
             raise ValueError("La date de début ne peut pas être après la date de fin")
 
+        type_upper = None
+        if type_filtre:
+            type_upper = type_filtre.upper()
+            if type_upper not in ['REVENU', 'DEPENSE']:
+                raise ValueError("Le type doit être 'REVENU' ou 'DEPENSE'")
+
+        return dt_debut, dt_fin, type_upper
+
+    def _filtre_categorie(self, colonne, categorie_nom: str):
+        """
+        Condition sur l'id de la catégorie résolue par le registre, comme à la saisie
+        (casse et accents ignorés) ; une catégorie inconnue ne sélectionne aucune ligne.
+        """
+        categorie = registre_categories.resoudre(self.db, categorie_nom)
+        return colonne == categorie.id if categorie else false()
+
+    def _filtrer(
+        self,
+        query,
+        dt_debut: datetime | None,
+        dt_fin: datetime | None,
+        categorie_nom: str | None,
+        type_upper: str | None,
+        user_id: int | None
+    ):
+        """Applique à une requête sur Transaction des filtres déjà validés par _valider_filtres."""
         if dt_debut:
             query = query.filter(Transaction.date >= dt_debut)
 
@@ -73,20 +240,174 @@ class TransactionService:
             query = query.filter(Transaction.date <= dt_fin)
 
         if categorie_nom:
-            query = query.filter(Categorie.nom.ilike(categorie_nom))
-        
-        if type_filtre:
-            type_upper = type_filtre.upper()
-            if type_upper not in ['REVENU', 'DEPENSE']:
-                raise ValueError("Le type doit être 'REVENU' ou 'DEPENSE'")
+            query = query.filter(self._filtre_categorie(Transaction.categorie_id, categorie_nom))
+
+        if type_upper:
             query = query.filter(Transaction.type == type_upper)
-        
+
         # Filtre par utilisateur si fourni
         if user_id is not None:
             query = query.filter(Transaction.utilisateur_id == user_id)
-            
-        return query.order_by(Transaction.date.desc()).all()
+
+        return query
+
+    def get_transactions(
+        self, 
+        date_debut: str | None = None, 
+        date_fin: str | None = None, 
+        categorie_nom: str | None = None,
+        type_filtre: str | None = None,
+        user_id: int | None = None,
+        limit: int | None = None,
+        after: str | None = None
+    ) -> list[Transaction]:
+        """
+        Liste les transactions de la plus récente à la plus ancienne.
+        Avec `after` (curseur), ne retourne que celles situées après cette position dans l'ordre (date, id) ;
+        le coût d'une page ne dépend donc pas de sa profondeur.
+        """
+        # la catégorie est chargée par la jointure (pas de SELECT par transaction à la sérialisation)
+        query = self.db.query(Transaction).join(Categorie).options(contains_eager(Transaction.categorie_obj))
+        query = self._appliquer_filtres(query, date_debut, date_fin, categorie_nom, type_filtre, user_id)
+        return self._paginer(query, limit, after).all()
+
+    def get_lignes_transactions(
+        self,
+        date_debut: str | None = None,
+        date_fin: str | None = None,
+        categorie_nom: str | None = None,
+        type_filtre: str | None = None,
+        user_id: int | None = None,
+        limit: int | None = None,
+        after: str | None = None
+    ) -> list:
+        """
+        Variante de get_transactions pour les listes renvoyées telles quelles : une seule requête
+        sur les colonnes de TransactionRead (nom de catégorie lu par la jointure), qui renvoie des
+        tuples nommés sans construire d'objets ORM. À sérialiser avec ligne_json.
+        """
+        query = self.db.query(*COLONNES_LECTURE).join(Categorie)
+        query = self._appliquer_filtres(query, date_debut, date_fin, categorie_nom, type_filtre, user_id)
+        return self._paginer(query, limit, after).all()
+
+    def _paginer(self, query, limit: int | None, after: str | None):
+        """Ordre (date, id) décroissant, reprise après le curseur `after` et taille de page."""
+        if after:
+            date_curseur, id_curseur = decoder_curseur(after)
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < (date_curseur, id_curseur))
+
+        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+        if limit is not None:
+            query = query.limit(limit)
+
+        return query
+
+    def get_transactions_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        date_debut: str | None = None,
+        date_fin: str | None = None,
+        categorie_nom: str | None = None,
+        type_filtre: str | None = None,
+        user_id: int | None = None
+    ) -> tuple[list[Transaction], str | None]:
+        """Retourne une page de transactions et le curseur de la page suivante (None si c'est la dernière)."""
+        return self._decouper_page(
+            self.get_transactions, limit, after,
+            date_debut=date_debut, date_fin=date_fin, categorie_nom=categorie_nom, type_filtre=type_filtre, user_id=user_id
+        )
+
+    def get_lignes_page(self, limit: int, after: str | None = None, **filtres) -> tuple[list, str | None]:
+        """get_transactions_page sur les tuples de get_lignes_transactions."""
+        return self._decouper_page(self.get_lignes_transactions, limit, after, **filtres)
+
+    @staticmethod
+    def _decouper_page(lire, limit: int, after: str | None, **filtres):
+        if limit <= 0:
+            raise ValueError("La taille de page doit être strictement positive")
+
+        # Une ligne de plus pour savoir s'il reste une page suivante
+        lignes = lire(limit=limit + 1, after=after, **filtres)
+
+        if len(lignes) <= limit:
+            return lignes, None
+
+        lignes = lignes[:limit]
+        return lignes, encoder_curseur(lignes[-1])
+
+    def requete_flux(
+        self,
+        date_debut: str | None = None,
+        date_fin: str | None = None,
+        categorie_nom: str | None = None,
+        type_filtre: str | None = None,
+        user_id: int | None = None
+    ):
+        """
+        Requête (non exécutée) des transactions filtrées, catégorie chargée par la jointure,
+        dans l'ordre (date, id) décroissant. Les filtres sont validés immédiatement.
+        """
+        query = self.db.query(Transaction).join(Categorie).options(contains_eager(Transaction.categorie_obj))
+        query = self._appliquer_filtres(query, date_debut, date_fin, categorie_nom, type_filtre, user_id)
+        return query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    def iter_transactions(self, **filtres) -> Iterable[Transaction]:
+        """
+        Itère sur les transactions filtrées par lots lus depuis un curseur serveur (yield_per),
+        sans matérialiser la liste complète. La requête n'est exécutée qu'au parcours du résultat.
+        """
+        return self.requete_flux(**filtres).yield_per(TAILLE_LOT_FLUX)
     
+    def _proprietaire(self, transaction_id: int) -> int | None:
+        """Propriétaire d'une transaction, pour les appels sans utilisateur (ValueError si elle n'existe pas)."""
+        ligne = self.db.query(Transaction.utilisateur_id).filter(Transaction.id == transaction_id).first()
+        if ligne is None:
+            raise ValueError("Transaction non trouvée")
+        return ligne.utilisateur_id
+
+    def _introuvable(self, transaction_id: int, user_id: int | None, message_proprietaire: str) -> ValueError:
+        """
+        Erreur d'une écriture qui n'a touché aucune ligne : la transaction n'existe pas ou appartient
+        à un autre utilisateur. La requête d'existence n'est faite que sur ce chemin d'échec.
+        """
+        if user_id is not None and self.db.query(Transaction.id).filter(Transaction.id == transaction_id).first() is not None:
+            return ValueError(message_proprietaire)
+        return ValueError("Transaction non trouvée")
+
+    def _modifier(self, transaction_id: int, proprietaire: int | None, valeurs: dict) -> tuple[Transaction, tuple] | None:
+        """
+        Applique `valeurs` à la transaction si elle appartient à `proprietaire`.
+        Retourne (transaction modifiée, anciennes valeurs (montant, type, date, categorie_id)), None si aucune ligne ne correspond.
+        """
+        cible = (Transaction.id == transaction_id, Transaction.utilisateur_id == proprietaire)
+
+        if valeurs and self.db.get_bind().dialect.name == "postgresql":
+            # une seule instruction : la sous-requête verrouille la ligne et fournit ses anciennes valeurs
+            # (nécessaires au solde et aux cumuls) à RETURNING, qui ne voit sinon que les nouvelles
+            ancienne = select(
+                Transaction.id, Transaction.montant, Transaction.type, Transaction.date, Transaction.categorie_id
+            ).where(*cible).with_for_update().subquery("ancienne")
+            ligne = self.db.execute(
+                update(Transaction)
+                .where(Transaction.id == ancienne.c.id)
+                .values(**valeurs)
+                .returning(Transaction, ancienne.c.montant, ancienne.c.type, ancienne.c.date, ancienne.c.categorie_id)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            ).first()
+            return (ligne[0], tuple(ligne[1:])) if ligne is not None else None
+
+        # SQLite : RETURNING ne voit que les valeurs écrites, la ligne est lue (filtrée sur le propriétaire)
+        # puis modifiée au commit ; les écritures y sont de toute façon sérialisées par la base
+        transaction = self.db.query(Transaction).filter(*cible).first()
+        if transaction is None:
+            return None
+        anciennes = (transaction.montant, transaction.type, transaction.date, transaction.categorie_id)
+        for colonne, valeur in valeurs.items():
+            setattr(transaction, colonne, valeur)
+        return transaction, anciennes
+
     def update_transaction(
         self,
         transaction_id: int,
@@ -98,49 +419,67 @@ class TransactionService:
         user_id: int | None = None
     ) -> Transaction:
 
-        transaction = self.db.query(Transaction).filter(
-            Transaction.id == transaction_id
-        ).first()
-        
-        if not transaction:
-            raise ValueError("Transaction non trouvée")
-        
-        # Vérifier que l'utilisateur ne peut modifier que ses propres transactions
-        if user_id is not None and transaction.utilisateur_id != user_id:
-            raise ValueError("Vous ne pouvez modifier que vos propres transactions")
-        
+        valeurs = {}
+
         if montant is not None:
             if montant <= 0:
                 raise ValueError("Le montant doit être strictement positif")
-            transaction.montant = montant
+            valeurs["montant"] = montant
         
         if libelle is not None:
-            transaction.libelle = libelle
+            valeurs["libelle"] = libelle
         
         if type is not None:
             type_upper = type.upper()
             if type_upper not in ['REVENU', 'DEPENSE']:
                 raise ValueError("Le type doit être 'REVENU' ou 'DEPENSE'")
-            transaction.type = type_upper
+            valeurs["type"] = type_upper
         
         if date is not None:
-            transaction.date = date
+            valeurs["date"] = date
         
         if categorie is not None:
-            new_categorie = self.db.query(Categorie).filter(
-                Categorie.nom.ilike(categorie)
-            ).first()
-            
+            new_categorie = registre_categories.resoudre(self.db, categorie)
+
             if not new_categorie:
                 raise ValueError(f"La catégorie '{categorie}' n'existe pas")
             
-            transaction.categorie_id = new_categorie.id
+            valeurs["categorie_id"] = new_categorie.id
+
+        proprietaire = user_id if user_id is not None else self._proprietaire(transaction_id)
+
+        # verrouille le solde avant toute modification (solde et cumuls initialisés sur l'état actuel si besoin)
+        self.cumuls.preparer(proprietaire)
+        modification = self._modifier(transaction_id, proprietaire, valeurs)
+
+        # Un utilisateur ne peut modifier que ses propres transactions (condition de l'UPDATE)
+        if modification is None:
+            raise self._introuvable(transaction_id, user_id, "Vous ne pouvez modifier que vos propres transactions")
+
+        transaction, (ancien_montant, ancien_type, ancienne_date, ancienne_categorie_id) = modification
+        ancien_montant_signe = montant_signe(ancien_montant, ancien_type)
+
+        self.soldes.appliquer(
+            proprietaire,
+            montant_signe(transaction.montant, transaction.type) - ancien_montant_signe
+        )
+        self.cumuls.appliquer([
+            mouvement(ancien_montant, ancien_type, ancienne_date, ancienne_categorie_id, proprietaire, signe=-1),
+            mouvement(transaction.montant, transaction.type, transaction.date, transaction.categorie_id, proprietaire)
+        ])
         
         self.db.commit()
-        self.db.refresh(transaction)
 
+        # budgets touchés avant et après la modification
+        budget_status_cache.invalider(proprietaire, ancienne_categorie_id, ancienne_date)
+        budget_status_cache.invalider(proprietaire, transaction.categorie_id, transaction.date)
+
+        # nom de la catégorie depuis le registre : pas de chargement de categorie_obj à la sérialisation
         try:
-            if getattr(transaction, 'categorie_obj', None) is not None:
+            reference = new_categorie if categorie is not None else registre_categories.par_id(self.db, transaction.categorie_id)
+            if reference is not None:
+                transaction.categorie = reference.nom
+            elif getattr(transaction, 'categorie_obj', None) is not None:
                 transaction.categorie = transaction.categorie_obj.nom
             else:
                 transaction.categorie = None
@@ -195,101 +534,164 @@ class TransactionService:
         - 'REVENU' ajoute le montant
         - 'DEPENSE' soustrait le montant
         Les montants stockés sont supposés positifs.
+        L'agrégation est faite côté base en une seule requête SUM(CASE ...) :
+        aucune transaction n'est chargée en mémoire.
         """
+        # Sans filtre, le total d'un utilisateur est son solde maintenu : lecture en O(1)
+        if user_id is not None and not (date_debut or date_fin or categorie_nom or type_filtre):
+            return self.soldes.lire(user_id)
 
-        query = self.db.query(Transaction).join(Categorie)
-
-        dt_debut = None
-        dt_fin = None
-
-        if date_debut:
-            try:
-                dt_debut = datetime.fromisoformat(date_debut)
-            except ValueError:
-                raise ValueError("Format de date de début invalide")
+        # Période en jours entiers : somme des cumuls quotidiens (quelques centaines de lignes au plus)
+        # si ceux de l'utilisateur sont initialisés, sinon agrégat sur les transactions, en une requête
+        if user_id is not None and _jour_entier(date_debut):
+            brut = select(func.coalesce(func.sum(MONTANT_SIGNE), 0.0)).select_from(Transaction)
+            brut = self._appliquer_filtres(brut, date_debut, date_fin, categorie_nom, type_filtre, user_id)
 
-        if date_fin:
-            try:
-                dt_fin = datetime.fromisoformat(date_fin)
-                dt_fin = dt_fin.replace(hour=23, minute=59, second=59)
-            except ValueError:
-                raise ValueError("Format de date de fin invalide")
+            total = self.db.query(case(
+                (cumuls_disponibles(user_id), self._total_cumuls(date_debut, date_fin, categorie_nom, type_filtre, user_id)),
+                else_=brut.scalar_subquery()
+            )).scalar()
+            return float(total or 0.0)
 
-        if dt_debut and dt_fin and dt_debut > dt_fin:
-            raise ValueError("La date de début ne peut pas être après la date de fin")
+        query = self.db.query(func.coalesce(func.sum(MONTANT_SIGNE), 0.0)).select_from(Transaction)
+        query = self._appliquer_filtres(query, date_debut, date_fin, categorie_nom, type_filtre, user_id)
 
-        if dt_debut:
-            query = query.filter(Transaction.date >= dt_debut)
+        total = query.scalar()
 
-        if dt_fin:
-            query = query.filter(Transaction.date <= dt_fin)
+        return float(total or 0.0)
+    
+    def _appliquer_filtres_cumuls(
+        self,
+        query,
+        date_debut: str | None,
+        date_fin: str | None,
+        categorie_nom: str | None,
+        type_filtre: str | None,
+        user_id: int
+    ):
+        """
+        Équivalent de _appliquer_filtres sur les cumuls quotidiens, pour des filtres déjà validés
+        et une période en jours entiers.
+        """
+        query = query.filter(CumulQuotidien.utilisateur_id == user_id)
 
-        # Filtre par catégorie si fourni
+        if date_debut:
+            query = query.filter(CumulQuotidien.jour >= datetime.fromisoformat(date_debut).date())
+        if date_fin:
+            query = query.filter(CumulQuotidien.jour <= datetime.fromisoformat(date_fin).date())
         if categorie_nom:
-            query = query.filter(Categorie.nom.ilike(categorie_nom))
-
+            query = query.filter(self._filtre_categorie(CumulQuotidien.categorie_id, categorie_nom))
         if type_filtre:
-            type_upper = type_filtre.upper()
-            if type_upper not in ['REVENU', 'DEPENSE']:
-                raise ValueError("Le type doit être 'REVENU' ou 'DEPENSE'")
-            query = query.filter(Transaction.type == type_upper)
-        
-        # Filtre par utilisateur si fourni
-        if user_id is not None:
-            query = query.filter(Transaction.utilisateur_id == user_id)
+            query = query.filter(CumulQuotidien.type == type_filtre.upper())
 
-        transactions = query.all()
+        return query
 
-        total = 0.0
-        for t in transactions:
-            try:
-                montant = float(getattr(t, 'montant', 0) or 0)
-            except Exception:
-                montant = 0.0
+    def _total_cumuls(
+        self,
+        date_debut: str | None,
+        date_fin: str | None,
+        categorie_nom: str | None,
+        type_filtre: str | None,
+        user_id: int
+    ):
+        """Équivalent de l'agrégat des transactions sur les cumuls quotidiens (filtres déjà validés)."""
+        query = select(func.coalesce(func.sum(MONTANT_SIGNE_CUMUL), 0.0)).select_from(CumulQuotidien)
+        query = self._appliquer_filtres_cumuls(query, date_debut, date_fin, categorie_nom, type_filtre, user_id)
+        return query.scalar_subquery()
+
+    def get_series(
+        self,
+        granularite: str = "month",
+        regroupement: str = "categorie",
+        date_debut: str | None = None,
+        date_fin: str | None = None,
+        categorie_nom: str | None = None,
+        type_filtre: str | None = None,
+        user_id: int | None = None
+    ) -> dict:
+        """
+        Totaux signés (revenus - dépenses, comme get_total_transactions) par période et par
+        catégorie ou par type, regroupés en SQL, avec les filtres de get_transactions.
+        Retourne des colonnes parallèles (periode, groupe, montant, nb_transactions) triées par période puis groupe.
+        Sur des jours entiers, les cumuls quotidiens de l'utilisateur sont lus à la place des transactions s'ils sont initialisés.
+        """
+        if granularite not in DEBUT_PERIODE:
+            raise ValueError(f"Granularité invalide : {', '.join(DEBUT_PERIODE)}")
+        if regroupement not in REGROUPEMENTS:
+            raise ValueError(f"Regroupement invalide : {', '.join(REGROUPEMENTS)}")
+        jointure_categorie = regroupement == "categorie"
+        dt_debut, dt_fin, type_upper = self._valider_filtres(date_debut, date_fin, type_filtre)
+
+        periode = DEBUT_PERIODE[granularite](Transaction.date)
+        groupe = Categorie.nom if regroupement == "categorie" else Transaction.type
+        serie = select(
+            periode.label("periode"), groupe.label("groupe"),
+            func.sum(MONTANT_SIGNE).label("montant"), func.count(Transaction.id).label("nb_transactions")
+        ).select_from(Transaction)
+        if jointure_categorie:
+            serie = serie.join(Categorie)
+        serie = self._filtrer(serie, dt_debut, dt_fin, categorie_nom, type_upper, user_id).group_by(periode, groupe)
+
+        if user_id is not None and _jour_entier(date_debut):
+            # une seule instruction : chaque branche est conditionnée par l'état du solde de l'utilisateur
+            periode = DEBUT_PERIODE[granularite](CumulQuotidien.jour)
+            groupe = Categorie.nom if regroupement == "categorie" else CumulQuotidien.type
+            cumuls = select(
+                periode.label("periode"), groupe.label("groupe"),
+                func.sum(MONTANT_SIGNE_CUMUL).label("montant"),
+                func.sum(CumulQuotidien.nb_transactions).label("nb_transactions")
+            ).select_from(CumulQuotidien)
+            if jointure_categorie:
+                cumuls = cumuls.join(Categorie, Categorie.id == CumulQuotidien.categorie_id)
+            cumuls = self._appliquer_filtres_cumuls(cumuls, date_debut, date_fin, categorie_nom, type_filtre, user_id)
+            serie = union_all(
+                cumuls.filter(cumuls_disponibles(user_id)).group_by(periode, groupe),
+                serie.filter(~cumuls_disponibles(user_id)),
+            )
 
-            ttype = str(getattr(t, 'type', '')).upper() if getattr(t, 'type', None) is not None else ''
-            if ttype == 'DEPENSE':
-                total -= montant
-            else:
-                total += montant
+        lignes = self.db.execute(serie.order_by("periode", "groupe")).all()
 
-        return float(total)
+        return {
+            "granularite": granularite,
+            "regroupement": regroupement,
+            "periode": [l[0] for l in lignes],
+            "groupe": [l[1] for l in lignes],
+            "montant": [round(float(l[2] or 0.0), 2) for l in lignes],
+            "nb_transactions": [int(l[3]) for l in lignes],
+        }
     
     def delete_transaction(self, transaction_id: int, user_id: int | None = None) -> float:
-        """Supprime une transaction par son id et retourne le nouveau total recalculé."""
-        transaction = self.db.query(Transaction).filter(
-            Transaction.id == transaction_id
+        """
+        Supprime une transaction par son id et retourne le nouveau total.
+        Le total de l'utilisateur est lu dans son solde maintenu, sans relire ses transactions.
+        """
+        proprietaire = user_id if user_id is not None else self._proprietaire(transaction_id)
+
+        self.cumuls.preparer(proprietaire)
+        # une seule instruction : DELETE filtré sur le propriétaire, valeurs supprimées renvoyées par RETURNING
+        supprimee = self.db.execute(
+            delete(Transaction).where(
+                Transaction.id == transaction_id,
+                Transaction.utilisateur_id == proprietaire
+            ).returning(Transaction.montant, Transaction.type, Transaction.date, Transaction.categorie_id)
         ).first()
 
-        if not transaction:
-            raise ValueError("Transaction non trouvée")
-        
-        # Vérifier que l'utilisateur ne peut supprimer que ses propres transactions
-        if user_id is not None and transaction.utilisateur_id != user_id:
-            raise ValueError("Vous ne pouvez supprimer que vos propres transactions")
+        # Un utilisateur ne peut supprimer que ses propres transactions (condition du DELETE)
+        if supprimee is None:
+            raise self._introuvable(transaction_id, user_id, "Vous ne pouvez supprimer que vos propres transactions")
 
-        self.db.delete(transaction)
+        solde = self.soldes.appliquer(
+            proprietaire,
+            -montant_signe(supprimee.montant, supprimee.type)
+        )
+        self.cumuls.appliquer([mouvement(
+            supprimee.montant, supprimee.type, supprimee.date,
+            supprimee.categorie_id, proprietaire, signe=-1
+        )])
         self.db.commit()
 
-        query = self.db.query(Transaction).join(Categorie)
-        
-        # Si user_id est fourni, filtrer par utilisateur
-        if user_id is not None:
-            query = query.filter(Transaction.utilisateur_id == user_id)
-        
-        transactions = query.all()
-
-        total = 0.0
-        for t in transactions:
-            try:
-                montant = float(getattr(t, 'montant', 0) or 0)
-            except Exception:
-                montant = 0.0
-
-            ttype = str(getattr(t, 'type', '')).upper() if getattr(t, 'type', None) is not None else ''
-            if ttype == 'DEPENSE':
-                total -= montant
-            else:
-                total += montant
+        budget_status_cache.invalider(proprietaire, supprimee.categorie_id, supprimee.date)
 
-        return float(total)
\ No newline at end of file
+        if user_id is not None and solde is not None:
+            return float(solde)
+        return self.get_total_transactions(user_id=user_id)
@@ -0,0 +1,134 @@
+from datetime import date, datetime
+from typing import AsyncIterator, Callable
+
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from schemas.budget import BudgetRead, BudgetStatus
+from schemas.transaction import TransactionCreate, TransactionRead, TransactionSerie
+from scripts.import_transactions import ImportTransactionService, lire_releve
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TAILLE_LOT_FLUX, TransactionService, encoder_json, ligne_json
+
+
+class ServiceAsync:
+    """
+    Façade asynchrone d'un service synchrone, pour les routes `async def`.
+    - AsyncSession (DB_MODE=async) : le service s'exécute via run_sync, sur le driver
+      asynchrone, sans occuper de thread ;
+    - Session (DB_MODE=sync) : le service s'exécute dans le threadpool.
+    Les résultats sont convertis en schémas dans l'appel, pendant que la session est
+    encore utilisable (pas de chargement paresseux hors de la boucle).
+    """
+    service_sync = None
+
+    def __init__(self, db: Session | AsyncSession):
+        self.db = db
+
+    async def executer(self, appel: Callable):
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(lambda session: appel(self.service_sync(session)))
+        return await run_in_threadpool(appel, self.service_sync(self.db))
+
+
+class TransactionServiceAsync(ServiceAsync):
+    service_sync = TransactionService
+
+    async def create_transaction(self, transaction_data: TransactionCreate, user_id: int | None = None) -> TransactionRead:
+        return await self.executer(
+            lambda s: TransactionRead.model_validate(s.create_transaction(transaction_data, user_id=user_id))
+        )
+
+    async def get_transactions(self, **filtres) -> list[TransactionRead]:
+        return await self.executer(
+            lambda s: [TransactionRead.model_validate(t) for t in s.get_transactions(**filtres)]
+        )
+
+    async def get_transactions_page(self, limit: int, after: str | None = None, **filtres) -> tuple[list[TransactionRead], str | None]:
+        def appel(s):
+            transactions, next_cursor = s.get_transactions_page(limit=limit, after=after, **filtres)
+            return [TransactionRead.model_validate(t) for t in transactions], next_cursor
+        return await self.executer(appel)
+
+    async def get_transactions_json(self, **filtres) -> bytes:
+        """Liste des transactions déjà encodée en JSON, lue sans objets ORM ni validation pydantic."""
+        return await self.executer(
+            lambda s: encoder_json([ligne_json(l) for l in s.get_lignes_transactions(**filtres)])
+        )
+
+    async def get_transactions_page_json(self, limit: int, after: str | None = None, **filtres) -> bytes:
+        """Page de transactions (format TransactionPage) déjà encodée en JSON."""
+        def appel(s):
+            lignes, next_cursor = s.get_lignes_page(limit=limit, after=after, **filtres)
+            return encoder_json({"items": [ligne_json(l) for l in lignes], "next_cursor": next_cursor})
+        return await self.executer(appel)
+
+    async def iter_transactions(self, **filtres) -> AsyncIterator[TransactionRead]:
+        """
+        Flux des transactions filtrées. Les filtres sont validés à l'appel (ValueError
+        avant le début de la réponse), les lignes sont lues par lots au parcours.
+        """
+        if isinstance(self.db, AsyncSession):
+            requete = self.service_sync(self.db.sync_session).requete_flux(**filtres)
+
+            async def lignes():
+                resultat = await self.db.stream_scalars(
+                    requete.statement.execution_options(yield_per=TAILLE_LOT_FLUX)
+                )
+                async for t in resultat:
+                    yield TransactionRead.model_validate(t)
+            return lignes()
+
+        transactions = await run_in_threadpool(self.service_sync(self.db).iter_transactions, **filtres)
+
+        async def lignes():
+            async for t in iterate_in_threadpool(iter(transactions)):
+                yield TransactionRead.model_validate(t)
+        return lignes()
+
+    async def get_total_transactions(self, **filtres) -> float:
+        return await self.executer(lambda s: s.get_total_transactions(**filtres))
+
+    async def get_series(self, **filtres) -> TransactionSerie:
+        return await self.executer(lambda s: TransactionSerie.model_validate(s.get_series(**filtres)))
+
+    async def update_transaction(self, transaction_id: int, **modifications) -> TransactionRead:
+        return await self.executer(
+            lambda s: TransactionRead.model_validate(s.update_transaction(transaction_id=transaction_id, **modifications))
+        )
+
+    async def delete_transaction(self, transaction_id: int, user_id: int | None = None) -> float:
+        return await self.executer(lambda s: s.delete_transaction(transaction_id=transaction_id, user_id=user_id))
+
+
+class BudgetServiceAsync(ServiceAsync):
+    service_sync = BudgetService
+
+    async def add_budget(self, categorie_id: int, montant: float, date_debut: date, date_fin: date, user_id: int | None = None) -> BudgetRead:
+        return await self.executer(lambda s: BudgetRead.model_validate(
+            s.add_budget(categorie_id=categorie_id, montant=montant, date_debut=date_debut, date_fin=date_fin, user_id=user_id)
+        ))
+
+    async def get_budget_status(self, budget_id: int, user_id: int | None = None) -> BudgetStatus:
+        return await self.executer(lambda s: s.get_budget_status(budget_id, user_id=user_id))
+
+    async def get_budgets_status(self, budget_ids: list[int], user_id: int) -> list[BudgetStatus]:
+        return await self.executer(lambda s: s.get_budgets_status(budget_ids, user_id=user_id))
+
+    async def get_budgets(self, **filtres) -> list[BudgetStatus]:
+        return await self.executer(lambda s: s.get_budgets(**filtres))
+
+    async def update_budget(self, budget_id: int, **modifications) -> BudgetRead:
+        return await self.executer(
+            lambda s: BudgetRead.model_validate(s.update_budget(budget_id=budget_id, **modifications))
+        )
+
+
+class ImportTransactionServiceAsync(ServiceAsync):
+    service_sync = ImportTransactionService
+
+    async def importer(self, contenu: bytes, format_import: str, user_id: int, categorie_defaut: str = "Autres") -> dict:
+        """Le relevé est lu dans le threadpool (hors boucle d'événements), puis importé en session."""
+        lignes = await run_in_threadpool(lire_releve, contenu, format_import)
+        return await self.executer(lambda s: s.importer_lignes(lignes, user_id, categorie_defaut))
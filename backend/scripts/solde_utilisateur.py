@@ -0,0 +1,163 @@
+import argparse
+from sqlalchemy import Integer, case, false, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import Session
+
+from models.models import SoldeUtilisateur, Transaction
+
+# Montant signé d'une transaction : les dépenses sont soustraites, le reste ajouté
+MONTANT_SIGNE = case(
+    (Transaction.type == 'DEPENSE', -Transaction.montant),
+    else_=Transaction.montant
+)
+
+
+def montant_signe(montant: float, type_transaction: str | None) -> float:
+    """Équivalent Python de MONTANT_SIGNE pour une transaction déjà chargée."""
+    montant = float(montant or 0.0)
+    if str(type_transaction or '').upper() == 'DEPENSE':
+        return -montant
+    return montant
+
+
+class SoldeService:
+    """
+    Registre des soldes par utilisateur (table solde_utilisateur).
+    Le solde est mis à jour dans la même transaction SQL que l'écriture qui le modifie :
+    il suffit d'appeler appliquer() avant le commit du service appelant.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._lignes: dict[int, SoldeUtilisateur] = {}
+        self._transaction = None
+
+    def _calculer(self, user_id: int) -> float:
+        total = self.db.query(func.coalesce(func.sum(MONTANT_SIGNE), 0.0)).filter(
+            Transaction.utilisateur_id == user_id
+        ).scalar()
+        return round(float(total or 0.0), 2)
+
+    def _lire_verrouillee(self, user_id: int) -> SoldeUtilisateur | None:
+        # populate_existing : valeurs relues sous le verrou même si la ligne est déjà dans la
+        # session (objets non expirés au commit, expire_on_commit=False)
+        return self.db.query(SoldeUtilisateur).filter(
+            SoldeUtilisateur.utilisateur_id == user_id
+        ).with_for_update().populate_existing().first()
+
+    def _creer(self, user_id: int) -> None:
+        """
+        Crée la ligne de solde depuis les transactions en base, sans erreur si une écriture concurrente
+        l'a créée entre-temps : l'INSERT attend alors son commit et n'insère rien (ON CONFLICT DO NOTHING).
+        """
+        dialecte_insert = insert_postgresql if self.db.get_bind().dialect.name == "postgresql" else insert_sqlite
+        self.db.execute(dialecte_insert(SoldeUtilisateur).from_select(
+            ["utilisateur_id", "solde", "cumuls_initialises"],
+            select(
+                literal(user_id, Integer),
+                # 0 entier : la somme reste NUMERIC sous PostgreSQL, où round(x, 2) n'existe pas en flottant
+                func.round(func.coalesce(func.sum(MONTANT_SIGNE), 0), 2),
+                false()
+            ).where(Transaction.utilisateur_id == user_id)
+        ).on_conflict_do_nothing(index_elements=["utilisateur_id"]))
+
+    def verrouiller(self, user_id: int) -> SoldeUtilisateur:
+        """
+        Récupère (en la verrouillant) la ligne de solde de l'utilisateur.
+        Si elle n'existe pas encore, elle est initialisée depuis les transactions en base puis
+        verrouillée : deux premières écritures simultanées sont sérialisées comme les suivantes.
+        À appeler AVANT de modifier les transactions de la session.
+        """
+        transaction = self.db.get_transaction()
+        if transaction is not self._transaction:
+            # verrous relâchés au commit : les lignes d'une transaction précédente sont à relire
+            self._lignes.clear()
+        elif user_id in self._lignes:
+            return self._lignes[user_id]
+
+        ligne = self._lire_verrouillee(user_id)
+        if ligne is None:
+            # première écriture : pas de ligne à verrouiller, on la crée avant de la relire verrouillée
+            self._creer(user_id)
+            ligne = self._lire_verrouillee(user_id)
+
+        self._transaction = self.db.get_transaction()
+        self._lignes[user_id] = ligne
+        return ligne
+
+    def appliquer(self, user_id: int | None, delta: float) -> float | None:
+        """Ajoute delta au solde de l'utilisateur (sans commit) et retourne le nouveau solde."""
+        if user_id is None:
+            return None
+        ligne = self.verrouiller(user_id)
+        ligne.solde = round(float(ligne.solde or 0.0) + delta, 2)
+        return ligne.solde
+
+    def lire(self, user_id: int) -> float:
+        """Lit le solde en O(1) ; retombe sur l'agrégat si le registre n'est pas encore initialisé."""
+        ligne = self.db.get(SoldeUtilisateur, user_id)
+        if ligne is None:
+            return self._calculer(user_id)
+        return float(ligne.solde)
+
+    def reconcilier(self, corriger: bool = True) -> list[dict]:
+        """
+        Recalcule tous les soldes depuis les transactions et compare au registre.
+        Retourne la liste des écarts ; si corriger=True, le registre est reconstruit.
+        """
+        reels = {
+            user_id: round(float(total or 0.0), 2)
+            for user_id, total in self.db.query(
+                Transaction.utilisateur_id,
+                func.sum(MONTANT_SIGNE)
+            ).filter(
+                Transaction.utilisateur_id.isnot(None)
+            ).group_by(Transaction.utilisateur_id).all()
+        }
+        registre = {ligne.utilisateur_id: ligne for ligne in self.db.query(SoldeUtilisateur).all()}
+
+        ecarts = []
+        for user_id in sorted(set(reels) | set(registre)):
+            reel = reels.get(user_id, 0.0)
+            ligne = registre.get(user_id)
+            enregistre = float(ligne.solde) if ligne is not None else None
+
+            if enregistre is not None and round(enregistre - reel, 2) == 0:
+                continue
+
+            ecarts.append({
+                "utilisateur_id": user_id,
+                "solde_registre": enregistre,
+                "solde_reel": reel,
+                "ecart": round((enregistre or 0.0) - reel, 2),
+            })
+
+            if corriger:
+                if ligne is None:
+                    self.db.add(SoldeUtilisateur(utilisateur_id=user_id, solde=reel))
+                else:
+                    ligne.solde = reel
+
+        if corriger:
+            self.db.commit()
+
+        return ecarts
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reconstruit le registre des soldes depuis les transactions et affiche les écarts.")
+    parser.add_argument("--verifier", action="store_true", help="Affiche les écarts sans corriger le registre")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ecarts = SoldeService(db).reconcilier(corriger=not args.verifier)
+    finally:
+        db.close()
+
+    for e in ecarts:
+        print(f"utilisateur {e['utilisateur_id']}: registre={e['solde_registre']} réel={e['solde_reel']} écart={e['ecart']}")
+    print(f"{len(ecarts)} écart(s) {'détecté(s)' if args.verifier else 'corrigé(s)'}")
@@ -20,9 +20,13 @@ from auth import (
     get_current_user_from_header,
     get_current_user_from_token,
     get_current_user_optional,
+    Principal,
+    UtilisateursConnus,
+    utilisateurs_connus,
     SECRET_KEY,
     ALGORITHM
 )
+import auth
 from models.models import User, InvalidCredentialsError, UserAlreadyExistsError
 
 
@@ -227,7 +231,7 @@ class TestRegisterUser:
         # Vérifie que l'utilisateur a été créé
         assert mock_db.add.called
         assert mock_db.commit.called
-        assert mock_db.refresh.called
+        mock_db.refresh.assert_not_called()
         
     def test_register_user_already_exists(self):
         """Tentative d'enregistrement avec un username déjà existant"""
@@ -456,3 +460,73 @@ class TestGetCurrentUserFromHeader:
             
         assert exc_info.value.status_code == 401
         assert "non trouvé" in exc_info.value.detail.lower()
+
+
+class TestModeStateless:
+    """Mode AUTH_MODE=stateless : les claims du JWT font foi, existence vérifiée via cache"""
+
+    @pytest.fixture(autouse=True)
+    def mode_stateless(self, monkeypatch):
+        monkeypatch.setattr(auth, "AUTH_MODE", "stateless")
+        utilisateurs_connus.vider()
+        yield
+        utilisateurs_connus.vider()
+
+    def _credentials(self, user_id=1, username="testuser"):
+        credentials = MagicMock(spec=HTTPAuthorizationCredentials)
+        credentials.credentials = create_access_token(user_id, username)
+        return credentials
+
+    @pytest.mark.anyio
+    async def test_principal_depuis_les_claims(self):
+        """Retourne un Principal ; l'existence n'est vérifiée qu'une fois par TTL"""
+
+        mock_db = MagicMock(spec=Session)
+        mock_db.query.return_value.filter.return_value.first.return_value = (1,)
+
+        premier = await get_current_user_from_header(self._credentials(), mock_db)
+        second = await get_current_user_from_header(self._credentials(), mock_db)
+
+        assert premier == second == Principal(id=1, username="testuser")
+        mock_db.query.assert_called_once()
+
+    @pytest.mark.anyio
+    async def test_utilisateur_inexistant(self):
+        mock_db = MagicMock(spec=Session)
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_from_header(self._credentials(999), mock_db)
+
+        assert exc_info.value.status_code == 401
+        assert "non trouvé" in exc_info.value.detail.lower()
+
+    def test_utilisateur_supprime_refuse_apres_ttl(self):
+        """Un utilisateur supprimé en base reste accepté jusqu'à l'expiration de sa vérification, pas au-delà"""
+
+        horloge = MagicMock(return_value=0.0)
+        cache = UtilisateursConnus(ttl=10, horloge=horloge)
+        mock_db = MagicMock(spec=Session)
+        mock_db.query.return_value.filter.return_value.first.return_value = (1,)
+        assert cache.existe(mock_db, 1)
+
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+        horloge.return_value = 9.0
+        assert cache.existe(mock_db, 1)
+        horloge.return_value = 10.0
+        assert not cache.en_cache(1)
+        assert not cache.existe(mock_db, 1)
+
+    def test_expiration_du_cache(self):
+        horloge = MagicMock(return_value=0.0)
+        cache = UtilisateursConnus(ttl=10, horloge=horloge)
+        mock_db = MagicMock(spec=Session)
+        mock_db.query.return_value.filter.return_value.first.return_value = (1,)
+
+        assert cache.existe(mock_db, 1)
+        horloge.return_value = 5.0
+        assert cache.existe(mock_db, 1)
+        horloge.return_value = 11.0
+        assert cache.existe(mock_db, 1)
+
+        assert mock_db.query.call_count == 2
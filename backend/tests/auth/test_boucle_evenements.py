@@ -0,0 +1,80 @@
+"""
+Aucun appel bloquant sur la boucle d'événements dans la chaîne d'authentification
+
+Critères d'acceptation :
+- une lecture lente de l'utilisateur en base ne bloque pas la boucle (threadpool / run_sync)
+- en mode stateless, un utilisateur déjà vérifié est résolu sans requête ni thread
+- le détecteur (boucle asyncio en debug) signale bien un callback bloquant
+"""
+import asyncio
+import time
+import pytest
+
+import auth
+from auth import create_access_token, utilisateurs_connus
+from models.models import SoldeUtilisateur, User
+from tests.conftest import SEUIL_BLOCAGE_BOUCLE, boucle_debug
+
+LENTEUR = 4 * SEUIL_BLOCAGE_BOUCLE
+
+
+def _lecture_lente(valeur):
+    def lire(*args, **kwargs):
+        time.sleep(LENTEUR)
+        return valeur
+    return lire
+
+
+def test_detecteur_signale_un_blocage(blocages_boucle):
+    async def bloquant():
+        time.sleep(LENTEUR)
+
+    loop = boucle_debug()
+    try:
+        loop.run_until_complete(bloquant())
+    finally:
+        loop.close()
+
+    assert blocages_boucle()
+
+
+def test_auth_ne_bloque_pas_la_boucle(client_boucle_surveillee, mock_db_session, blocages_boucle):
+    user = User(id=1, username="testuser")
+    mock_db_session.query.return_value.filter.return_value.first.side_effect = _lecture_lente(user)
+    mock_db_session.get.return_value = SoldeUtilisateur(utilisateur_id=1, solde=12.0)
+
+    r = client_boucle_surveillee.get(
+        "/api/transactions/total",
+        headers={"Authorization": f"Bearer {create_access_token(1, 'testuser')}"}
+    )
+
+    assert r.status_code == 200
+    assert r.json() == {"total": 12.0}
+    assert blocages_boucle() == []
+
+
+def test_utilisateur_inconnu_401_sans_blocage(client_boucle_surveillee, mock_db_session, blocages_boucle):
+    mock_db_session.query.return_value.filter.return_value.first.side_effect = _lecture_lente(None)
+
+    r = client_boucle_surveillee.get(
+        "/api/transactions/total",
+        headers={"Authorization": f"Bearer {create_access_token(999, 'inconnu')}"}
+    )
+
+    assert r.status_code == 401
+    assert blocages_boucle() == []
+
+
+@pytest.mark.anyio
+async def test_stateless_cache_sans_requete(monkeypatch, mock_db_session):
+    monkeypatch.setattr(auth, "AUTH_MODE", "stateless")
+    utilisateurs_connus.vider()
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (1,)
+    token = create_access_token(1, "testuser")
+
+    await auth.get_current_user_from_token(token, mock_db_session)
+    principal = await auth.get_current_user_from_token(token, mock_db_session)
+
+    assert principal == auth.Principal(id=1, username="testuser")
+    mock_db_session.query.assert_called_once()
+    utilisateurs_connus.vider()
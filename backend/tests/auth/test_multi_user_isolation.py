@@ -45,7 +45,8 @@ class TestMultiUserIsolation:
         transaction.montant = 100.0
         transaction.utilisateur_id = 2
         
-        mock_db_session.query.return_value.filter.return_value.first.return_value = transaction
+        # UPDATE filtré sur le propriétaire : aucune ligne ; la transaction existe pourtant
+        mock_db_session.query.return_value.filter.return_value.first.side_effect = [None, (transaction.id,)]
         
         payload = {"montant": 200.0}
         
@@ -63,7 +64,9 @@ class TestMultiUserIsolation:
         transaction.id = 1
         transaction.utilisateur_id = 2
         
-        mock_db_session.query.return_value.filter.return_value.first.return_value = transaction
+        # DELETE filtré sur le propriétaire : aucune ligne ; la transaction existe pourtant
+        mock_db_session.execute.return_value.first.return_value = None
+        mock_db_session.query.return_value.filter.return_value.first.return_value = (transaction.id,)
         
         response = client.delete("/api/transactions/1")
         
@@ -0,0 +1,149 @@
+"""
+Pool de processus bcrypt
+
+Critères d'acceptation :
+- hachage et vérification exécutés hors du processus serveur quand workers > 0
+- au-delà de workers + file_max appels en vol : refus immédiat (503 + Retry-After)
+- le hash est recalculé à la connexion quand BCRYPT_ROUNDS a changé
+"""
+import os
+import subprocess
+import sys
+
+import time
+
+import anyio
+import bcrypt
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import auth
+from auth import authenticate_user, authenticate_user_async, cout_hash
+from models.models import User
+from scripts.pool_bcrypt import PoolBcrypt, ServiceSatureError, hacher, verifier
+
+
+class TestPool:
+
+    def test_mode_inline(self):
+        pool = PoolBcrypt(workers=0)
+
+        assert pool.executer(sum, [1, 2]) == 3
+        assert pool.stats()["executes"] == 1
+
+    def test_processus_dedies(self):
+        pool = PoolBcrypt(workers=1, file_max=0)
+        try:
+            hashed = pool.executer(hacher, b"password123", 4)
+            assert pool.executer(verifier, b"password123", hashed) is True
+            assert pool.executer(verifier, b"autre-mot", hashed) is False
+        finally:
+            pool.arreter()
+        assert cout_hash(hashed.decode()) == 4
+
+    def test_processus_sans_base(self):
+        # un processus du pool n'importe que ce module : ni SQLAlchemy ni moteur de base
+        code = "import sys, scripts.pool_bcrypt; print(sorted(m for m in ('sqlalchemy', 'database', 'models') if m in sys.modules))"
+        racine = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        sortie = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=racine)
+        assert sortie.stdout.strip() == "[]"
+
+    def test_saturation_refus_immediat(self):
+        pool = PoolBcrypt(workers=1, file_max=0)
+        pool._places.acquire()  # la seule place est occupée
+
+        with pytest.raises(ServiceSatureError):
+            pool.executer(hacher, b"password123", 4)
+        assert pool.stats()["rejets"] == 1
+
+    @pytest.mark.anyio
+    async def test_attente_sans_thread(self):
+        pool = PoolBcrypt(workers=1, file_max=0)
+        try:
+            await pool.executer_async(sum, [0])  # démarrage du processus
+            async with anyio.create_task_group() as groupe:
+                groupe.start_soon(pool.executer_async, time.sleep, 0.3)
+                await anyio.sleep(0.1)
+                # calcul en cours : aucun thread du threadpool AnyIO n'est tenu
+                assert pool.stats()["en_cours"] == 1
+                assert anyio.to_thread.current_default_thread_limiter().borrowed_tokens == 0
+        finally:
+            pool.arreter()
+        assert pool.stats()["en_cours"] == 0
+
+    @pytest.mark.anyio
+    async def test_saturation_refus_immediat_async(self):
+        pool = PoolBcrypt(workers=1, file_max=0)
+        pool._places.acquire()
+
+        with pytest.raises(ServiceSatureError):
+            await pool.executer_async(hacher, b"password123", 4)
+        assert pool.stats()["rejets"] == 1
+
+
+class TestRehash:
+
+    def test_cout_hash(self):
+        assert cout_hash("$2b$12$abcdefghijklmnopqrstuv") == 12
+        assert cout_hash("pas-un-hash") is None
+
+    def test_rehash_si_cout_different(self, monkeypatch):
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        user = User(id=1, username="testuser",
+                    password_hash=bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode())
+        mock_db = MagicMock()
+        mock_db.query.return_value.filter.return_value.first.return_value = user
+
+        authenticate_user("testuser", "password123", mock_db)
+
+        assert cout_hash(user.password_hash) == 4
+        assert bcrypt.checkpw(b"password123", user.password_hash.encode())
+        mock_db.commit.assert_called_once()
+
+    def test_pas_de_rehash_si_cout_identique(self, monkeypatch):
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        hashed = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4)).decode()
+        user = User(id=1, username="testuser", password_hash=hashed)
+        mock_db = MagicMock()
+        mock_db.query.return_value.filter.return_value.first.return_value = user
+
+        authenticate_user("testuser", "password123", mock_db)
+
+        assert user.password_hash == hashed
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.anyio
+    async def test_rehash_async(self, monkeypatch):
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        user = User(id=1, username="testuser",
+                    password_hash=bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode())
+        mock_db = MagicMock()
+        mock_db.query.return_value.filter.return_value.first.return_value = user
+
+        assert await authenticate_user_async("testuser", "password123", mock_db) is user
+
+        assert cout_hash(user.password_hash) == 4
+        mock_db.commit.assert_called_once()
+
+
+class TestAPI:
+
+    def test_login_sature_503(self, client, mock_db_session, monkeypatch):
+        user = User(id=1, username="testuser", password_hash="$2b$04$" + "a" * 53)
+        mock_db_session.query.return_value.filter.return_value.first.return_value = user
+        saturation = AsyncMock(side_effect=ServiceSatureError("Trop de requêtes"))
+        monkeypatch.setattr(auth.bcrypt_pool.pool_bcrypt, "executer_async", saturation)
+
+        response = client.post("/api/auth/login", json={"username": "testuser", "password": "password123"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_register_sature_503(self, client, mock_db_session, monkeypatch):
+        mock_db_session.query.return_value.filter.return_value.first.return_value = None
+        saturation = AsyncMock(side_effect=ServiceSatureError("Trop de requêtes"))
+        monkeypatch.setattr(auth.bcrypt_pool.pool_bcrypt, "executer_async", saturation)
+
+        response = client.post("/api/auth/register", json={"username": "u", "password": "password123"})
+
+        assert response.status_code == 503
@@ -1,3 +1,5 @@
+import asyncio
+import logging
 import pytest
 import os
 import sys
@@ -10,6 +12,98 @@ if ROOT not in sys.path:
 
 from models.models import Transaction, Budget, Categorie
 
+# --- ÉTAT PARTAGÉ DU PROCESSUS ---
+
+@pytest.fixture(autouse=True)
+def vider_caches():
+    """Les caches applicatifs sont globaux au processus : chaque test part d'un cache vide."""
+    from scripts.cache_budget import budget_status_cache
+    from scripts.registre_categories import registre_categories
+    budget_status_cache.vider()
+    amorcer_registre()
+    yield
+    budget_status_cache.vider()
+    registre_categories.invalider()
+
+def amorcer_registre():
+    """
+    Jeu de catégories de init.sql, identique à celui des bases SQLite de test : à rappeler
+    après leur création, dont le commit invalide le registre.
+    """
+    from scripts.registre_categories import CategorieRef, registre_categories
+    registre_categories.amorcer([
+        CategorieRef(1, "Alimentation", "🍔"),
+        CategorieRef(2, "Transport", "🚗"),
+        CategorieRef(3, "Santé", "⚕"),
+    ])
+
+@pytest.fixture
+def anyio_backend():
+    """L'API tourne sous uvicorn : les tests asynchrones utilisent asyncio."""
+    return "asyncio"
+
+# --- DÉTECTION DES BLOCAGES DE LA BOUCLE D'ÉVÉNEMENTS ---
+
+# durée au-delà de laquelle un callback est considéré comme bloquant la boucle (secondes)
+SEUIL_BLOCAGE_BOUCLE = 0.05
+
+def boucle_debug() -> asyncio.AbstractEventLoop:
+    """Boucle asyncio en mode debug : chaque callback plus long que le seuil est journalisé."""
+    loop = asyncio.new_event_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = SEUIL_BLOCAGE_BOUCLE
+    return loop
+
+@pytest.fixture
+def blocages_boucle(caplog):
+    """Retourne une fonction listant les callbacks ayant bloqué une boucle_debug pendant le test."""
+    caplog.set_level(logging.WARNING, logger="asyncio")
+
+    def lister() -> list[str]:
+        return [
+            r.getMessage() for r in caplog.records
+            if r.name == "asyncio" and "took" in r.getMessage()
+        ]
+    return lister
+
+@pytest.fixture
+def client_boucle_surveillee(mock_db_session):
+    """
+    Client FastAPI exécuté sur une boucle_debug, authentification réelle (JWT + lecture de l'utilisateur)
+    et session mockée : à combiner avec blocages_boucle.
+    """
+    from fastapi.testclient import TestClient
+    from app import app
+    from database import get_db
+
+    def override_get_db():
+        yield mock_db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app, backend_options={"loop_factory": boucle_debug}) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+# --- CAPTURE DES REQUÊTES SQL ---
+
+@pytest.fixture
+def capture_sql():
+    """
+    Mesure des requêtes SQL d'un bloc, conservées avec leurs paramètres (mesure_requetes.mesurer) :
+    `with capture_sql() as mesure:` puis mesure.nb_requetes et mesure.requetes [(statement, paramètres)].
+    """
+    from mesure_requetes import mesurer
+    return lambda: mesurer(capturer=True)
+
+# --- ENDPOINTS INTERNES ---
+
+@pytest.fixture
+def entetes_monitoring(monkeypatch):
+    """Configure un jeton de monitoring et retourne les en-têtes qui le présentent."""
+    from routers import monitoring
+    monkeypatch.setattr(monitoring, "MONITORING_TOKEN", "jeton-de-test")
+    return {"Authorization": "Bearer jeton-de-test"}
+
 # --- FIXTURES DE DONNÉES (DATA OBJECTS) ---
 
 @pytest.fixture
@@ -113,11 +207,22 @@ def mock_db_session():
     
     def side_effect_refresh(instance):
             if hasattr(instance, 'id') and instance.id is None:
-                instance.id = 1 
+                instance.id = 1
             return None
 
     session.refresh.side_effect = side_effect_refresh
 
+    # comme l'INSERT ... RETURNING du flush : les objets ajoutés reçoivent leur id au commit
+    ajoutes = []
+    session.add.side_effect = ajoutes.append
+
+    def side_effect_commit():
+        for instance in ajoutes:
+            side_effect_refresh(instance)
+        ajoutes.clear()
+
+    session.commit.side_effect = side_effect_commit
+
     return session
 
 @pytest.fixture
@@ -165,4 +270,122 @@ def client(mock_db_session, mock_user):
     with TestClient(app) as c:
         yield c
     # Nettoyage après les tests
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def sqlite_db_session():
+    """
+    Session SQLAlchemy sur une base SQLite en mémoire, schéma créé depuis les modèles.
+    Sert aux tests qui doivent vérifier le SQL réellement exécuté (agrégats, nombre de requêtes).
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from database import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)()
+
+    session.add_all([
+        Categorie(id=1, nom="Alimentation", icone="🍔"),
+        Categorie(id=2, nom="Transport", icone="🚗"),
+        Categorie(id=3, nom="Santé", icone="⚕"),
+    ])
+    session.commit()
+    amorcer_registre()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_deux_sessions(tmp_path):
+    """
+    Deux sessions indépendantes (deux connexions) sur une même base SQLite fichier, catégories créées :
+    pour rejouer des écritures concurrentes en les entrelaçant.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path}/concurrence.db")
+    Base.metadata.create_all(engine)
+    SessionTest = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    with SessionTest() as session:
+        session.add_all([
+            Categorie(id=1, nom="Alimentation", icone="🍔"),
+            Categorie(id=2, nom="Transport", icone="🚗"),
+            Categorie(id=3, nom="Santé", icone="⚕"),
+        ])
+        session.commit()
+    amorcer_registre()
+
+    a, b = SessionTest(), SessionTest()
+    yield a, b
+
+    a.close()
+    b.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_client(sqlite_db_session, mock_user):
+    """Client FastAPI branché sur la base SQLite en mémoire (utilisateur courant : mock_user)."""
+    from fastapi.testclient import TestClient
+    from app import app
+    from database import get_db
+    from auth import get_current_user_from_header
+
+    def override_get_db():
+        yield sqlite_db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_from_header] = lambda: mock_user
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def async_sqlite_client(tmp_path, mock_user):
+    """
+    Client FastAPI dont les routes reçoivent une AsyncSession (driver aiosqlite), comme en DB_MODE=async.
+    Base SQLite fichier : schéma et catégories créés en synchrone, connexions asynchrones sans pool.
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
+    from app import app
+    from database import Base, get_db
+    from auth import get_current_user_from_header
+
+    url = f"sqlite:///{tmp_path}/async.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([
+            Categorie(id=1, nom="Alimentation", icone="🍔"),
+            Categorie(id=2, nom="Transport", icone="🚗"),
+            Categorie(id=3, nom="Santé", icone="⚕"),
+        ])
+        session.commit()
+    amorcer_registre()
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_from_header] = lambda: mock_user
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
@@ -1,24 +1,23 @@
 import pytest
 from unittest.mock import MagicMock
+from models.models import SoldeUtilisateur
 
 
 class TestDeleteTransactionRouter:
     """Tests d'intégration pour l'endpoint DELETE /api/transactions/{id}"""
     
-    def test_delete_transaction_endpoint_success(self, client, mock_db_session, mock_transaction_list, mock_transaction):
-        """Teste que DELETE supprime puis renvoie le total recalculé"""
+    def test_delete_transaction_endpoint_success(self, client, mock_db_session, mock_transaction):
+        """Teste que DELETE supprime puis renvoie le solde mis à jour"""
         
-        mock_query_find = MagicMock()
-        mock_query_find.filter.return_value.first.return_value = mock_transaction
+        # valeurs de la ligne supprimée renvoyées par DELETE ... RETURNING
+        mock_db_session.execute.return_value.first.return_value = mock_transaction
         
-        remaining = [mock_transaction_list[1]]
-        mock_query_total = MagicMock()
-        mock_join = MagicMock()
-        mock_join.filter.return_value = mock_join  # chainable filter
-        mock_join.all.return_value = remaining
-        mock_query_total.join.return_value = mock_join
+        # Solde avant suppression : -50 (mock_transaction) + 25.5
+        solde = SoldeUtilisateur(utilisateur_id=1, solde=-24.5)
+        mock_query_solde = MagicMock()
+        mock_query_solde.filter.return_value.with_for_update.return_value.populate_existing.return_value.first.return_value = solde
         
-        mock_db_session.query.side_effect = [mock_query_find, mock_query_total]
+        mock_db_session.query.side_effect = [mock_query_solde]
         
         response = client.delete("/api/transactions/1")
         
@@ -29,7 +28,8 @@ class TestDeleteTransactionRouter:
     def test_delete_transaction_endpoint_not_found(self, client, mock_db_session):
         """Teste que DELETE sur une transaction inexistante retourne 400"""
         
-        # Simule l'absence de transaction
+        # Simule l'absence de transaction : le DELETE ne renvoie rien, l'id n'existe pas
+        mock_db_session.execute.return_value.first.return_value = None
         mock_query = MagicMock()
         mock_query.filter.return_value.first.return_value = None
         mock_db_session.query.return_value = mock_query
@@ -0,0 +1,144 @@
+"""
+Requêtes SQL par requête HTTP
+
+Critères d'acceptation :
+- nombre de requêtes, temps en base et plus longue requête dans l'en-tête Server-Timing
+- une ligne de journal JSON par requête, y compris pour les réponses en flux
+- nombre de requêtes borné par endpoint (régression N+1 détectée)
+- aucune relecture de la ligne après un INSERT/UPDATE (pas de refresh)
+"""
+import json
+import logging
+import pytest
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from mesure_requetes import MesureRequetes, mesurer, requetes_sql, server_timing
+from models.models import Budget, Transaction
+from scripts.cumul_quotidien import CumulQuotidienService
+from scripts.saisie_transaction import TransactionService
+from scripts.solde_utilisateur import SoldeService
+
+
+@pytest.fixture
+def donnees(sqlite_db_session):
+    sqlite_db_session.add_all([
+        Budget(id=1, categorie_id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=1),
+        *[
+            Transaction(id=i, montant=10.0 + i, libelle=f"T{i}", type="DEPENSE", date=datetime(2026, 1, i), categorie_id=1 + i % 3, utilisateur_id=1)
+            for i in range(1, 10)
+        ],
+    ])
+    sqlite_db_session.commit()
+    # régime établi : soldes et cumuls déjà initialisés (pas de coût de première écriture)
+    SoldeService(sqlite_db_session).reconcilier()
+    CumulQuotidienService(sqlite_db_session).reconstruire()
+    return sqlite_db_session
+
+
+# bornes hautes : une valeur dépassée signale une requête de trop (N+1, relecture)
+@pytest.mark.parametrize("methode, url, corps, maximum", [
+    ("get", "/api/transactions/", None, 1),
+    ("get", "/api/transactions/?limit=5", None, 1),
+    ("get", "/api/transactions/total", None, 1),
+    ("get", "/api/transactions/series", None, 1),
+    ("post", "/api/transactions/", {"montant": 5, "libelle": "x", "type": "DEPENSE", "date": "2026-01-06T00:00:00", "categorie": "Transport"}, 4),
+    # PUT : lecture + UPDATE sous SQLite, un seul UPDATE ... RETURNING sous PostgreSQL
+    ("put", "/api/transactions/1", {"montant": 6}, 5),
+    ("put", "/api/transactions/1", {"categorie": "Santé"}, 5),
+    ("delete", "/api/transactions/2", None, 5),
+    ("get", "/api/budgets/", None, 1),
+    ("get", "/api/budgets/1", None, 1),
+    ("post", "/api/budgets/", {"montant_fixe": 10, "debut_periode": "2026-02-01", "fin_periode": "2026-02-28", "categorie_id": 2}, 2),
+    ("put", "/api/budgets/1", {"montant_fixe": 50}, 3),
+    ("get", "/api/categories/", None, 1),
+])
+def test_requetes_par_endpoint(sqlite_client, donnees, methode, url, corps, maximum):
+    r = sqlite_client.request(methode.upper(), url, json=corps)
+
+    assert r.status_code in (200, 201)
+    assert requetes_sql(r) <= maximum
+
+
+@pytest.mark.parametrize("methode, url, corps", [
+    ("post", "/api/transactions/", {"montant": 5, "libelle": "x", "type": "DEPENSE", "date": "2026-01-06T00:00:00", "categorie": "Transport"}),
+    ("put", "/api/transactions/1", {"montant": 6}),
+    ("post", "/api/budgets/", {"montant_fixe": 10, "debut_periode": "2026-02-01", "fin_periode": "2026-02-28", "categorie_id": 2}),
+    ("put", "/api/budgets/1", {"montant_fixe": 50}),
+    ("post", "/api/auth/register", {"username": "nouveau", "password": "motdepasse123"}),
+])
+def test_pas_de_relecture_apres_ecriture(sqlite_client, donnees, methode, url, corps):
+    instructions = []
+    moteur = donnees.get_bind()
+
+    def ecouter(conn, cursor, sql, *args):
+        instructions.append(sql.split()[0])
+
+    event.listen(moteur, "before_cursor_execute", ecouter)
+    try:
+        r = sqlite_client.request(methode.upper(), url, json=corps)
+    finally:
+        event.remove(moteur, "before_cursor_execute", ecouter)
+
+    assert r.status_code in (200, 201)
+    derniere_ecriture = max(i for i, sql in enumerate(instructions) if sql in ("INSERT", "UPDATE"))
+    assert "SELECT" not in instructions[derniere_ecriture:]
+
+
+def test_journal_json_avec_route(sqlite_client, donnees, caplog):
+    caplog.set_level(logging.INFO, logger="api.requetes")
+
+    r = sqlite_client.put("/api/transactions/3", json={"montant": 6})
+
+    ligne = json.loads(caplog.records[-1].getMessage())
+    assert ligne["route"] == "/api/transactions/{transaction_id}"
+    assert (ligne["methode"], ligne["statut"]) == ("PUT", 200)
+    assert ligne["requetes_sql"] == requetes_sql(r) > 0
+    assert ligne["sql_max"].split()[0] in ("SELECT", "UPDATE", "INSERT", "DELETE")
+
+
+def test_flux_compte_dans_le_journal(sqlite_client, donnees, caplog):
+    caplog.set_level(logging.INFO, logger="api.requetes")
+
+    r = sqlite_client.get("/api/transactions/?stream=true")
+
+    # l'en-tête part avant la lecture des lignes ; le journal est écrit après le corps
+    assert len(r.text.splitlines()) == 9
+    assert json.loads(caplog.records[-1].getMessage())["requetes_sql"] >= 1
+
+
+def test_session_asynchrone(async_sqlite_client):
+    # run_sync exécute le service dans un greenlet : la mesure du contexte doit le suivre
+    r = async_sqlite_client.get("/api/transactions/")
+
+    assert r.status_code == 200
+    assert requetes_sql(r) == 1
+
+
+def test_mesurer_hors_requete(donnees):
+    with mesurer() as mesure:
+        TransactionService(donnees).get_transactions(user_id=1)
+
+    assert mesure.nb_requetes == 1
+    assert mesure.plus_lente.startswith("SELECT")
+    assert mesure.duree_sql == mesure.duree_max > 0
+    # requêtes conservées seulement sur demande
+    assert mesure.requetes is None
+
+
+def test_mesurer_capture_les_requetes(donnees):
+    with mesurer(capturer=True) as mesure:
+        TransactionService(donnees).get_transactions(user_id=1)
+
+    [(statement, parametres)] = mesure.requetes
+    assert statement == mesure.plus_lente
+    assert 1 in parametres
+
+
+def test_hors_mesure_rien_n_est_compte(donnees):
+    mesure = MesureRequetes()
+    TransactionService(donnees).get_transactions(user_id=1)
+
+    assert mesure == MesureRequetes()
+    assert server_timing(mesure, 0.5).endswith("app;dur=500.00")
@@ -0,0 +1,98 @@
+"""
+Métriques Prometheus (GET /metrics)
+
+Critères d'acceptation :
+- requêtes et latences par gabarit de route, routes inconnues regroupées
+- pool de connexions, cache des statuts de budget et pool bcrypt exposés
+- agrégation des workers en mode multiprocessus (PROMETHEUS_MULTIPROC_DIR)
+- exposition réservée aux porteurs du jeton de monitoring
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import REGISTRY, Counter, CollectorRegistry
+
+from metriques import ROUTE_INCONNUE, _Cumuls
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+
+def valeur(nom, **labels):
+    return REGISTRY.get_sample_value(nom, labels) or 0.0
+
+
+def test_requetes_par_gabarit_de_route(sqlite_client):
+    route = "/api/transactions/{transaction_id}"
+    avant = valeur("http_requests_total", method="DELETE", route=route, status="400")
+    latences_avant = valeur("http_request_duration_seconds_count", method="DELETE", route=route)
+
+    sqlite_client.delete("/api/transactions/41")
+    sqlite_client.delete("/api/transactions/42")
+
+    assert valeur("http_requests_total", method="DELETE", route=route, status="400") - avant == 2
+    assert valeur("http_request_duration_seconds_count", method="DELETE", route=route) - latences_avant == 2
+    assert valeur("http_requests_in_flight") == 0
+
+
+def test_route_inconnue(sqlite_client):
+    avant = valeur("http_requests_total", method="GET", route=ROUTE_INCONNUE, status="404")
+
+    sqlite_client.get("/nexiste/pas/123")
+
+    assert valeur("http_requests_total", method="GET", route=ROUTE_INCONNUE, status="404") - avant == 1
+
+
+def test_exposition(sqlite_client, entetes_monitoring):
+    sqlite_client.get("/api/budgets/")
+
+    r = sqlite_client.get("/metrics", headers=entetes_monitoring)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    for nom in (
+        'http_requests_total{method="GET",route="/api/budgets/",status="200"}',
+        "http_request_duration_seconds_bucket",
+        "http_requests_in_flight",
+        "db_pool_checkouts_total",
+        "budget_cache_entries",
+        "bcrypt_in_flight",
+    ):
+        assert nom in r.text
+
+
+def test_exposition_protegee(sqlite_client, entetes_monitoring, monkeypatch):
+    assert sqlite_client.get("/metrics").status_code == 401
+    assert sqlite_client.get("/metrics", headers={"Authorization": "Bearer autre"}).status_code == 401
+
+    monkeypatch.setattr("routers.monitoring.MONITORING_TOKEN", None)
+    assert sqlite_client.get("/metrics", headers=entetes_monitoring).status_code == 403
+
+
+def test_compteurs_cumules_et_remise_a_zero():
+    compteur = Counter("essai_total", "essai", ["event"], registry=CollectorRegistry())
+    cumuls = _Cumuls()
+
+    for cumul in (3, 5, 5, 2):  # 2 : le composant a été remis à zéro
+        cumuls.publier(compteur, cumul, "hits")
+
+    assert compteur.labels("hits")._value.get() == 7
+
+
+def test_agregation_multiprocessus(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from metriques import requetes_http, requetes_en_cours;"
+        "requetes_http.labels('GET', '/api/budgets/', '200').inc(3);"
+        "requetes_en_cours.inc()"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], cwd=BACKEND, env=env, check=True)
+
+    sortie = subprocess.run(
+        [sys.executable, "-c", "from metriques import exposer; print(exposer()[0].decode())"],
+        cwd=BACKEND, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+
+    assert 'http_requests_total{method="GET",route="/api/budgets/",status="200"} 6.0' in sortie
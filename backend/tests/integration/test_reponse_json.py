@@ -0,0 +1,77 @@
+"""
+Réponse JSON par défaut (orjson)
+
+Critères d'acceptation :
+- même JSON que la JSONResponse de Starlette après jsonable_encoder
+- schémas déjà validés et contenu déjà encodé renvoyés sans revalidation
+- classe par défaut de l'application
+"""
+import fastapi.routing
+import pytest
+from datetime import date, datetime
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import app
+from models.models import Budget, Transaction
+from reponses import ReponseJSON
+from schemas.budget import BudgetStatus
+from schemas.transaction import TransactionRead
+
+
+def test_meme_json_que_jsonresponse():
+    contenu = [
+        TransactionRead(id=1, montant=12.5, libelle="Café é€", type="DEPENSE", date=datetime(2026, 1, 2, 8, 30, 1, 250), categorie="Santé"),
+        BudgetStatus(
+            id=2, categorie_id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31),
+            montant_depense=30.0, montant_restant=70.0, pourcentage_consomme=30.0, est_depasse=False
+        ),
+        {"total": -3.0, "vide": None, 1: [True]},
+    ]
+
+    assert ReponseJSON(contenu).body == JSONResponse(jsonable_encoder(contenu)).body
+
+
+def test_liste_de_schemas():
+    contenu = [
+        TransactionRead(id=i, montant=1.5 * (i + 1), libelle="é", type="REVENU", date=datetime(2026, 1, 1, i), categorie="Santé")
+        for i in range(3)
+    ]
+
+    assert ReponseJSON(contenu).body == JSONResponse(jsonable_encoder(contenu)).body
+    assert ReponseJSON(contenu[0]).body == JSONResponse(jsonable_encoder(contenu[0])).body
+
+
+def test_contenu_deja_encode():
+    assert ReponseJSON(b'{"a":1}').body == b'{"a":1}'
+
+
+def test_classe_par_defaut(sqlite_client):
+    r = sqlite_client.get("/")
+
+    assert app.router.default_response_class.value is ReponseJSON
+    assert r.headers["content-type"] == "application/json"
+
+
+@pytest.fixture
+def budgets_en_base(sqlite_db_session):
+    sqlite_db_session.add_all([
+        Budget(id=1, categorie_id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=1),
+        Budget(id=2, categorie_id=2, montant_fixe=50.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=1),
+        Transaction(montant=60.0, libelle="b", type="DEPENSE", date=datetime(2026, 1, 10), categorie_id=2, utilisateur_id=1),
+    ])
+    sqlite_db_session.commit()
+    return sqlite_db_session
+
+
+@pytest.mark.parametrize("url", ["/api/budgets/", "/api/budgets/status?ids=2,1", "/api/budgets/2"])
+def test_budgets_sans_revalidation(sqlite_client, budgets_en_base, url, monkeypatch):
+    async def revalidation(*args, **kwargs):
+        pytest.fail("response_model revalidé")
+    monkeypatch.setattr(fastapi.routing, "serialize_response", revalidation)
+
+    r = sqlite_client.get(url)
+
+    assert r.status_code == 200
+    statuts = r.json() if isinstance(r.json(), list) else [r.json()]
+    assert {s["id"]: s["est_depasse"] for s in statuts}[2] is True
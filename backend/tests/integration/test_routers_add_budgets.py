@@ -40,9 +40,9 @@ def test_create_budget_endpoint_success(client, mock_db_session, mock_category):
 
 def test_create_budget_endpoint_categorie_invalid(client, mock_db_session):
     """Teste que la création d'un budget avec une catégorie inexistante renvoie une 400."""
-    payload = {"categorie_id": 1, "montant_fixe": 500.0, "debut_periode": "2026-01-01", "fin_periode": "2026-01-31"}
+    payload = {"categorie_id": 999, "montant_fixe": 500.0, "debut_periode": "2026-01-01", "fin_periode": "2026-01-31"}
 
-    mock_db_session.query.return_value.filter.return_value.first.return_value = None # Catégorie non trouvée
+    mock_db_session.query.return_value.all.return_value = [] # Catégorie absente de la base
 
     response = client.post("/api/budgets/", json=payload)
 
@@ -11,15 +11,8 @@ def test_get_budget_status_endpoint_success(client, mock_db_session, mock_budget
     budget_id = 1
     
 
-    def query_side_effect(model):
-        q = MagicMock()
-        if model is Budget:
-            q.filter.return_value.first.return_value = mock_budget
-        else:
-            q.filter.return_value.scalar.return_value= 50.0
-        return q
-
-    mock_db_session.query.side_effect = query_side_effect
+    # budget et somme des dépenses lus par la même requête
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (mock_budget, 50.0)
 
     response = client.get(f"/api/budgets/{budget_id}")
 
@@ -61,14 +54,12 @@ def test_get_budget_status_robustness(mock_db_session, mock_budget):
     service = BudgetService(mock_db_session)
     
     
-    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_budget
-    
-    # Configuration pour le second appel (le calcul de la somme): SQL SUM renvoie None s'il n'y a pas de lignes. Le code doit gérer ça.
-    mock_db_session.query.return_value.filter.return_value.scalar.return_value = None
+    # SQL SUM renvoie None s'il n'y a pas de lignes. Le code doit gérer ça.
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (mock_budget, None)
 
     result = service.get_budget_status(1)
 
     assert result.montant_depense == 0.0
 
-    mock_db_session.query.return_value.filter.return_value.scalar.assert_called()
+    mock_db_session.query.assert_called_once()
     mock_db_session.query.return_value.filter.return_value.all.assert_not_called()
\ No newline at end of file
@@ -20,12 +20,9 @@ def test_update_budget_endpoint_success(client, mock_db_session, mock_budget):
     mock_query = mock_db_session.query.return_value
     mock_query.filter.return_value = mock_query
 
-    mock_new_category = MagicMock()
-    mock_new_category.id = 2
-
+    # la catégorie 2 est résolue par le registre, sans requête
     mock_query.first.side_effect = [
         mock_budget,
-        mock_new_category,
         None
     ]
 
@@ -164,7 +161,6 @@ def test_update_budget_conflict(client, mock_db_session, mock_budget, mock_categ
 
     mock_query.first.side_effect = [
         mock_budget,
-        mock_category,
         budget_conflit
     ]
 
@@ -186,7 +182,7 @@ def test_update_budget_integrity_error(client, mock_db_session, mock_budget):
     mock_query = mock_db_session.query.return_value
     mock_query.filter.return_value = mock_query
     
-    mock_query.first.side_effect = [mock_budget, MagicMock(), None]
+    mock_query.first.side_effect = [mock_budget, None]
 
     mock_db_session.commit.side_effect = IntegrityError(
         statement="UPDATE budget ...", 
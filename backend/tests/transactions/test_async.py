@@ -0,0 +1,146 @@
+"""
+Routes transactions et budgets sur AsyncSession (DB_MODE=async)
+
+Critères d'acceptation :
+- les services synchrones s'exécutent via run_sync, réponses identiques au mode sync
+- le flux NDJSON lit les lignes par lots sur le driver asynchrone
+- les erreurs métier gardent leurs codes HTTP
+- import en masse et authentification sur la même session que les autres routes
+"""
+import json
+import pytest
+
+import auth
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import MagicMock
+
+from database import url_async
+from scripts.services_async import BudgetServiceAsync, TransactionServiceAsync
+
+
+def _creer(client, montant, type_t="DEPENSE", date="2026-01-05T00:00:00", categorie="alimentation"):
+    r = client.post("/api/transactions/", json={
+        "montant": montant, "libelle": "T", "type": type_t, "categorie": categorie, "date": date
+    })
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+class TestFacade:
+
+    def test_url_async(self):
+        assert url_async("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+        assert url_async("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+        assert url_async("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+    @pytest.mark.anyio
+    async def test_session_synchrone_dans_le_threadpool(self, mock_db_session):
+        mock_db_session.get.return_value = None
+        mock_db_session.query.return_value.filter.return_value.scalar.return_value = 12.5
+        service = TransactionServiceAsync(mock_db_session)
+
+        assert await service.get_total_transactions(user_id=1) == 12.5
+
+    @pytest.mark.anyio
+    async def test_session_asynchrone_via_run_sync(self):
+        session = MagicMock(spec=AsyncSession)
+
+        async def run_sync(fn):
+            return "résultat"
+        session.run_sync.side_effect = run_sync
+
+        assert await BudgetServiceAsync(session).get_budgets(user_id=1) == "résultat"
+        session.run_sync.assert_called_once()
+
+
+class TestAPIAsync:
+
+    def test_creation_liste_total(self, async_sqlite_client):
+        _creer(async_sqlite_client, 100.0, "REVENU")
+        cree = _creer(async_sqlite_client, 40.0, categorie="Santé")
+
+        assert cree["categorie"] == "Santé"
+        liste = async_sqlite_client.get("/api/transactions/").json()
+        assert [t["montant"] for t in liste] == [40.0, 100.0]
+        assert async_sqlite_client.get("/api/transactions/total").json() == {"total": 60.0}
+
+    def test_pagination_et_flux(self, async_sqlite_client):
+        for jour in range(1, 6):
+            _creer(async_sqlite_client, float(jour), date=f"2026-01-0{jour}T00:00:00")
+
+        page = async_sqlite_client.get("/api/transactions/?limit=2").json()
+        assert [t["montant"] for t in page["items"]] == [5.0, 4.0]
+        assert page["next_cursor"]
+
+        flux = async_sqlite_client.get("/api/transactions/?stream=true")
+        assert flux.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(l)["montant"] for l in flux.text.splitlines()] == [5.0, 4.0, 3.0, 2.0, 1.0]
+
+    def test_filtre_invalide_400(self, async_sqlite_client):
+        r = async_sqlite_client.get("/api/transactions/?stream=true&type_filtre=autre")
+
+        assert r.status_code == 400
+
+    def test_modification_et_suppression(self, async_sqlite_client):
+        cree = _creer(async_sqlite_client, 40.0)
+
+        r = async_sqlite_client.put(f"/api/transactions/{cree['id']}", json={"montant": 25.0, "categorie": "transport"})
+        assert r.status_code == 200
+        assert (r.json()["montant"], r.json()["categorie"]) == (25.0, "Transport")
+
+        r = async_sqlite_client.delete(f"/api/transactions/{cree['id']}")
+        assert r.json() == {"total": 0.0}
+
+    def test_budgets(self, async_sqlite_client):
+        _creer(async_sqlite_client, 30.0, date="2026-01-31T22:00:00")
+        r = async_sqlite_client.post("/api/budgets/", json={
+            "categorie_id": 1, "montant_fixe": 100.0, "debut_periode": "2026-01-01", "fin_periode": "2026-01-31"
+        })
+        assert r.status_code == 201
+        budget_id = r.json()["id"]
+
+        statut = async_sqlite_client.get(f"/api/budgets/{budget_id}").json()
+        assert statut["montant_depense"] == 30.0
+        assert [b["id"] for b in async_sqlite_client.get("/api/budgets/").json()] == [budget_id]
+
+        r = async_sqlite_client.put(f"/api/budgets/{budget_id}", json={"montant_fixe": 50.0})
+        assert r.json()["montant_fixe"] == 50.0
+        assert async_sqlite_client.get(f"/api/budgets/{budget_id}").json()["pourcentage_consomme"] == 60.0
+
+    def test_budget_inexistant_404(self, async_sqlite_client):
+        assert async_sqlite_client.get("/api/budgets/999").status_code == 404
+
+    def test_import_en_masse(self, async_sqlite_client):
+        contenu = (
+            "date,libelle,montant,type,categorie\n"
+            "2026-01-05,Courses,45.20,DEPENSE,alimentation\n"
+            "2026-01-06,Salaire,2000,REVENU,Transport\n"
+            "2026-01-07,Ticket,abc,DEPENSE,Transport\n"
+        )
+
+        r = async_sqlite_client.post("/api/transactions/bulk?format=csv", content=contenu)
+
+        assert r.status_code == 200, r.text
+        assert r.json()["importees"] == 2
+        assert [e["ligne"] for e in r.json()["erreurs"]] == [4]
+        assert async_sqlite_client.get("/api/transactions/total").json() == {"total": 1954.8}
+
+    def test_import_format_inconnu_400(self, async_sqlite_client):
+        r = async_sqlite_client.post("/api/transactions/bulk?format=xls", content="x")
+
+        assert r.status_code == 400
+
+    def test_inscription_et_connexion(self, async_sqlite_client, monkeypatch):
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        identifiants = {"username": "asynchrone", "password": "password123"}
+
+        r = async_sqlite_client.post("/api/auth/register", json=identifiants)
+        assert r.status_code == 201, r.text
+        assert async_sqlite_client.post("/api/auth/register", json=identifiants).status_code == 409
+
+        r = async_sqlite_client.post("/api/auth/login", json=identifiants)
+        assert r.status_code == 200
+        assert auth.verify_token(r.json()["access_token"])["username"] == "asynchrone"
+        assert async_sqlite_client.post(
+            "/api/auth/login", json={**identifiants, "password": "mauvais-mot"}
+        ).status_code == 401
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 from models.models import Categorie
+from scripts.registre_categories import registre_categories
 
 # ========= MODELES =========
 
@@ -35,6 +36,7 @@ class TestAPI:
             cats.append(cat)
         
         mock_db_session.query.return_value.all.return_value = cats
+        registre_categories.invalider()
         
         response = client.get("/api/categories/")
         
@@ -47,6 +49,7 @@ class TestAPI:
         """Liste vide"""
 
         mock_db_session.query.return_value.all.return_value = []
+        registre_categories.invalider()
         
         response = client.get("/api/categories/")
         assert response.status_code == 200
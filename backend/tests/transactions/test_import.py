@@ -0,0 +1,189 @@
+"""
+Import en masse POST /api/transactions/bulk
+
+Critères d'acceptation :
+- CSV (séparateur , ou ;), NDJSON et OFX acceptés
+- les lignes invalides sont rapportées sans bloquer les lignes valides
+- le solde de l'utilisateur intègre les lignes importées
+- format inconnu → HTTP 415 / 400
+"""
+import pytest
+
+import routers.transactions
+from models.models import Categorie, Transaction
+from scripts.import_transactions import ImportTransactionService
+from scripts.saisie_transaction import TransactionService
+
+CSV = (
+    "date,libelle,montant,type,categorie\n"
+    "2026-01-05,Courses,45.20,DEPENSE,alimentation\n"
+    "2026-01-06,Salaire,2000,REVENU,Alimentation\n"
+    "2026-01-07,Ticket,abc,DEPENSE,Transport\n"
+    "2026-01-08,Inconnue,10,DEPENSE,Loisirs\n"
+)
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260110120000[+1:CET]<TRNAMT>-12.50<NAME>Boulangerie
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260111<TRNAMT>100.00<NAME>Virement
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+# ========= SERVICE =========
+
+class TestService:
+    """Tests unitaires de l'import (SQLite en mémoire)"""
+
+    def test_import_csv_lignes_valides_et_erreurs(self, sqlite_db_session):
+        service = ImportTransactionService(sqlite_db_session)
+
+        resultat = service.importer(CSV, "csv", user_id=1)
+
+        assert resultat["importees"] == 2
+        assert [e["ligne"] for e in resultat["erreurs"]] == [4, 5]
+        assert "Montant invalide" in resultat["erreurs"][0]["erreur"]
+        assert "Loisirs" in resultat["erreurs"][1]["erreur"]
+        assert sqlite_db_session.query(Transaction).count() == 2
+
+    def test_import_met_a_jour_le_solde(self, sqlite_db_session):
+        ImportTransactionService(sqlite_db_session).importer(CSV, "csv", user_id=1)
+
+        assert TransactionService(sqlite_db_session).get_total_transactions(user_id=1) == pytest.approx(1954.80)
+
+    def test_import_csv_point_virgule_et_montant_signe(self, sqlite_db_session):
+        contenu = "Date;Libelle;Montant;Categorie\n05/01/2026;Essence;-60,5;Transport\n".encode("utf-8")
+
+        resultat = ImportTransactionService(sqlite_db_session).importer(contenu, "csv", user_id=1)
+
+        assert resultat == {"importees": 1, "erreurs": []}
+        t = sqlite_db_session.query(Transaction).one()
+        assert (t.type, t.montant, t.categorie_id) == ("DEPENSE", 60.5, 2)
+
+    def test_import_ndjson(self, sqlite_db_session):
+        contenu = (
+            '{"date": "2026-02-01", "libelle": "Pharmacie", "montant": 8, "type": "depense", "categorie": "Santé"}\n'
+            "\n"
+            "pas du json\n"
+            '{"date": "2026-02-02", "libelle": "", "montant": 8, "type": "DEPENSE", "categorie": "Santé"}\n'
+        )
+
+        resultat = ImportTransactionService(sqlite_db_session).importer(contenu, "ndjson", user_id=1)
+
+        assert resultat["importees"] == 1
+        assert resultat["erreurs"] == [
+            {"ligne": 3, "erreur": "JSON invalide"},
+            {"ligne": 4, "erreur": "Le libellé est obligatoire"},
+        ]
+
+    def test_import_ofx_categorie_defaut(self, sqlite_db_session):
+        resultat = ImportTransactionService(sqlite_db_session).importer(
+            OFX, "ofx", user_id=1, categorie_defaut="Alimentation"
+        )
+
+        assert resultat["importees"] == 2
+        types = {t.libelle: (t.type, t.montant) for t in sqlite_db_session.query(Transaction)}
+        assert types == {"Boulangerie": ("DEPENSE", 12.5), "Virement": ("REVENU", 100.0)}
+
+    @pytest.mark.parametrize("montant, erreur", [
+        ("nan", "Montant invalide"),
+        ("inf", "Montant invalide"),
+        ("-inf", "Montant invalide"),
+        ("0.001", "Le montant doit être positif"),
+        ("100000000", "dépasse le maximum"),
+        ("99999999.996", "dépasse le maximum"),
+        ("1e40", "dépasse le maximum"),
+    ])
+    def test_montant_hors_colonne_rejete_par_ligne(self, sqlite_db_session, montant, erreur):
+        contenu = (
+            "date,libelle,montant,type,categorie\n"
+            f"2026-01-05,Erronee,{montant},DEPENSE,Alimentation\n"
+            "2026-01-06,Courses,0.005,DEPENSE,Alimentation\n"
+        )
+
+        resultat = ImportTransactionService(sqlite_db_session).importer(contenu, "csv", user_id=1)
+
+        assert resultat["importees"] == 1
+        assert [e["ligne"] for e in resultat["erreurs"]] == [2]
+        assert erreur in resultat["erreurs"][0]["erreur"]
+        # arrondi au centime comme la colonne DECIMAL(10, 2)
+        assert sqlite_db_session.query(Transaction.montant).scalar() == 0.01
+        assert TransactionService(sqlite_db_session).get_total_transactions(user_id=1) == -0.01
+
+    def test_libelle_trop_long_rejete_par_ligne(self, sqlite_db_session):
+        contenu = (
+            "<OFX><BANKTRANLIST>"
+            f"<STMTTRN><TRNAMT>-12.50<DTPOSTED>20260105<NAME>{'x' * 256}</STMTTRN>"
+            f"<STMTTRN><TRNAMT>-3.00<DTPOSTED>20260106<NAME>{'y' * 255}</STMTTRN>"
+            "</BANKTRANLIST></OFX>"
+        )
+
+        resultat = ImportTransactionService(sqlite_db_session).importer(contenu, "ofx", user_id=1, categorie_defaut="Alimentation")
+
+        assert resultat["importees"] == 1
+        assert resultat["erreurs"] == [{"ligne": 1, "erreur": "Le libellé dépasse 255 caractères"}]
+        assert sqlite_db_session.query(Transaction.libelle).scalar() == "y" * 255
+
+    def test_format_inconnu(self, sqlite_db_session):
+        with pytest.raises(ValueError, match="Format"):
+            ImportTransactionService(sqlite_db_session).importer("x", "xls", user_id=1)
+
+    def test_aucune_ligne_valide_sans_ecriture(self, mock_db_session):
+        mock_db_session.query.return_value.all.return_value = [(1, "Alimentation")]
+
+        resultat = ImportTransactionService(mock_db_session).importer(
+            "date,libelle,montant,type,categorie\n2026-01-01,X,-3,DEPENSE,Alimentation\n", "csv", user_id=1
+        )
+
+        assert resultat["importees"] == 0
+        mock_db_session.execute.assert_not_called()
+        mock_db_session.commit.assert_not_called()
+
+# ========= API =========
+
+class TestAPI:
+    """Tests d'intégration de POST /api/transactions/bulk"""
+
+    def test_import_csv_par_content_type(self, sqlite_client, mock_user):
+        r = sqlite_client.post("/api/transactions/bulk", content=CSV, headers={"Content-Type": "text/csv"})
+
+        assert r.status_code == 200
+        assert r.json()["importees"] == 2
+        assert len(r.json()["erreurs"]) == 2
+
+    def test_import_format_en_parametre(self, sqlite_client, sqlite_db_session):
+        sqlite_db_session.add(Categorie(id=4, nom="Autres", icone="📦"))
+        sqlite_db_session.commit()
+
+        r = sqlite_client.post("/api/transactions/bulk?format=ofx", content=OFX)
+
+        assert r.status_code == 200
+        assert r.json() == {"importees": 2, "erreurs": []}
+
+    def test_content_type_non_supporte(self, sqlite_client):
+        r = sqlite_client.post("/api/transactions/bulk", content="x", headers={"Content-Type": "application/pdf"})
+
+        assert r.status_code == 415
+
+    def test_taille_annoncee_refusee_avant_lecture(self, sqlite_client, monkeypatch):
+        monkeypatch.setattr(routers.transactions, "TAILLE_IMPORT_MAX", 10)
+
+        r = sqlite_client.post("/api/transactions/bulk?format=csv", content=b"x" * 11)
+
+        assert r.status_code == 413
+
+    def test_flux_sans_taille_coupe_au_depassement(self, sqlite_client, sqlite_db_session, monkeypatch):
+        monkeypatch.setattr(routers.transactions, "TAILLE_IMPORT_MAX", len(CSV.encode()) - 1)
+        morceaux = iter([CSV.encode()[:20], CSV.encode()[20:]])
+
+        # transfert par morceaux : pas de Content-Length, la limite s'applique à la lecture
+        r = sqlite_client.post("/api/transactions/bulk?format=csv", content=morceaux)
+
+        assert r.status_code == 413
+        assert sqlite_db_session.query(Transaction).count() == 0
+
+    def test_format_invalide(self, sqlite_client):
+        r = sqlite_client.post("/api/transactions/bulk?format=xls", content="x")
+
+        assert r.status_code == 400
@@ -0,0 +1,139 @@
+"""
+Pagination par curseur et flux NDJSON sur GET /api/transactions
+
+Critères d'acceptation :
+- ordre stable (date, id) décroissant, y compris à date égale
+- next_cursor absent sur la dernière page
+- le flux NDJSON renvoie les mêmes transactions que la liste
+- curseur invalide → HTTP 400
+"""
+import json
+import pytest
+from datetime import datetime
+from models.models import Transaction
+from pydantic import TypeAdapter
+from schemas.transaction import TransactionRead
+from scripts.saisie_transaction import TransactionService, decoder_curseur, encoder_curseur, encoder_json, ligne_json
+
+
+@pytest.fixture
+def transactions_en_base(sqlite_db_session):
+    """7 transactions pour l'utilisateur 1 (dont 3 à la même date) et 1 pour l'utilisateur 2"""
+    dates = [datetime(2026, 1, j) for j in (1, 2, 3, 3, 3, 4, 5)]
+    for i, d in enumerate(dates, start=1):
+        sqlite_db_session.add(Transaction(
+            id=i, montant=10.0 * i, libelle=f"T{i}", type="DEPENSE", date=d, categorie_id=1, utilisateur_id=1
+        ))
+    sqlite_db_session.add(Transaction(
+        id=99, montant=1.0, libelle="autre", type="DEPENSE", date=datetime(2026, 1, 3), categorie_id=1, utilisateur_id=2
+    ))
+    sqlite_db_session.commit()
+    return sqlite_db_session
+
+# ========= SERVICE =========
+
+class TestService:
+    """Tests unitaires de la pagination par curseur"""
+
+    def test_curseur_aller_retour(self):
+        t = Transaction(id=42, date=datetime(2026, 3, 1, 12, 30))
+        assert decoder_curseur(encoder_curseur(t)) == (datetime(2026, 3, 1, 12, 30), 42)
+
+    def test_curseur_invalide(self):
+        with pytest.raises(ValueError, match="Curseur"):
+            decoder_curseur("pas-un-curseur")
+
+    def test_parcours_complet_par_pages(self, transactions_en_base):
+        """Les pages successives couvrent toutes les transactions, sans doublon ni trou"""
+        service = TransactionService(transactions_en_base)
+
+        vus, curseur, nb_pages = [], None, 0
+        while True:
+            page, curseur = service.get_transactions_page(limit=3, after=curseur, user_id=1)
+            vus.extend(t.id for t in page)
+            nb_pages += 1
+            if curseur is None:
+                break
+
+        assert nb_pages == 3
+        assert vus == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_derniere_page_exacte_sans_curseur(self, transactions_en_base):
+        service = TransactionService(transactions_en_base)
+
+        page, curseur = service.get_transactions_page(limit=7, user_id=1)
+
+        assert len(page) == 7
+        assert curseur is None
+
+    def test_pagination_avec_filtres(self, transactions_en_base):
+        service = TransactionService(transactions_en_base)
+
+        page, curseur = service.get_transactions_page(limit=2, date_fin="2026-01-03", user_id=1)
+        suite, fin = service.get_transactions_page(limit=2, after=curseur, date_fin="2026-01-03", user_id=1)
+
+        assert [t.id for t in page] == [5, 4]
+        assert [t.id for t in suite] == [3, 2]
+        assert fin is not None
+
+    def test_lignes_identiques_aux_objets(self, transactions_en_base):
+        """La lecture sans ORM donne le même JSON que TransactionRead, page par page, sans objet en session"""
+        transactions_en_base.add(Transaction(
+            id=8, montant=12.345, libelle="Café crème", type="DEPENSE", date=datetime(2026, 1, 6, 8, 15, 30, 250),
+            categorie_id=3, utilisateur_id=1
+        ))
+        transactions_en_base.commit()
+        transactions_en_base.expunge_all()
+        service = TransactionService(transactions_en_base)
+
+        lignes, curseur = service.get_lignes_page(limit=3, user_id=1)
+        assert len(transactions_en_base.identity_map) == 0
+        objets, curseur_objets = service.get_transactions_page(limit=3, user_id=1)
+
+        assert curseur == curseur_objets
+        assert encoder_json([ligne_json(l) for l in lignes]) == TypeAdapter(list[TransactionRead]).dump_json(
+            [TransactionRead.model_validate(t) for t in objets]
+        )
+
+# ========= API =========
+
+class TestAPI:
+    """Tests d'intégration : paramètres limit / after / stream"""
+
+    def test_liste_sans_pagination_inchangee(self, sqlite_client, transactions_en_base):
+        response = sqlite_client.get("/api/transactions/")
+
+        assert response.status_code == 200
+        assert [t["id"] for t in response.json()] == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_page_avec_next_cursor(self, sqlite_client, transactions_en_base):
+        response = sqlite_client.get("/api/transactions/", params={"limit": 4})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [t["id"] for t in data["items"]] == [7, 6, 5, 4]
+        assert data["items"][0]["categorie"] == "Alimentation"
+
+        suite = sqlite_client.get("/api/transactions/", params={"limit": 4, "after": data["next_cursor"]}).json()
+        assert [t["id"] for t in suite["items"]] == [3, 2, 1]
+        assert suite["next_cursor"] is None
+
+    def test_curseur_invalide_400(self, sqlite_client, transactions_en_base):
+        response = sqlite_client.get("/api/transactions/", params={"limit": 4, "after": "%%%"})
+
+        assert response.status_code == 400
+        assert "curseur" in response.json()["detail"].lower()
+
+    def test_flux_ndjson(self, sqlite_client, transactions_en_base):
+        response = sqlite_client.get("/api/transactions/", params={"stream": True, "type_filtre": "depense"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lignes = [json.loads(l) for l in response.text.splitlines()]
+        assert [t["id"] for t in lignes] == [7, 6, 5, 4, 3, 2, 1]
+        assert lignes[0]["categorie"] == "Alimentation"
+
+    def test_flux_filtre_invalide_400(self, sqlite_client, transactions_en_base):
+        response = sqlite_client.get("/api/transactions/", params={"stream": True, "type_filtre": "autre"})
+
+        assert response.status_code == 400
@@ -0,0 +1,59 @@
+"""
+Chargement de la catégorie des transactions (pas de N+1)
+
+Critères d'acceptation :
+- les lectures chargent le nom de catégorie par la jointure : une requête quel que soit le nombre de lignes
+- les réponses de création et de modification ne relisent pas la catégorie
+"""
+import pytest
+from datetime import datetime
+
+from models.models import Transaction
+from schemas.transaction import TransactionCreate, TransactionRead
+from scripts.saisie_transaction import TransactionService
+
+
+def _lectures_categorie(requetes):
+    return [statement for statement, _ in requetes if "FROM categorie" in statement]
+
+
+@pytest.fixture
+def transactions_en_base(sqlite_db_session):
+    for i in range(9):
+        sqlite_db_session.add(Transaction(
+            montant=10.0 + i, libelle=f"T{i}", type="DEPENSE", date=datetime(2026, 1, 1 + i),
+            categorie_id=1 + i % 3, utilisateur_id=1
+        ))
+    sqlite_db_session.commit()
+    sqlite_db_session.expunge_all()
+    return sqlite_db_session
+
+
+@pytest.mark.parametrize("lecture", [
+    lambda s: s.get_transactions(user_id=1),
+    lambda s: s.get_transactions_page(limit=5, user_id=1)[0],
+    lambda s: list(s.iter_transactions(user_id=1)),
+])
+def test_lecture_en_une_requete(transactions_en_base, capture_sql, lecture):
+    service = TransactionService(transactions_en_base)
+
+    with capture_sql() as mesure:
+        reponse = [TransactionRead.model_validate(t) for t in lecture(service)]
+
+    assert mesure.nb_requetes == 1
+    assert {t.categorie for t in reponse} == {"Alimentation", "Transport", "Santé"}
+
+
+def test_creation_et_modification_sans_relecture_de_categorie(transactions_en_base, capture_sql):
+    service = TransactionService(transactions_en_base)
+
+    with capture_sql() as mesure:
+        creee = TransactionRead.model_validate(service.create_transaction(
+            TransactionCreate(montant=5.0, libelle="x", type="DEPENSE", date=datetime(2026, 2, 1), categorie="santé"),
+            user_id=1
+        ))
+        modifiee = TransactionRead.model_validate(service.update_transaction(creee.id, montant=6.0, user_id=1))
+        deplacee = TransactionRead.model_validate(service.update_transaction(creee.id, categorie="transport", user_id=1))
+
+    assert (creee.categorie, modifiee.categorie, deplacee.categorie) == ("Santé", "Santé", "Transport")
+    assert _lectures_categorie(mesure.requetes) == []
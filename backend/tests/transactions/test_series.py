@@ -0,0 +1,117 @@
+"""
+Séries temporelles (GET /api/transactions/series)
+
+Critères d'acceptation :
+- totaux par jour, semaine ou mois, par catégorie ou par type, calculés en SQL
+- mêmes filtres que la liste des transactions
+- réponse en colonnes parallèles
+- mêmes valeurs depuis les cumuls quotidiens que depuis les transactions
+"""
+import pytest
+from datetime import date, datetime
+
+from models.models import CumulQuotidien, Transaction
+from schemas.transaction import TransactionCreate
+from scripts.saisie_transaction import TransactionService
+
+
+@pytest.fixture
+def historique(sqlite_db_session):
+    sqlite_db_session.add_all([
+        # mercredi 31 décembre 2025 et lundi 5 janvier 2026
+        Transaction(montant=10.0, libelle="a", type="DEPENSE", date=datetime(2025, 12, 31, 22), categorie_id=1, utilisateur_id=1),
+        Transaction(montant=20.0, libelle="b", type="DEPENSE", date=datetime(2026, 1, 5, 8), categorie_id=1, utilisateur_id=1),
+        Transaction(montant=5.0, libelle="c", type="DEPENSE", date=datetime(2026, 1, 11, 23), categorie_id=2, utilisateur_id=1),
+        Transaction(montant=100.0, libelle="d", type="REVENU", date=datetime(2026, 1, 20), categorie_id=1, utilisateur_id=1),
+        Transaction(montant=999.0, libelle="e", type="DEPENSE", date=datetime(2026, 1, 5), categorie_id=1, utilisateur_id=2),
+    ])
+    sqlite_db_session.commit()
+    return sqlite_db_session
+
+
+def test_mois_par_categorie(historique):
+    serie = TransactionService(historique).get_series("month", "categorie", user_id=1)
+
+    assert serie == {
+        "granularite": "month",
+        "regroupement": "categorie",
+        "periode": [date(2025, 12, 1), date(2026, 1, 1), date(2026, 1, 1)],
+        "groupe": ["Alimentation", "Alimentation", "Transport"],
+        "montant": [-10.0, 80.0, -5.0],
+        "nb_transactions": [1, 2, 1],
+    }
+
+
+def test_semaine_commence_le_lundi(historique):
+    serie = TransactionService(historique).get_series("week", "type", type_filtre="depense", user_id=1)
+
+    assert serie["periode"] == [date(2025, 12, 29), date(2026, 1, 5)]
+    assert serie["montant"] == [-10.0, -25.0]
+
+
+def test_filtres_de_la_liste(historique):
+    serie = TransactionService(historique).get_series(
+        "day", "type", date_debut="2026-01-01", date_fin="2026-01-11", categorie_nom="alimentation", user_id=1
+    )
+
+    assert (serie["periode"], serie["groupe"], serie["montant"]) == ([date(2026, 1, 5)], ["DEPENSE"], [-20.0])
+
+
+def test_parametres_invalides(mock_db_session):
+    service = TransactionService(mock_db_session)
+
+    with pytest.raises(ValueError, match="Granularité"):
+        service.get_series("year")
+    with pytest.raises(ValueError, match="Regroupement"):
+        service.get_series("month", "libelle")
+
+
+def test_memes_valeurs_depuis_les_cumuls(historique):
+    service = TransactionService(historique)
+    avant = {g: service.get_series(g, "categorie", user_id=1) for g in ("day", "week", "month")}
+
+    # la première écriture initialise les cumuls de l'utilisateur ; on l'annule ensuite
+    ajout = service.create_transaction(
+        TransactionCreate(montant=1.0, libelle="x", type="DEPENSE", date=datetime(2026, 1, 5), categorie="Santé"), user_id=1
+    )
+    service.delete_transaction(ajout.id, user_id=1)
+
+    for granularite, serie in avant.items():
+        assert service.get_series(granularite, "categorie", user_id=1) == serie
+
+
+
+def test_source_choisie_par_le_solde(historique):
+    service = TransactionService(historique)
+    ajout = service.create_transaction(
+        TransactionCreate(montant=1.0, libelle="x", type="DEPENSE", date=datetime(2026, 1, 5), categorie="Santé"), user_id=1
+    )
+    service.delete_transaction(ajout.id, user_id=1)
+    # cumuls initialisés : la série les lit, sans passer par les transactions
+    historique.query(CumulQuotidien).filter(CumulQuotidien.type == "REVENU").update({"montant_total": 40.0})
+    historique.commit()
+
+    assert service.get_series("month", "type", user_id=1)["montant"] == [-10.0, -25.0, 40.0]
+    # période commençant en cours de journée : lecture des transactions
+    assert service.get_series("month", "type", date_debut="2026-01-01T12:00:00", user_id=1)["montant"] == [-25.0, 100.0]
+
+class TestAPI:
+
+    def test_route_series(self, sqlite_client, historique):
+        r = sqlite_client.get("/api/transactions/series?granularity=month&group_by=type")
+
+        assert r.status_code == 200
+        assert r.json() == {
+            "granularite": "month",
+            "regroupement": "type",
+            "periode": ["2025-12-01", "2026-01-01", "2026-01-01"],
+            "groupe": ["DEPENSE", "DEPENSE", "REVENU"],
+            "montant": [-10.0, -25.0, 100.0],
+            "nb_transactions": [1, 2, 1],
+        }
+
+    def test_granularite_inconnue(self, sqlite_client):
+        assert sqlite_client.get("/api/transactions/series?granularity=year").status_code == 422
+
+    def test_filtre_invalide(self, sqlite_client):
+        assert sqlite_client.get("/api/transactions/series?type_filtre=autre").status_code == 400
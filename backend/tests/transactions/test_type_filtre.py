@@ -45,6 +45,7 @@ def test_get_transactions_with_type():
     
     mock_join.filter.side_effect = filter_side_effect
     mock_query.join.return_value = mock_join
+    mock_join.options.return_value = mock_join  # contains_eager de la catégorie
     mock_db.query.return_value = mock_query
     
     # Test
@@ -100,8 +101,11 @@ def test_get_total_transactions_with_type_filter():
         return mock_query
     
     mock_join.filter.side_effect = filter_side_effect
+    mock_query.select_from.return_value = mock_query
     mock_query.join.return_value = mock_join
-    mock_query.all.return_value = depenses
+    mock_query.filter.side_effect = filter_side_effect
+    # la base ne renvoie que la somme signée des dépenses filtrées
+    mock_query.scalar.return_value = -sum(t.montant for t in depenses)
     mock_db.query.return_value = mock_query
     
     service = TransactionService(mock_db)
@@ -174,14 +178,11 @@ def test_total_transactions_with_type_filter(client, mock_db_session):
         mock_join.order_by.return_value = mock_order
         mock_query.join.return_value = mock_join
         
-        # For get_total_transactions, we need different mock behavior
-        # The query chain should be: query(Transaction).join(Categorie).filter(...).all()
-        # without order_by
-        def custom_all():
-            return depenses
-        
-        mock_join.all.return_value = depenses
-        mock_query.all.return_value = depenses
+        # For get_total_transactions, the query chain is:
+        # query(SUM(CASE ...)).select_from(Transaction).filter(...).scalar()
+        mock_query.select_from.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.scalar.return_value = -sum(t.montant for t in depenses)
         
         mock_db_session.query.return_value = mock_query
         
@@ -14,6 +14,7 @@ from unittest.mock import MagicMock
 from datetime import datetime
 from pydantic import ValidationError
 from schemas.transaction import TransactionCreate
+from scripts.registre_categories import registre_categories
 from scripts.saisie_transaction import TransactionService
 
 # ========= SCHÉMAS =========
@@ -135,6 +136,7 @@ class TestService:
         mock_filter = MagicMock()
         mock_filter.first.return_value = mock_cat
         mock_query.filter.return_value = mock_filter
+        mock_query.all.return_value = [mock_cat]
         mock_db.query.return_value = mock_query
         
         # Test
@@ -195,7 +197,10 @@ class TestAPI:
         mock_filter = MagicMock()
         mock_filter.first.return_value = mock_category
         mock_query.filter.return_value = mock_filter
+        mock_query.all.return_value = [mock_category]
         mock_db_session.query.return_value = mock_query
+        # le registre se recharge depuis la base simulée
+        registre_categories.invalider()
 
         mock_db_session.refresh.side_effect = mock_refresh
         
@@ -245,6 +250,7 @@ class TestAPI:
         mock_filter = MagicMock()
         mock_filter.first.return_value = mock_category
         mock_query.filter.return_value = mock_filter
+        mock_query.all.return_value = [mock_category]
         mock_db_session.query.return_value = mock_query
 
         mock_db_session.refresh.side_effect = mock_refresh
@@ -263,10 +269,12 @@ class TestAPI:
     def test_type_conversion(self, client, mock_db_session, mock_category, mock_refresh):
         """Conversion lowercase → UPPERCASE"""
         
+        mock_category.nom = "test"
         mock_query = MagicMock()
         mock_filter = MagicMock()
         mock_filter.first.return_value = mock_category
         mock_query.filter.return_value = mock_filter
+        mock_query.all.return_value = [mock_category]
         mock_db_session.query.return_value = mock_query
 
         mock_db_session.refresh.side_effect = mock_refresh
@@ -306,10 +314,12 @@ class TestAPI:
     def test_db_error(self, client, mock_db_session, mock_category):
         """Gestion erreur DB"""
         
+        mock_category.nom = "test"
         mock_query = MagicMock()
         mock_filter = MagicMock()
         mock_filter.first.return_value = mock_category
         mock_query.filter.return_value = mock_filter
+        mock_query.all.return_value = [mock_category]
         mock_db_session.query.return_value = mock_query
         mock_db_session.commit.side_effect = Exception("DB Error")
         
@@ -63,6 +63,7 @@ class TestService:
         mock_order.all.return_value = [mock_t1]
         mock_join.order_by.return_value = mock_order
         mock_query.join.return_value = mock_join
+        mock_join.options.return_value = mock_join  # contains_eager de la catégorie
         mock_db.query.return_value = mock_query
         
         # Test
@@ -82,6 +83,7 @@ class TestService:
         mock_order.all.return_value = []
         mock_join.order_by.return_value = mock_order
         mock_query.join.return_value = mock_join
+        mock_join.options.return_value = mock_join  # contains_eager de la catégorie
         mock_db.query.return_value = mock_query
         
         # Test
@@ -29,6 +29,7 @@ class TestService:
         mock_filter.order_by.return_value = mock_order
         mock_join.filter.return_value = mock_filter
         mock_query.join.return_value = mock_join
+        mock_join.options.return_value = mock_join  # contains_eager de la catégorie
         mock_db.query.return_value = mock_query
         
         # Test
@@ -40,7 +40,7 @@ def test_definir_budget_valid(mock_db_session, mock_category):
     assert args[0] == nouveau_budget
     
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once_with(nouveau_budget)
+    mock_db_session.refresh.assert_not_called()
 
 def test_definir_budget_dates_invalides(mock_db_session):
     """
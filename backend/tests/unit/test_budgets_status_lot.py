@@ -0,0 +1,106 @@
+"""
+Statuts de plusieurs budgets en une requête (GET /api/budgets/status?ids=...)
+
+Critères d'acceptation :
+- une seule requête SQL groupée pour tous les budgets absents du cache
+- budgets d'un autre utilisateur ou inconnus ignorés, ordre de la demande conservé
+- mêmes valeurs que GET /api/budgets/{id}
+"""
+import pytest
+from datetime import date, datetime
+
+from models.models import Budget, BudgetNotFoundError, Transaction
+from scripts.saisie_budget import MAX_BUDGETS_PAR_LOT, BudgetService
+
+
+@pytest.fixture
+def budgets_en_base(sqlite_db_session):
+    sqlite_db_session.add_all([
+        Budget(id=1, categorie_id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=1),
+        Budget(id=2, categorie_id=2, montant_fixe=50.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=1),
+        Budget(id=3, categorie_id=1, montant_fixe=10.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), utilisateur_id=2),
+        Transaction(montant=30.0, libelle="a", type="DEPENSE", date=datetime(2026, 1, 31, 20), categorie_id=1, utilisateur_id=1),
+        Transaction(montant=60.0, libelle="b", type="DEPENSE", date=datetime(2026, 1, 10), categorie_id=2, utilisateur_id=1),
+        Transaction(montant=5.0, libelle="c", type="REVENU", date=datetime(2026, 1, 10), categorie_id=2, utilisateur_id=1),
+    ])
+    sqlite_db_session.commit()
+    return sqlite_db_session
+
+
+def test_une_seule_requete_et_ordre_conserve(budgets_en_base, capture_sql):
+    service = BudgetService(budgets_en_base)
+
+    with capture_sql() as mesure:
+        statuts = service.get_budgets_status([2, 3, 999, 1, 2], user_id=1)
+
+    assert mesure.nb_requetes == 1
+    assert [s.id for s in statuts] == [2, 1]
+    assert (statuts[0].montant_depense, statuts[0].est_depasse) == (60.0, True)
+    assert statuts[1].montant_restant == 70.0
+
+
+def test_memes_valeurs_que_le_statut_unitaire(budgets_en_base):
+    service = BudgetService(budgets_en_base)
+    lot = service.get_budgets_status([1, 2], user_id=1)
+    service_unitaire = BudgetService(budgets_en_base)
+
+    from scripts.cache_budget import budget_status_cache
+    budget_status_cache.vider()
+
+    assert lot == [service_unitaire.get_budget_status(1), service_unitaire.get_budget_status(2)]
+
+
+def test_cache_servi_en_premier(budgets_en_base, capture_sql):
+    service = BudgetService(budgets_en_base)
+    service.get_budgets_status([1], user_id=1)
+
+    with capture_sql() as mesure:
+        assert [s.id for s in service.get_budgets_status([1], user_id=1)] == [1]
+    assert mesure.nb_requetes == 0
+
+    with capture_sql() as mesure:
+        assert [s.id for s in service.get_budgets_status([1, 2], user_id=1)] == [1, 2]
+    assert mesure.nb_requetes == 1
+
+
+def test_depenses_des_autres_utilisateurs_ignorees(budgets_en_base, capture_sql):
+    """Une dépense d'un autre utilisateur dans la même catégorie ne consomme pas le budget."""
+    budgets_en_base.add(Transaction(
+        montant=1000.0, libelle="x", type="DEPENSE", date=datetime(2026, 1, 5), categorie_id=1, utilisateur_id=2
+    ))
+    budgets_en_base.commit()
+    service = BudgetService(budgets_en_base)
+
+    with capture_sql() as mesure:
+        liste = {b.id: b.montant_depense for b in service.get_budgets(user_id=1)}
+    assert mesure.nb_requetes == 1
+    assert "GROUP BY" not in mesure.requetes[0][0]
+
+    assert liste == {1: 30.0, 2: 60.0}
+    assert service.get_budgets_status([1], user_id=1)[0].montant_depense == 30.0
+    assert service.get_budget_status(3).montant_depense == 1000.0
+
+
+def test_statut_unitaire_budget_d_un_autre_utilisateur(budgets_en_base):
+    with pytest.raises(BudgetNotFoundError):
+        BudgetService(budgets_en_base).get_budget_status(3, user_id=1)
+
+
+def test_trop_de_budgets(mock_db_session):
+    with pytest.raises(ValueError, match="Au plus"):
+        BudgetService(mock_db_session).get_budgets_status(list(range(MAX_BUDGETS_PAR_LOT + 1)), user_id=1)
+
+
+class TestAPI:
+
+    def test_route_status(self, sqlite_client, budgets_en_base):
+        r = sqlite_client.get("/api/budgets/status?ids=1,3,2")
+
+        assert r.status_code == 200
+        assert [b["id"] for b in r.json()] == [1, 2]
+
+    def test_ids_invalides(self, sqlite_client):
+        assert sqlite_client.get("/api/budgets/status?ids=1,abc").status_code == 400
+
+    def test_ids_obligatoires(self, sqlite_client):
+        assert sqlite_client.get("/api/budgets/status").status_code == 422
@@ -0,0 +1,175 @@
+import pytest
+from datetime import date, datetime
+from models.models import Budget
+from schemas.budget import BudgetStatus
+from schemas.transaction import TransactionCreate
+from scripts.cache_budget import BudgetStatusCache, budget_status_cache
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TransactionService
+
+
+def _statut(budget_id, categorie_id=1, debut=date(2026, 1, 1), fin=date(2026, 1, 31)):
+    return BudgetStatus(
+        id=budget_id, categorie_id=categorie_id, montant_fixe=100.0, debut_periode=debut, fin_periode=fin,
+        montant_depense=0.0, montant_restant=100.0, pourcentage_consomme=0.0, est_depasse=False
+    )
+
+
+class HorlogeManuelle:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+# ========= CACHE =========
+
+def test_hit_et_miss():
+    cache = BudgetStatusCache(taille_max=10, ttl=60)
+
+    assert cache.get(1, 1) is None
+    cache.set(1, _statut(1))
+
+    assert cache.get(1, 1).id == 1
+    assert cache.get(2, 1) is None  # autre utilisateur
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_eviction_lru():
+    cache = BudgetStatusCache(taille_max=2, ttl=60)
+    cache.set(1, _statut(1))
+    cache.set(1, _statut(2))
+    cache.get(1, 1)            # 1 devient le plus récent
+    cache.set(1, _statut(3))   # évince 2
+
+    assert cache.get(1, 2) is None
+    assert cache.get(1, 1) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expiration_ttl():
+    horloge = HorlogeManuelle()
+    cache = BudgetStatusCache(taille_max=10, ttl=30, horloge=horloge)
+    cache.set(1, _statut(1))
+
+    horloge.t = 29.9
+    assert cache.get(1, 1) is not None
+    horloge.t = 30.0
+    assert cache.get(1, 1) is None
+
+
+def test_invalidation_ciblee():
+    """Seuls les budgets de l'utilisateur, de la catégorie et couvrant le jour sont retirés"""
+    cache = BudgetStatusCache(taille_max=10, ttl=60)
+    cache.set(1, _statut(1, categorie_id=1))
+    cache.set(1, _statut(2, categorie_id=1, debut=date(2026, 2, 1), fin=date(2026, 2, 28)))
+    cache.set(1, _statut(3, categorie_id=2))
+    cache.set(2, _statut(4, categorie_id=1))
+
+    retirees = cache.invalider(1, 1, datetime(2026, 1, 31, 22, 0))
+
+    assert retirees == 1
+    assert cache.get(1, 1) is None
+    assert cache.get(1, 2) is not None
+    assert cache.get(1, 3) is not None
+    assert cache.get(2, 4) is not None
+
+
+def test_copie_protege_le_cache():
+    cache = BudgetStatusCache(taille_max=10, ttl=60)
+    cache.set(1, _statut(1))
+
+    cache.get(1, 1).montant_depense = 999.0
+
+    assert cache.get(1, 1).montant_depense == 0.0
+
+
+def test_cache_desactive():
+    cache = BudgetStatusCache(taille_max=10, ttl=0)
+    cache.set(1, _statut(1))
+
+    assert cache.get(1, 1) is None
+
+# ========= SERVICES =========
+
+@pytest.fixture
+def budget_janvier(sqlite_db_session):
+    sqlite_db_session.add(Budget(
+        id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31),
+        categorie_id=1, utilisateur_id=1
+    ))
+    sqlite_db_session.commit()
+    return sqlite_db_session
+
+
+def _depense(session, montant, jour, categorie="Alimentation"):
+    return TransactionService(session).create_transaction(
+        TransactionCreate(montant=montant, libelle="t", type="DEPENSE", date=jour, categorie=categorie),
+        user_id=1
+    )
+
+
+def test_statut_servi_depuis_le_cache(budget_janvier, monkeypatch):
+    service = BudgetService(budget_janvier)
+    premier = service.get_budget_status(1, user_id=1)
+
+    monkeypatch.setattr(budget_janvier, "query", lambda *a: pytest.fail("requête inattendue"))
+    second = service.get_budget_status(1, user_id=1)
+
+    assert second == premier
+    assert budget_status_cache.stats()["hits"] == 1
+
+
+def test_transaction_invalide_le_budget_concerne(budget_janvier):
+    service = BudgetService(budget_janvier)
+    service.get_budget_status(1, user_id=1)
+
+    _depense(budget_janvier, 30.0, datetime(2026, 1, 10))
+
+    assert service.get_budget_status(1, user_id=1).montant_depense == 30.0
+
+
+def test_transaction_hors_perimetre_conserve_le_cache(budget_janvier):
+    service = BudgetService(budget_janvier)
+    service.get_budget_status(1, user_id=1)
+
+    _depense(budget_janvier, 30.0, datetime(2026, 3, 10))
+    _depense(budget_janvier, 30.0, datetime(2026, 1, 10), categorie="Transport")
+
+    assert budget_status_cache.get(1, 1) is not None
+
+
+def test_suppression_et_modification_invalident(budget_janvier):
+    service = BudgetService(budget_janvier)
+    transactions = TransactionService(budget_janvier)
+    t = _depense(budget_janvier, 30.0, datetime(2026, 1, 10))
+
+    service.get_budget_status(1, user_id=1)
+    transactions.update_transaction(t.id, date=datetime(2026, 2, 10), user_id=1)
+    assert service.get_budget_status(1, user_id=1).montant_depense == 0.0
+
+    transactions.update_transaction(t.id, date=datetime(2026, 1, 12), user_id=1)
+    assert service.get_budget_status(1, user_id=1).montant_depense == 30.0
+
+    transactions.delete_transaction(t.id, user_id=1)
+    assert service.get_budget_status(1, user_id=1).montant_depense == 0.0
+
+
+def test_liste_prechauffe_et_modification_budget_invalide(budget_janvier):
+    service = BudgetService(budget_janvier)
+    service.get_budgets(user_id=1)
+    assert budget_status_cache.get(1, 1) is not None
+
+    service.update_budget(1, montant=250.0, user_id=1)
+
+    assert budget_status_cache.get(1, 1) is None
+    assert service.get_budget_status(1, user_id=1).montant_fixe == 250.0
+
+# ========= API =========
+
+def test_endpoint_stats_cache(client, entetes_monitoring):
+    response = client.get("/api/monitoring/cache", headers=entetes_monitoring)
+
+    assert response.status_code == 200
+    assert set(response.json()["budget_status"]) >= {"hits", "misses", "evictions", "hit_ratio"}
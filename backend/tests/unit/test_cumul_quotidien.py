@@ -0,0 +1,155 @@
+"""
+Cumuls quotidiens (table cumul_quotidien)
+
+Critères d'acceptation :
+- maintenus dans la transaction SQL des créations, modifications, suppressions et imports
+- initialisés depuis l'historique au premier passage d'un utilisateur
+- lus par les statuts de budget et les totaux sur des jours entiers
+- reconstruction et vérification de cohérence
+"""
+from datetime import date, datetime
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from models.models import Budget, CumulQuotidien, SoldeUtilisateur, Transaction
+from schemas.transaction import TransactionCreate
+from scripts.cumul_quotidien import CumulQuotidienService
+from scripts.import_transactions import ImportTransactionService
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TransactionService
+
+
+def _creer(service, montant, type_t="DEPENSE", jour=datetime(2026, 1, 10, 12), categorie="Alimentation", user_id=1):
+    return service.create_transaction(
+        TransactionCreate(montant=montant, libelle="t", type=type_t, date=jour, categorie=categorie),
+        user_id=user_id
+    )
+
+
+def _cumuls(session):
+    return {
+        (c.utilisateur_id, c.categorie_id, c.type, c.jour): (c.montant_total, c.nb_transactions)
+        for c in session.query(CumulQuotidien).all()
+    }
+
+
+def test_ecritures_maintiennent_les_cumuls(sqlite_db_session):
+    service = TransactionService(sqlite_db_session)
+
+    courses = _creer(service, 30.0)
+    _creer(service, 20.0, jour=datetime(2026, 1, 10, 23, 59))
+    assert _cumuls(sqlite_db_session) == {(1, 1, "DEPENSE", date(2026, 1, 10)): (50.0, 2)}
+
+    # déplacée au lendemain : retirée d'un jour, ajoutée à l'autre
+    service.update_transaction(courses.id, montant=35.0, date=datetime(2026, 1, 11, 8), user_id=1)
+    assert _cumuls(sqlite_db_session) == {
+        (1, 1, "DEPENSE", date(2026, 1, 10)): (20.0, 1),
+        (1, 1, "DEPENSE", date(2026, 1, 11)): (35.0, 1),
+    }
+
+    # un jour sans transaction disparaît
+    service.delete_transaction(courses.id, user_id=1)
+    assert _cumuls(sqlite_db_session) == {(1, 1, "DEPENSE", date(2026, 1, 10)): (20.0, 1)}
+    assert CumulQuotidienService(sqlite_db_session).verifier() == []
+
+
+def test_initialisation_depuis_l_historique(sqlite_db_session):
+    sqlite_db_session.add(Transaction(
+        montant=300.0, libelle="ancien", type="REVENU", date=datetime(2025, 6, 1, 9), categorie_id=2, utilisateur_id=1
+    ))
+    sqlite_db_session.commit()
+
+    _creer(TransactionService(sqlite_db_session), 5.0)
+
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).cumuls_initialises is True
+    assert _cumuls(sqlite_db_session) == {
+        (1, 2, "REVENU", date(2025, 6, 1)): (300.0, 1),
+        (1, 1, "DEPENSE", date(2026, 1, 10)): (5.0, 1),
+    }
+
+
+def test_premieres_ecritures_concurrentes_initialisent_une_fois(sqlite_deux_sessions):
+    """Deux premières écritures entrelacées : l'historique et chaque transaction comptés une seule fois."""
+    a, b = sqlite_deux_sessions
+    a.add(Transaction(
+        montant=300.0, libelle="ancien", type="REVENU", date=datetime(2025, 6, 1, 9), categorie_id=2, utilisateur_id=1
+    ))
+    a.commit()
+    connexion_b = b.connection()
+    entrelacee = []
+
+    def premiere_ecriture_de_a(conn, cursor, sql, *args):
+        if conn is connexion_b and not sql.startswith("SELECT") and not entrelacee:
+            entrelacee.append(sql)
+            _creer(TransactionService(a), 20.0)
+
+    event.listen(connexion_b.engine, "before_cursor_execute", premiere_ecriture_de_a)
+    try:
+        _creer(TransactionService(b), 30.0)
+    finally:
+        event.remove(connexion_b.engine, "before_cursor_execute", premiere_ecriture_de_a)
+
+    a.expire_all()
+    assert entrelacee
+    assert _cumuls(a) == {
+        (1, 2, "REVENU", date(2025, 6, 1)): (300.0, 1),
+        (1, 1, "DEPENSE", date(2026, 1, 10)): (50.0, 2),
+    }
+    assert CumulQuotidienService(a).verifier() == []
+
+
+def test_import_maintient_les_cumuls(sqlite_db_session):
+    contenu = "date;libelle;montant;categorie\n2026-01-10;a;-12.5;Alimentation\n2026-01-10;b;-7.5;Alimentation\n"
+
+    ImportTransactionService(sqlite_db_session).importer(contenu, "csv", user_id=1)
+
+    assert _cumuls(sqlite_db_session) == {(1, 1, "DEPENSE", date(2026, 1, 10)): (20.0, 2)}
+
+
+def test_lectures_depuis_les_cumuls(sqlite_db_session):
+    """Une fois initialisés, budgets et totaux sur des jours entiers lisent les cumuls, pas les transactions."""
+    service = TransactionService(sqlite_db_session)
+    _creer(service, 40.0)
+    sqlite_db_session.add(Budget(
+        id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31), categorie_id=1, utilisateur_id=1
+    ))
+    # écart volontaire : seuls les cumuls portent 70
+    sqlite_db_session.query(CumulQuotidien).update({"montant_total": 70.0})
+    sqlite_db_session.commit()
+
+    budgets = BudgetService(sqlite_db_session)
+    assert budgets.get_budget_status(1).montant_depense == 70.0
+    assert budgets.get_budgets(user_id=1)[0].montant_depense == 70.0
+    assert service.get_total_transactions(user_id=1, date_debut="2026-01-01", date_fin="2026-01-31") == -70.0
+    assert service.get_total_transactions(user_id=1, categorie_nom="alimentation", type_filtre="depense") == -70.0
+
+    # période commençant en cours de journée : agrégat sur les transactions
+    assert service.get_total_transactions(user_id=1, date_debut="2026-01-10T06:00:00") == -40.0
+
+
+def test_verifier_et_reconstruire(sqlite_db_session):
+    service = TransactionService(sqlite_db_session)
+    _creer(service, 40.0)
+    sqlite_db_session.query(CumulQuotidien).update({"montant_total": 70.0})
+    sqlite_db_session.commit()
+
+    cumuls = CumulQuotidienService(sqlite_db_session)
+    assert cumuls.verifier() == [{
+        "utilisateur_id": 1, "categorie_id": 1, "type": "DEPENSE", "jour": date(2026, 1, 10),
+        "montant_cumul": 70.0, "montant_reel": 40.0, "nb_cumul": 1, "nb_reel": 1,
+    }]
+
+    assert cumuls.reconstruire() == 1
+    assert cumuls.verifier() == []
+    assert _cumuls(sqlite_db_session) == {(1, 1, "DEPENSE", date(2026, 1, 10)): (40.0, 1)}
+
+
+def test_schema_aligne_sur_init_sql():
+    ddl = str(CreateTable(CumulQuotidien.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "montant_total NUMERIC(14, 2) NOT NULL" in ddl
+    assert "type VARCHAR(50) NOT NULL" in ddl
+    assert "FOREIGN KEY(utilisateur_id) REFERENCES utilisateur (id) ON DELETE CASCADE" in ddl
+    assert "FOREIGN KEY(categorie_id) REFERENCES categorie (id) ON DELETE RESTRICT" in ddl
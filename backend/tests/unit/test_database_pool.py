@@ -0,0 +1,101 @@
+"""
+Pool de connexions configurable et instrumenté
+
+Critères d'acceptation :
+- taille, overflow, timeout, recycle et pre-ping lus dans l'environnement
+- DB_NULLPOOL=1 : pas de pool côté application (PgBouncer)
+- attente au checkout, connexions en cours et overflow exposés
+"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+
+from database import PoolInstrumente, metriques_pool, options_moteur, stats_pool
+
+
+@pytest.fixture
+def moteur(tmp_path):
+    metriques_pool.vider()
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        **options_moteur({"DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "1", "DB_POOL_TIMEOUT": "0.05"})
+    )
+    yield engine
+    engine.dispose()
+    metriques_pool.vider()
+
+
+def test_options_par_defaut():
+    options = options_moteur({})
+
+    assert options["poolclass"] is PoolInstrumente
+    assert (options["pool_size"], options["max_overflow"]) == (5, 10)
+    assert options["pool_pre_ping"] is True
+
+
+def test_options_depuis_environnement():
+    options = options_moteur({
+        "DB_POOL_SIZE": "20", "DB_MAX_OVERFLOW": "0", "DB_POOL_TIMEOUT": "2.5",
+        "DB_POOL_RECYCLE": "300", "DB_POOL_PRE_PING": "false",
+    })
+
+    assert options == {
+        "poolclass": PoolInstrumente, "pool_size": 20, "max_overflow": 0,
+        "pool_timeout": 2.5, "pool_recycle": 300, "pool_pre_ping": False,
+    }
+
+
+def test_mode_nullpool():
+    assert options_moteur({"DB_NULLPOOL": "1"})["poolclass"] is NullPool
+
+
+def test_metriques_checkout_et_overflow(moteur):
+    c1 = moteur.connect()
+    c2 = moteur.connect()
+    c1.execute(text("select 1"))
+
+    stats = stats_pool(moteur)
+    assert stats["en_cours"] == 2
+    assert stats["overflow"] == 1
+    assert stats["overflow_max"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["connexions_ouvertes"] == 2
+    assert sum(stats["histogramme_attente"].values()) == 2
+
+    c1.close()
+    c2.close()
+    assert stats_pool(moteur)["en_cours"] == 0
+
+    # connexion réutilisée : un checkout de plus, aucune ouverture
+    moteur.connect().close()
+    assert stats_pool(moteur)["checkouts"] == 3
+    assert stats_pool(moteur)["connexions_ouvertes"] == 2
+
+
+def test_timeout_compte(moteur):
+    connexions = [moteur.connect(), moteur.connect()]
+
+    with pytest.raises(exc.TimeoutError):
+        moteur.connect()
+
+    assert stats_pool(moteur)["timeouts"] == 1
+    for c in connexions:
+        c.close()
+
+
+def test_route_monitoring(client, entetes_monitoring):
+    response = client.get("/api/monitoring/pool", headers=entetes_monitoring)
+
+    assert response.status_code == 200
+    assert {"mode", "en_cours", "overflow", "attente_moyenne_ms"} <= response.json().keys()
+
+
+def test_route_monitoring_protegee(client, monkeypatch):
+    from routers import monitoring
+    # sans jeton configuré : endpoints désactivés
+    assert client.get("/api/monitoring/pool").status_code == 403
+
+    monkeypatch.setattr(monitoring, "MONITORING_TOKEN", "jeton-de-test")
+    assert client.get("/api/monitoring/pool").status_code == 401
+    assert client.get("/api/monitoring/bcrypt", headers={"Authorization": "Bearer autre"}).status_code == 401
+    assert client.get("/api/monitoring/bcrypt", headers={"Authorization": "Bearer jeton-de-test"}).status_code == 200
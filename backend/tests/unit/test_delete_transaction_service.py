@@ -1,27 +1,37 @@
 import pytest
 from unittest.mock import MagicMock
-from models.models import Transaction, Categorie
+from models.models import Transaction, Categorie, SoldeUtilisateur
 from scripts.saisie_transaction import TransactionService
 
-def test_delete_transaction_success(mock_db_session, mock_transaction, mock_transaction_list):
-    """La suppression doit appeler delete+commit et renvoyer le total recalculé."""
+def test_delete_transaction_success(mock_db_session, mock_transaction):
+    """La suppression doit passer par un DELETE filtré sur le propriétaire et renvoyer le solde maintenu."""
     
-    mock_query_find = MagicMock()
-    mock_query_find.filter.return_value.first.return_value = mock_transaction
+    # valeurs de la ligne supprimée renvoyées par DELETE ... RETURNING
+    mock_db_session.execute.return_value.first.return_value = mock_transaction
     
-    remaining = [mock_transaction_list[1]]  # Seulement t2
-    mock_query_total = MagicMock()
-    mock_query_total.join.return_value.all.return_value = remaining
+    # Solde avant suppression : t1 (-50) + t2 (+25.5)
+    solde = SoldeUtilisateur(utilisateur_id=1, solde=-24.5, cumuls_initialises=True)
+    mock_query_solde = MagicMock()
+    mock_query_solde.filter.return_value.with_for_update.return_value.populate_existing.return_value.first.return_value = solde
     
-    mock_db_session.query.side_effect = [mock_query_find, mock_query_total]
+    mock_db_session.query.side_effect = [mock_query_solde]
     
     service = TransactionService(mock_db_session)
-    total = service.delete_transaction(transaction_id=1)
-    
-    mock_db_session.delete.assert_called_once_with(mock_transaction)
+    total = service.delete_transaction(transaction_id=1, user_id=1)
+    
+    suppression, = [
+        str(appel.args[0]) for appel in mock_db_session.execute.call_args_list
+        if str(appel.args[0]).startswith("DELETE FROM transactions")
+    ]
+    assert "transactions.utilisateur_id = :utilisateur_id_1" in suppression
+    assert "RETURNING" in suppression
+    mock_db_session.delete.assert_not_called()
     mock_db_session.commit.assert_called_once()
     
     assert pytest.approx(total, rel=1e-6) == 25.5
+    assert solde.solde == 25.5
+    # ni lecture préalable de la transaction, ni relecture des transactions restantes
+    assert mock_db_session.query.call_count == 1
 
 def test_delete_transaction_not_found(mock_db_session):
     """Si la transaction n'existe pas, une ValueError est levée."""
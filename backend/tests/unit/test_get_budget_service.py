@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 from datetime import date, datetime
 from scripts.saisie_budget import BudgetService
-from models.models import Budget, BudgetNotFoundError
+from models.models import Budget, BudgetNotFoundError, Transaction
 from schemas.budget import BudgetStatus
 
 def test_get_budget_status_nominal(mock_db_session, mock_budget):
@@ -15,18 +15,13 @@ def test_get_budget_status_nominal(mock_db_session, mock_budget):
     service = BudgetService(mock_db_session)
     budget_id_test = 1
     
-    def query_side_effect(model):
-        query_mock = MagicMock()
-        if model is Budget:
-            query_mock.filter.return_value.first.return_value = mock_budget
-        else:
-            query_mock.filter.return_value.scalar.return_value = 70.0
-        return query_mock
-    
-    mock_db_session.query.side_effect = query_side_effect
+    # budget et somme des dépenses lus par la même requête
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (mock_budget, 70.0)
 
     resultat = service.get_budget_status(budget_id_test)
 
+    mock_db_session.query.assert_called_once()
+
     assert isinstance(resultat, BudgetStatus)
     assert resultat.id == 1
     assert resultat.montant_fixe == 100.0
@@ -51,17 +46,7 @@ def test_get_budget_status_overdraft(mock_db_session, mock_budget):
     """
     service = BudgetService(mock_db_session)
         
-    def query_side_effect(model):
-            query_mock = MagicMock()
-            query_mock.filter.return_value = query_mock 
-            
-            if model is Budget:
-                query_mock.first.return_value = mock_budget
-            else:
-                query_mock.filter.return_value.scalar.return_value = 120.0
-            return query_mock
-
-    mock_db_session.query.side_effect = query_side_effect
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (mock_budget, 120.0)
 
     result = service.get_budget_status(1)
 
@@ -79,17 +64,55 @@ def test_get_budget_status_precision(mock_db_session, mock_budget):
     valeur_imprecise = 33.3333333333
     
 
-    def side_effect(model_or_expr):
-        q = MagicMock()
-        if model_or_expr is Budget:
-            q.filter.return_value.first.return_value = mock_budget
-        else:
-            q.filter.return_value.scalar.return_value = valeur_imprecise
-        return q
-
-    mock_db_session.query.side_effect = side_effect
+    mock_db_session.query.return_value.filter.return_value.first.return_value = (mock_budget, valeur_imprecise)
 
     result = service.get_budget_status(1)
 
     assert result.montant_depense == 33.33
-    assert result.montant_restant == 66.67
\ No newline at end of file
+    assert result.montant_restant == 66.67
+
+def _budget_et_transactions_aux_bornes(session):
+    """Budget du 1er au 31 janvier ; dépenses juste à l'intérieur et juste à l'extérieur des bornes"""
+    session.add(Budget(
+        id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31),
+        categorie_id=1, utilisateur_id=1
+    ))
+    for montant, moment in [
+        (1.0, datetime(2025, 12, 31, 23, 59, 59)),   # veille : exclue
+        (2.0, datetime(2026, 1, 1, 0, 0, 0)),        # début : incluse
+        (4.0, datetime(2026, 1, 31, 23, 59, 59)),    # dernier jour en fin de journée : incluse
+        (8.0, datetime(2026, 2, 1, 0, 0, 0)),        # lendemain : exclue
+    ]:
+        session.add(Transaction(
+            montant=montant, libelle="t", type="DEPENSE", date=moment, categorie_id=1, utilisateur_id=1
+        ))
+    session.commit()
+
+
+def test_get_budget_status_jours_inclus(sqlite_db_session):
+    """La période [début, fin] inclut les journées entières de début et de fin, et rien au-delà"""
+    _budget_et_transactions_aux_bornes(sqlite_db_session)
+
+    result = BudgetService(sqlite_db_session).get_budget_status(1)
+
+    assert result.montant_depense == 6.0
+
+
+def test_get_budgets_jours_inclus(sqlite_db_session):
+    """Même sémantique de bornes pour la liste des budgets"""
+    _budget_et_transactions_aux_bornes(sqlite_db_session)
+
+    (result,) = BudgetService(sqlite_db_session).get_budgets(user_id=1)
+
+    assert result.montant_depense == 6.0
+
+
+def test_fin_de_periode_sans_cast_sur_la_date():
+    """Le prédicat de fin reste applicable à l'index : aucun CAST sur transactions.date"""
+    from sqlalchemy.dialects import postgresql
+    from scripts.saisie_budget import JourSuivant
+
+    predicat = Transaction.date < JourSuivant(Budget.fin_periode)
+    sql = str(predicat.compile(dialect=postgresql.dialect()))
+
+    assert sql == "transactions.date < (budget.fin_periode + 1)"
@@ -148,7 +148,7 @@ def test_get_budgets_optimal_calculation(mock_db_session, mock_budget):
     """
     service = BudgetService(mock_db_session)
 
-    # 2. Mock de la requête complexe (Join + Aggregation)
+    # 2. Mock de la requête (budgets + total en sous-requête corrélée)
     query_mock = MagicMock()
     mock_db_session.query.return_value = query_mock
     
@@ -171,8 +171,10 @@ def test_get_budgets_optimal_calculation(mock_db_session, mock_budget):
     assert results[0].montant_restant == 80.0
     assert results[0].pourcentage_consomme == 20.0
     
-    query_mock.outerjoin.assert_called()
-    query_mock.group_by.assert_called()
+    # une seule requête, sans jointure budgets × transactions ni GROUP BY
+    mock_db_session.query.assert_called_once()
+    query_mock.outerjoin.assert_not_called()
+    query_mock.group_by.assert_not_called()
 
 def test_get_budgets_list_precision(mock_db_session, mock_budget):
     """Vérifie que get_budgets arrondit correctement les montants."""
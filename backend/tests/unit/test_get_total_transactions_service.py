@@ -1,73 +1,87 @@
 import pytest
+from datetime import datetime
 from unittest.mock import MagicMock
+from models.models import Transaction
 from scripts.saisie_transaction import TransactionService
 
-def test_total_with_mixed_types(mock_db_session):
-    from unittest.mock import MagicMock
-    from scripts.saisie_transaction import TransactionService
-    from datetime import datetime
 
-    t1 = MagicMock(); t1.montant = 100.0; t1.type = "REVENU"; t1.date = datetime(2026,1,1)
-    t2 = MagicMock(); t2.montant = 40.0;  t2.type = "DEPENSE"; t2.date = datetime(2026,1,2)
-    t3 = MagicMock(); t3.montant = 10.5;  t3.type = "REVENU"; t3.date = datetime(2026,1,3)
+def _ajouter(session, montant, type_t, date_t, categorie_id=1, user_id=1):
+    session.add(Transaction(
+        montant=montant, libelle="t", type=type_t, date=date_t,
+        categorie_id=categorie_id, utilisateur_id=user_id
+    ))
 
-    q = MagicMock()
-    mock_db_session.query.return_value = q
-    q.join.return_value = q
-    q.filter.return_value = q
-    q.all.return_value = [t1, t2, t3]
 
-    service = TransactionService(mock_db_session)
+def test_total_with_mixed_types(sqlite_db_session):
+    _ajouter(sqlite_db_session, 100.0, "REVENU", datetime(2026, 1, 1))
+    _ajouter(sqlite_db_session, 40.0, "DEPENSE", datetime(2026, 1, 2))
+    _ajouter(sqlite_db_session, 10.5, "REVENU", datetime(2026, 1, 3))
+    sqlite_db_session.commit()
+
+    service = TransactionService(sqlite_db_session)
     total = service.get_total_transactions()
     # attendu : +100 -40 +10.5 = 70.5
     assert pytest.approx(total, rel=1e-6) == 70.5
 
 
-def test_get_total_with_date_filter(mock_db_session):
-    from unittest.mock import MagicMock
-    from datetime import datetime
-
-    t1 = MagicMock(); t1.montant = 20.0; t1.type = "REVENU"; t1.date = datetime(2026,1,5)
-    t2 = MagicMock(); t2.montant = 10.0; t2.type = "DEPENSE"; t2.date = datetime(2026,1,10)
-    t3 = MagicMock(); t3.montant = 5.0;  t3.type = "REVENU"; t3.date = datetime(2025,12,31)
-
-    q = MagicMock()
-    mock_db_session.query.return_value = q
-    q.join.return_value = q
-    q.filter.return_value = q
-
-    q.all.return_value = [t1, t2]
+def test_get_total_with_date_filter(sqlite_db_session):
+    _ajouter(sqlite_db_session, 20.0, "REVENU", datetime(2026, 1, 5))
+    _ajouter(sqlite_db_session, 10.0, "DEPENSE", datetime(2026, 1, 31, 18, 30))
+    _ajouter(sqlite_db_session, 5.0, "REVENU", datetime(2025, 12, 31))
+    sqlite_db_session.commit()
 
-    service = TransactionService(mock_db_session)
+    service = TransactionService(sqlite_db_session)
     total = service.get_total_transactions(date_debut="2026-01-01", date_fin="2026-01-31")
 
-    # attendu : +20 -10 = 10
+    # attendu : +20 -10 = 10 (la journée de fin est incluse entièrement)
     assert pytest.approx(total, rel=1e-6) == 10.0
-    assert mock_db_session.query.return_value.filter.called
 
 def test_get_total_transactions_date_order_invalid_raises(mock_db_session):
     """Si la date de fin est antérieure à la date de début, on doit lever ValueError."""
-    
+
     service = TransactionService(mock_db_session)
     with pytest.raises(ValueError):
         service.get_total_transactions(date_debut="2026-02-10", date_fin="2026-01-01")
 
-def test_get_total_with_category_filter(mock_db_session):
+def test_get_total_with_category_filter(sqlite_db_session):
+    _ajouter(sqlite_db_session, 15.0, "REVENU", datetime(2026, 1, 1), categorie_id=1)
+    _ajouter(sqlite_db_session, 5.0, "DEPENSE", datetime(2026, 1, 1), categorie_id=1)
+    _ajouter(sqlite_db_session, 10.5, "REVENU", datetime(2026, 1, 1), categorie_id=2)
+    sqlite_db_session.commit()
+
+    service = TransactionService(sqlite_db_session)
+    total = service.get_total_transactions(categorie_nom="alimentation")
+
+    # attendu : +15 -5 = 10
+    assert pytest.approx(total, rel=1e-6) == 10.0
+
 
-    t1 = MagicMock(); t1.montant = 15.0; t1.type = "REVENU"; t1.date = None; t1.categorie = "Alimentation"
-    t2 = MagicMock(); t2.montant = 5.0; t2.type = "DEPENSE"; t2.date = None; t2.categorie = "Alimentation"
-    t3 = MagicMock(); t3.montant = 10.5; t3.type = "REVENU"; t3.date = None; t3.categorie = "Transport"
+def test_get_total_scoped_to_user(sqlite_db_session):
+    """Le total ne tient compte que des transactions de l'utilisateur demandé."""
+    _ajouter(sqlite_db_session, 30.0, "REVENU", datetime(2026, 1, 1), user_id=1)
+    _ajouter(sqlite_db_session, 500.0, "REVENU", datetime(2026, 1, 1), user_id=2)
+    sqlite_db_session.commit()
 
+    service = TransactionService(sqlite_db_session)
+
+    assert service.get_total_transactions(user_id=1) == 30.0
+    assert service.get_total_transactions(user_id=3) == 0.0
+
+
+def test_get_total_single_aggregate_query(mock_db_session):
+    """Le total est obtenu par un seul agrégat (scalar) sans charger les transactions."""
     q = MagicMock()
     mock_db_session.query.return_value = q
+    q.select_from.return_value = q
     q.join.return_value = q
     q.filter.return_value = q
-
-    q.all.return_value = [t1, t2]
+    q.scalar.return_value = None
 
     service = TransactionService(mock_db_session)
-    total = service.get_total_transactions(categorie_nom="Alimentation")
+    total = service.get_total_transactions(categorie_nom="Alimentation", type_filtre="depense")
 
-    # attendu : +15 -5 = 10
-    assert pytest.approx(total, rel=1e-6) == 10.0
-    assert mock_db_session.query.return_value.filter.called
\ No newline at end of file
+    assert total == 0.0
+    mock_db_session.query.assert_called_once()
+    # catégorie résolue par le registre : filtre sur son id, sans jointure
+    q.join.assert_not_called()
+    q.all.assert_not_called()
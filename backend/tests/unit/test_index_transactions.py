@@ -0,0 +1,71 @@
+"""
+Les requêtes des services doivent s'appuyer sur les index déclarés (models + init.sql).
+Vérification par EXPLAIN QUERY PLAN sur la base SQLite de test.
+"""
+import pytest
+from datetime import date, datetime
+from models.models import Budget, Transaction
+from scripts.saisie_budget import BudgetService
+from scripts.saisie_transaction import TransactionService
+
+
+def _derniere_lecture(mesure) -> tuple:
+    return [r for r in mesure.requetes if r[0].lstrip().upper().startswith("SELECT")][-1]
+
+
+def _plan(session, statement, parameters) -> str:
+    lignes = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return "\n".join(str(l[-1]) for l in lignes)
+
+
+def test_index_declares_sur_transactions():
+    noms = {ix.name for ix in Transaction.__table__.indexes}
+    assert {
+        "idx_transactions_utilisateur_date",
+        "idx_transactions_utilisateur_categorie_type_date",
+    } <= noms
+    # la consommation des budgets passe par l'index du propriétaire : pas d'index mort à maintenir
+    assert "idx_transactions_categorie_type_date" not in noms
+
+
+def test_liste_par_utilisateur_et_periode_utilise_index(sqlite_db_session, capture_sql):
+    service = TransactionService(sqlite_db_session)
+
+    with capture_sql() as mesure:
+        service.get_transactions(user_id=1, date_debut="2026-01-01", date_fin="2026-01-31")
+
+    plan = _plan(sqlite_db_session, *_derniere_lecture(mesure))
+    assert "USING INDEX idx_transactions_utilisateur_date" in plan
+    assert "SCAN transactions" not in plan
+
+
+def test_total_filtre_utilise_un_index_utilisateur(sqlite_db_session, capture_sql):
+    service = TransactionService(sqlite_db_session)
+
+    with capture_sql() as mesure:
+        service.get_total_transactions(user_id=1, categorie_nom="Alimentation", type_filtre="DEPENSE", date_debut="2026-01-01")
+
+    plan = _plan(sqlite_db_session, *_derniere_lecture(mesure))
+    assert "USING INDEX idx_transactions_utilisateur_" in plan
+    assert "SCAN transactions" not in plan
+
+
+def test_consommation_budget_utilise_index(sqlite_db_session, capture_sql):
+    sqlite_db_session.add(Budget(
+        id=1, montant_fixe=100.0, debut_periode=date(2026, 1, 1), fin_periode=date(2026, 1, 31),
+        categorie_id=1, utilisateur_id=1
+    ))
+    sqlite_db_session.commit()
+    service = BudgetService(sqlite_db_session)
+
+    with capture_sql() as mesure:
+        service.get_budget_status(1)
+    plan_statut = _plan(sqlite_db_session, *_derniere_lecture(mesure))
+
+    with capture_sql() as mesure:
+        service.get_budgets(user_id=1)
+    plan_liste = _plan(sqlite_db_session, *_derniere_lecture(mesure))
+
+    # la consommation est limitée aux dépenses du propriétaire du budget
+    assert "USING INDEX idx_transactions_utilisateur_categorie_type_date" in plan_statut
+    assert "USING INDEX idx_transactions_utilisateur_categorie_type_date" in plan_liste
@@ -0,0 +1,127 @@
+"""
+Registre des catégories en mémoire
+
+Critères d'acceptation :
+- recherche insensible à la casse et aux accents
+- un seul chargement depuis la base, rechargement au TTL ou sur invalider()
+- une catégorie inconnue déclenche au plus un rechargement par intervalle
+- la création d'une transaction ne requête plus la table categorie
+- toute écriture de catégorie validée invalide le registre
+- les filtres de catégorie des listes et totaux passent par le registre
+"""
+from datetime import datetime
+from unittest.mock import MagicMock
+from models.models import Categorie, Transaction
+from schemas.transaction import TransactionCreate
+from scripts.registre_categories import RegistreCategories, normaliser_nom, registre_categories
+from scripts.saisie_transaction import TransactionService
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _db(*noms):
+    db = MagicMock()
+    db.query.return_value.all.return_value = [
+        Categorie(id=i, nom=nom, icone=None) for i, nom in enumerate(noms, start=1)
+    ]
+    return db
+
+
+def test_normaliser_nom():
+    assert normaliser_nom(" Santé ") == normaliser_nom("SANTE") == "sante"
+
+
+def test_resolution_casse_et_accents_un_seul_chargement():
+    registre = RegistreCategories()
+    db = _db("Alimentation", "Santé")
+
+    assert registre.resoudre(db, "sante").id == 2
+    assert registre.resoudre(db, "ALIMENTATION").nom == "Alimentation"
+    assert registre.par_id(db, 1).nom == "Alimentation"
+    assert registre.chargements == 1
+
+
+def test_rechargement_au_ttl_et_sur_invalidation():
+    horloge = Horloge()
+    registre = RegistreCategories(ttl=60, horloge=horloge)
+    db = _db("Alimentation")
+
+    registre.lister(db)
+    horloge.t = 30
+    registre.lister(db)
+    assert registre.chargements == 1
+
+    horloge.t = 61
+    registre.lister(db)
+    assert registre.chargements == 2
+
+    registre.invalider()
+    registre.lister(db)
+    assert registre.chargements == 3
+
+
+def test_echec_recharge_au_plus_une_fois_par_intervalle():
+    horloge = Horloge()
+    registre = RegistreCategories(intervalle_echec=5, horloge=horloge)
+    db = _db("Alimentation")
+
+    assert registre.resoudre(db, "Loisirs") is None
+    assert registre.resoudre(db, "Loisirs") is None
+    assert registre.chargements == 2  # chargement initial + un seul rechargement
+
+    # la catégorie a été ajoutée en base entre-temps
+    db.query.return_value.all.return_value.append(Categorie(id=2, nom="Loisirs", icone=None))
+    horloge.t = 6
+    assert registre.resoudre(db, "loisirs").id == 2
+
+
+def test_creation_transaction_sans_requete_categorie(sqlite_db_session):
+    registre_categories.invalider()
+    service = TransactionService(sqlite_db_session)
+    donnees = dict(montant=10.0, libelle="x", type="DEPENSE", date=datetime(2026, 1, 1))
+
+    service.create_transaction(TransactionCreate(**donnees, categorie="sante"), user_id=1)
+    chargements = registre_categories.chargements
+    transaction = service.create_transaction(TransactionCreate(**donnees, categorie="TRANSPORT"), user_id=1)
+
+    assert transaction.categorie_id == 2
+    assert registre_categories.chargements == chargements
+
+
+def test_ecriture_de_categorie_invalide_le_registre(sqlite_db_session):
+    assert registre_categories.resoudre(sqlite_db_session, "loisirs") is None
+
+    sqlite_db_session.add(Categorie(id=4, nom="Loisirs", icone=None))
+    sqlite_db_session.rollback()
+    assert registre_categories.resoudre(sqlite_db_session, "Alimentation").id == 1
+    chargements = registre_categories.chargements
+
+    sqlite_db_session.add(Categorie(id=4, nom="Loisirs", icone=None))
+    sqlite_db_session.commit()
+    sqlite_db_session.get(Categorie, 2).nom = "Déplacements"
+    sqlite_db_session.commit()
+
+    assert registre_categories.resoudre(sqlite_db_session, "loisirs").id == 4
+    assert registre_categories.resoudre(sqlite_db_session, "deplacements").id == 2
+    # un seul rechargement, au premier accès après les commits
+    assert registre_categories.chargements == chargements + 1
+
+
+def test_filtres_resolus_par_le_registre(sqlite_db_session):
+    sqlite_db_session.add_all([
+        Transaction(montant=10.0, libelle="a", type="DEPENSE", date=datetime(2026, 1, 5), categorie_id=3, utilisateur_id=1),
+        Transaction(montant=4.0, libelle="b", type="DEPENSE", date=datetime(2026, 1, 6), categorie_id=1, utilisateur_id=1),
+    ])
+    sqlite_db_session.commit()
+    service = TransactionService(sqlite_db_session)
+
+    # même règle qu'à la saisie : casse et accents ignorés
+    assert [t.libelle for t in service.get_transactions(categorie_nom="SANTE", user_id=1)] == ["a"]
+    assert service.get_total_transactions(categorie_nom="santé", date_debut="2026-01-01", user_id=1) == -10.0
+    assert service.get_transactions(categorie_nom="Loisirs", user_id=1) == []
@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from models.models import SoldeUtilisateur, Transaction
+from schemas.transaction import TransactionCreate
+from scripts.saisie_transaction import TransactionService
+from scripts.solde_utilisateur import SoldeService
+
+
+def _creer(service, montant, type_t, user_id=1):
+    return service.create_transaction(
+        TransactionCreate(montant=montant, libelle="t", type=type_t, date=datetime(2026, 1, 10), categorie="Alimentation"),
+        user_id=user_id
+    )
+
+
+def test_solde_suit_creation_modification_suppression(sqlite_db_session):
+    """Le solde maintenu reste égal au total recalculé après chaque écriture."""
+    service = TransactionService(sqlite_db_session)
+
+    salaire = _creer(service, 2000.0, "REVENU")
+    courses = _creer(service, 80.0, "DEPENSE")
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == 1920.0
+
+    service.update_transaction(courses.id, montant=100.0, user_id=1)
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == 1900.0
+
+    service.update_transaction(salaire.id, type="DEPENSE", user_id=1)
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == -2100.0
+
+    total = service.delete_transaction(courses.id, user_id=1)
+    assert total == -2000.0
+    assert service.get_total_transactions(user_id=1) == -2000.0
+
+
+def test_solde_isole_par_utilisateur(sqlite_db_session):
+    service = TransactionService(sqlite_db_session)
+
+    _creer(service, 10.0, "REVENU", user_id=1)
+    _creer(service, 99.0, "DEPENSE", user_id=2)
+
+    assert service.get_total_transactions(user_id=1) == 10.0
+    assert service.get_total_transactions(user_id=2) == -99.0
+
+
+def test_ecriture_sur_la_transaction_d_un_autre_sans_effet(sqlite_db_session):
+    """UPDATE/DELETE filtrés sur le propriétaire : refus distingué de l'absence, aucun solde modifié."""
+    courses = _creer(TransactionService(sqlite_db_session), 80.0, "DEPENSE", user_id=1)
+
+    for ecrire in (
+        lambda service, transaction_id: service.update_transaction(transaction_id, montant=1.0, user_id=2),
+        lambda service, transaction_id: service.delete_transaction(transaction_id, user_id=2),
+    ):
+        with pytest.raises(ValueError, match="vos propres transactions"):
+            ecrire(TransactionService(sqlite_db_session), courses.id)
+        sqlite_db_session.rollback()
+        with pytest.raises(ValueError, match="Transaction non trouvée"):
+            ecrire(TransactionService(sqlite_db_session), courses.id + 100)
+        sqlite_db_session.rollback()
+
+    assert sqlite_db_session.get(Transaction, courses.id).montant == 80.0
+    assert SoldeService(sqlite_db_session).reconcilier(corriger=False) == []
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == -80.0
+
+
+def test_premieres_ecritures_concurrentes(sqlite_deux_sessions):
+    """
+    Deux premières écritures du même utilisateur : B constate l'absence de ligne de solde, puis A crée
+    la sienne et commite avant la première écriture de B. B ne doit ni échouer sur la clé primaire
+    ni écraser le solde de A.
+    """
+    a, b = sqlite_deux_sessions
+    connexion_b = b.connection()
+    entrelacee = []
+
+    def premiere_ecriture_de_a(conn, cursor, sql, *args):
+        if conn is connexion_b and not sql.startswith("SELECT") and not entrelacee:
+            entrelacee.append(sql)
+            _creer(TransactionService(a), 100.0, "REVENU")
+
+    event.listen(connexion_b.engine, "before_cursor_execute", premiere_ecriture_de_a)
+    try:
+        _creer(TransactionService(b), 30.0, "DEPENSE")
+    finally:
+        event.remove(connexion_b.engine, "before_cursor_execute", premiere_ecriture_de_a)
+
+    assert entrelacee
+    assert a.get(SoldeUtilisateur, 1, populate_existing=True).solde == 70.0
+    assert SoldeService(a).reconcilier(corriger=False) == []
+
+
+def test_solde_initialise_depuis_historique(sqlite_db_session):
+    """Un utilisateur ayant des transactions antérieures au registre part du bon solde."""
+    sqlite_db_session.add(Transaction(
+        montant=300.0, libelle="ancien", type="REVENU", date=datetime(2025, 1, 1), categorie_id=1, utilisateur_id=1
+    ))
+    sqlite_db_session.commit()
+
+    service = TransactionService(sqlite_db_session)
+    _creer(service, 50.0, "DEPENSE")
+
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == 250.0
+
+
+def test_reconcilier_detecte_et_corrige_les_ecarts(sqlite_db_session):
+    service = TransactionService(sqlite_db_session)
+    _creer(service, 40.0, "REVENU")
+
+    # écart introduit hors service
+    sqlite_db_session.get(SoldeUtilisateur, 1).solde = 12.0
+    sqlite_db_session.commit()
+
+    soldes = SoldeService(sqlite_db_session)
+    ecarts = soldes.reconcilier(corriger=False)
+    assert ecarts == [{"utilisateur_id": 1, "solde_registre": 12.0, "solde_reel": 40.0, "ecart": -28.0}]
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == 12.0
+
+    assert len(soldes.reconcilier()) == 1
+    assert sqlite_db_session.get(SoldeUtilisateur, 1).solde == 40.0
+    assert soldes.reconcilier(corriger=False) == []
+
+
+def test_schema_aligne_sur_init_sql():
+    ddl = str(CreateTable(SoldeUtilisateur.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "solde NUMERIC(14, 2) NOT NULL" in ddl
+    assert "FOREIGN KEY(utilisateur_id) REFERENCES utilisateur (id) ON DELETE CASCADE" in ddl
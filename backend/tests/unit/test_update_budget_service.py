@@ -21,10 +21,10 @@ def test_update_budget_success(mock_db_session, mock_budget, mock_category):
 
     mock_query.filter.return_value = mock_query
 
+    # la catégorie 2 est résolue par le registre, sans requête
     mock_query.first.side_effect = [
-        mock_budget,     
-        mock_category,  
-        None             
+        mock_budget,
+        None
     ]
 
     updated_budget = service.update_budget(
@@ -41,7 +41,7 @@ def test_update_budget_success(mock_db_session, mock_budget, mock_category):
     assert updated_budget.fin_periode == nouvelle_date_fin # type: ignore
 
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once_with(mock_budget)
+    mock_db_session.refresh.assert_not_called()
 
 def test_update_budget_not_found(mock_db_session):
     """Test : Tentative de mise à jour d'un budget inexistant."""
@@ -123,7 +123,6 @@ def test_update_budget_partial_amount_only(mock_db_session, mock_budget, mock_ca
 
     mock_query.first.side_effect = [
         mock_budget,
-        mock_category,
         None
     ]
 
@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime
 from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
 from models.models import Transaction, Categorie
 from scripts.saisie_transaction import TransactionService
 
@@ -34,14 +35,8 @@ class TestUpdateTransactionService:
         mock_transaction.id = 1
         mock_transaction.categorie_id = 1
         
-        new_categorie = MagicMock(spec=Categorie)
-        new_categorie.id = 2
-        
-        # Première requête: transaction, deuxième: nouvelle catégorie
-        mock_db_session.query.return_value.filter.return_value.first.side_effect = [
-            mock_transaction,
-            new_categorie
-        ]
+        # la catégorie est résolue par le registre, seule la transaction est lue
+        mock_db_session.query.return_value.filter.return_value.first.return_value = mock_transaction
         
         service = TransactionService(mock_db_session)
         
@@ -60,9 +55,6 @@ class TestUpdateTransactionService:
         old_categorie = MagicMock(spec=Categorie)
         old_categorie.id = 1
         
-        new_categorie = MagicMock(spec=Categorie)
-        new_categorie.id = 2
-        
         mock_transaction = MagicMock(spec=Transaction)
         mock_transaction.id = 1
         mock_transaction.montant = 50.0
@@ -72,10 +64,7 @@ class TestUpdateTransactionService:
         mock_transaction.categorie_id = 1
         mock_transaction.categorie_obj = old_categorie
         
-        mock_db_session.query.return_value.filter.return_value.first.side_effect = [
-            mock_transaction,
-            new_categorie
-        ]
+        mock_db_session.query.return_value.filter.return_value.first.return_value = mock_transaction
         
         service = TransactionService(mock_db_session)
         new_date = datetime(2026, 1, 20)
@@ -98,6 +87,31 @@ class TestUpdateTransactionService:
         assert mock_transaction.categorie_id == 2
         mock_db_session.commit.assert_called_once()
 
+    def test_update_transaction_postgresql_une_instruction(self, mock_db_session, mock_transaction):
+        """Sous PostgreSQL, la modification est un seul UPDATE filtré sur le propriétaire, anciennes valeurs en RETURNING"""
+
+        mock_db_session.get_bind.return_value.dialect.name = "postgresql"
+        mock_db_session.execute.return_value.first.return_value = (
+            mock_transaction, 50.0, "DEPENSE", datetime(2026, 1, 5), 1
+        )
+        service = TransactionService(mock_db_session)
+
+        updated = service.update_transaction(transaction_id=1, montant=75.0, user_id=1)
+
+        modification, = [
+            appel.args[0].compile(dialect=postgresql.dialect())
+            for appel in mock_db_session.execute.call_args_list
+            if str(appel.args[0]).startswith("UPDATE transactions")
+        ]
+        sql = str(modification)
+        assert "FROM (SELECT" in sql and "FOR UPDATE" in sql
+        assert "transactions.utilisateur_id = %(utilisateur_id_1)s" in sql
+        assert "RETURNING" in sql and "ancienne.montant" in sql
+        assert modification.params["montant"] == 75.0
+        # seule la ligne de solde est lue par l'ORM, pas la transaction
+        mock_db_session.query.return_value.filter.return_value.first.assert_not_called()
+        assert updated is mock_transaction
+
     def test_update_transaction_not_found(self, mock_db_session):
         """Teste que le service lève une exception si la transaction n'existe pas"""
 
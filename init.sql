@@ -1,6 +1,8 @@
 -- Script d'initialisation de la base de données Budget Personnel
 
 -- Suppression des tables si elles existent déjà
+DROP TABLE IF EXISTS cumul_quotidien CASCADE;
+DROP TABLE IF EXISTS solde_utilisateur CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS budget CASCADE;
 DROP TABLE IF EXISTS categorie CASCADE;
@@ -38,6 +40,30 @@ CREATE TABLE transactions (
     CONSTRAINT montant_positif CHECK (montant > 0)
 );
 
+-- Table SOLDE_UTILISATEUR (solde courant maintenu à chaque écriture de transaction)
+CREATE TABLE solde_utilisateur (
+    utilisateur_id INTEGER PRIMARY KEY,
+    solde DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    cumuls_initialises BOOLEAN NOT NULL DEFAULT FALSE,
+    CONSTRAINT fk_solde_utilisateur FOREIGN KEY (utilisateur_id) 
+        REFERENCES utilisateur(id) ON DELETE CASCADE
+);
+
+-- Table CUMUL_QUOTIDIEN (somme et nombre des transactions par jour, maintenus à chaque écriture)
+CREATE TABLE cumul_quotidien (
+    utilisateur_id INTEGER NOT NULL,
+    categorie_id INTEGER NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    jour DATE NOT NULL,
+    montant_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    nb_transactions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (utilisateur_id, categorie_id, type, jour),
+    CONSTRAINT fk_cumul_utilisateur FOREIGN KEY (utilisateur_id) 
+        REFERENCES utilisateur(id) ON DELETE CASCADE,
+    CONSTRAINT fk_cumul_categorie FOREIGN KEY (categorie_id) 
+        REFERENCES categorie(id) ON DELETE RESTRICT
+);
+
 -- Table BUDGET
 CREATE TABLE budget (
     id SERIAL PRIMARY KEY,
@@ -55,6 +81,15 @@ CREATE TABLE budget (
     CONSTRAINT budget_unique_periode UNIQUE (utilisateur_id, categorie_id, debut_periode, fin_periode)
 );
 
+-- Index alignés sur les requêtes des services (mêmes définitions que models/models.py)
+-- Listes, pagination et totaux : utilisateur + période, ordre (date, id) décroissant
+CREATE INDEX IF NOT EXISTS idx_transactions_utilisateur_date
+    ON transactions (utilisateur_id, date DESC, id DESC);
+-- Filtres catégorie / type en plus de l'utilisateur et de la période ; consommation des budgets
+-- (propriétaire, catégorie, DEPENSE, plage de dates semi-ouverte)
+CREATE INDEX IF NOT EXISTS idx_transactions_utilisateur_categorie_type_date
+    ON transactions (utilisateur_id, categorie_id, type, date);
+
 -- Insertion des catégories prédéfinies
 INSERT INTO categorie (nom, description, icone) VALUES
     ('Alimentation', 'Courses, restaurants, cafés', '🍽︎'),
@@ -77,6 +112,9 @@ COMMENT ON TABLE utilisateur IS 'Utilisateurs de l''application de gestion de bu
 COMMENT ON TABLE categorie IS 'Catégories prédéfinies pour classifier les transactions';
 COMMENT ON TABLE transactions IS 'Enregistrement des revenus et dépenses';
 COMMENT ON TABLE budget IS 'Budgets définis par catégorie et période';
+COMMENT ON TABLE solde_utilisateur IS 'Solde courant par utilisateur (reconstruit par python -m scripts.solde_utilisateur)';
+COMMENT ON TABLE cumul_quotidien IS 'Cumuls quotidiens des transactions (reconstruits par python -m scripts.cumul_quotidien, vérifiés avec --verifier)';
+COMMENT ON COLUMN solde_utilisateur.cumuls_initialises IS 'Les cumuls quotidiens de l''utilisateur sont complets et remplacent les transactions en lecture';
 
 COMMENT ON COLUMN utilisateur.password_hash IS 'Hash du mot de passe (bcrypt)';
 COMMENT ON COLUMN transactions.montant IS 'Montant en euros avec 2 décimales';